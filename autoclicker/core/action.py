@@ -61,7 +61,6 @@ class Action(ABC):
         self.condition_id: Optional[str] = None
         if isinstance(condition_id, str) and condition_id.strip():
             self.condition_id = condition_id.strip()
-        self._condition_instance_cache: Optional[Condition] = None
         self.next_action_index_if_condition_met: Optional[int] = None
         try:
             next_if_met_str = str(next_action_index_if_condition_met) if next_action_index_if_condition_met is not None else ""
@@ -81,7 +80,7 @@ class Action(ABC):
             logger.warning(f"Invalid data for next_action_index_if_condition_not_met: '{next_action_index_if_condition_not_met}'. Using None.")
             self.next_action_index_if_condition_not_met = None
         self.is_absolute: bool = bool(is_absolute)
-        self.fallback_action_sequence: Optional[List[Dict[str, Any]]] = None
+        self.fallback_action_sequence = None
         if isinstance(fallback_action_sequence, list):
             valid_fallback_actions = []
             for i, action_data in enumerate(fallback_action_sequence):
@@ -96,6 +95,28 @@ class Action(ABC):
         self._is_valid: bool = True
         self._validation_error: Optional[str] = None
 
+    @property
+    def fallback_action_sequence(self) -> Optional[List[Dict[str, Any]]]:
+        return self._fallback_action_sequence
+
+    @fallback_action_sequence.setter
+    def fallback_action_sequence(self, value: Optional[List[Dict[str, Any]]]) -> None:
+        self._fallback_action_sequence = value
+        self._fallback_actions_cache: Optional[List[Optional['Action']]] = None
+
+    @property
+    def fallback_actions(self) -> List[Optional['Action']]:
+        """Fallback Action objects built once from fallback_action_sequence; None where an entry could not be built."""
+        if self._fallback_actions_cache is None:
+            built: List[Optional[Action]] = []
+            for i, action_data in enumerate(self._fallback_action_sequence or ()):
+                try: built.append(create_action(action_data))
+                except Exception as e:
+                    logger.error(f"Could not create fallback action #{i+1} for action type '{self.type}': {e}", exc_info=True)
+                    built.append(None)
+            self._fallback_actions_cache = built
+        return self._fallback_actions_cache
+
     def execute(self, job_stop_event: Optional[threading.Event] = None,
                 condition_manager: Optional[Any] = None, **context: Any) -> bool:
         condition_result: bool = True
@@ -105,21 +126,18 @@ class Action(ABC):
                 logger.error(f"Action '{self.type}' has condition_id '{self.condition_id}' but no valid condition_manager provided. Skipping condition check, assuming NOT met.")
                 condition_result = False
             else:
-                actual_condition_to_check: Optional[Condition] = None
-                if self._condition_instance_cache and self._condition_instance_cache.id == self.condition_id:
-                    actual_condition_to_check = self._condition_instance_cache
-                else:
-                    actual_condition_to_check = condition_manager.get_shared_condition_by_id(self.condition_id)
-                    self._condition_instance_cache = actual_condition_to_check
+                # Looked up on every run (a dict probe): update_shared_condition swaps in a new object under the same id,
+                # and long-lived actions (jobs, cached fallbacks) must check the current one.
+                actual_condition_to_check: Optional[Condition] = condition_manager.get_shared_condition_by_id(self.condition_id)
                 if actual_condition_to_check:
                     if not _ConditionClassImported or not isinstance(actual_condition_to_check, Condition):
                         logger.error(f"Condition manager returned non-Condition object for ID '{self.condition_id}'. Type: {type(actual_condition_to_check)}. Assuming condition NOT met.")
                         condition_result = False
                     else:
                         try:
-                            logger.debug(f"Action '{self.type}' checking shared condition '{actual_condition_to_check.name}' (ID: {self.condition_id}, Type: {actual_condition_to_check.type}).")
+                            logger.debug("Action '%s' checking shared condition '%s' (ID: %s, Type: %s).", self.type, actual_condition_to_check.name, self.condition_id, actual_condition_to_check.type)
                             condition_result = actual_condition_to_check.check(**context)
-                            logger.debug(f"Condition '{actual_condition_to_check.name}' result: {condition_result}")
+                            logger.debug("Condition '%s' result: %s", actual_condition_to_check.name, condition_result)
                         except Exception as e:
                             logger.error(f"Error checking shared condition '{actual_condition_to_check.name}' (ID: {self.condition_id}) for action '{self.type}': {e}", exc_info=True)
                             condition_result = False
@@ -129,12 +147,12 @@ class Action(ABC):
         else:
             pass
         if not condition_result:
-            logger.debug(f"Action '{self.type}' core logic SKIPPED: Condition (ID: {self.condition_id or 'N/A'}) not met or error in check.")
+            logger.debug("Action '%s' core logic SKIPPED: Condition (ID: %s) not met or error in check.", self.type, self.condition_id or 'N/A')
             return condition_result 
         if job_stop_event and job_stop_event.is_set():
             logger.info(f"Action '{self.type}' aborted before core execution: Job stop event set.")
             return condition_result 
-        logger.debug(f"Action '{self.type}' executing core logic with params: {self.params}")
+        logger.debug("Action '%s' executing core logic with params: %s", self.type, self.params)
         try:
              self._execute_core_logic(job_stop_event, **context)
         except Exception as e:
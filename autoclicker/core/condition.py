@@ -3,24 +3,51 @@ from abc import ABC, abstractmethod
 import logging
 import time
 import numpy as np
-import os
 from PIL import Image
-import pytesseract
+import os
 import re
+import sys
+import threading
+import functools
+import concurrent.futures
+import importlib.util
 from utils.parsing_utils import parse_tuple_str
 import uuid
-from typing import Dict, Optional, Any, List, Tuple, Literal
+import itertools
+from types import MappingProxyType
+from typing import Dict, Optional, Any, List, Tuple, Literal, Callable, NamedTuple
 
 logger = logging.getLogger(__name__)
 
 _ImageProcessingAvailable = False
 try:
-    from utils.image_processing import preprocess_for_image_matching, preprocess_for_ocr
+    from utils.image_processing import preprocess_for_image_matching, preprocess_for_ocr, IMAGE_MATCHING_PARAM_KEYS
     _ImageProcessingAvailable = True
 except ImportError:
     logger.warning("core.condition: image_processing utils not found. Preprocessing in conditions will be limited.")
-    def preprocess_for_image_matching(img: Any, params: Dict[str, Any]) -> Any: return img
-    def preprocess_for_ocr(img: Any, params: Dict[str, Any]) -> Any: return img
+    def preprocess_for_image_matching(img: Any, params: Dict[str, Any], gray_dst: Any = None) -> Any: return img
+    def preprocess_for_ocr(img: Any, params: Dict[str, Any], gray_dst: Any = None) -> Any: return img
+    IMAGE_MATCHING_PARAM_KEYS = ()
+
+# Imported separately: without it the image conditions are invalid, but the anchor search of TextInRelativeRegion
+# falls back to a plain full-resolution cv2.matchTemplate through the stubs below.
+_TemplateMatchingAvailable = False
+try:
+    from utils.template_matching import match_template, match_template_ccoeff_normed, template_fft_stats, find_best_match_ccoeff_normed, get_result_buffer, build_pyramid, pyramid_levels_for, find_best_match_pyramid, best_score_if_match, tiled_search_worthwhile, find_first_match_tiled, to_matching_format, PYRAMID_MAX_LEVELS, cuda_match_worthwhile, find_best_match_cuda, upload_template_cuda
+    _TemplateMatchingAvailable = True
+except ImportError:
+    logger.warning("core.condition: template_matching utils not found. Image conditions will be unavailable.")
+    PYRAMID_MAX_LEVELS = 0
+    def match_template_ccoeff_normed(search: Any, tpl: Any, result_buffers: Any = None) -> Any: return cv2.matchTemplate(search, tpl, cv2.TM_CCOEFF_NORMED)
+    def match_template(search: Any, tpl: Any, method: int, result_buffers: Any = None) -> Any: return cv2.matchTemplate(search, tpl, method)
+    def to_matching_format(img: Any, keep_color: bool = False, dst: Any = None) -> Any: return img
+    def pyramid_levels_for(search_shape: Any, tpl_shape: Any) -> int: return 0
+    def tiled_search_worthwhile(search_shape: Any, tpl_shape: Any) -> bool: return False
+    def cuda_match_worthwhile(search: Any, tpl: Any) -> bool: return False
+    def get_result_buffer(result_buffers: Any, search_shape: Any, tpl_shape: Any) -> Any: return None
+    def _template_matching_missing(*args: Any, **kwargs: Any) -> Any: raise RuntimeError("utils.template_matching is not available.")
+    template_fft_stats = find_best_match_ccoeff_normed = build_pyramid = find_best_match_pyramid = _template_matching_missing
+    best_score_if_match = find_first_match_tiled = find_best_match_cuda = upload_template_cuda = _template_matching_missing
 
 _CV2Available = False
 try:
@@ -30,50 +57,151 @@ except ImportError:
     logger.warning("core.condition: OpenCV (cv2) not available. Image-based conditions will be severely limited.")
     pass
 
-_PytesseractAvailable = False
+_VALID_TM_METHODS: Dict[str, int] = {
+    "TM_CCOEFF_NORMED": cv2.TM_CCOEFF_NORMED, "TM_CCORR_NORMED": cv2.TM_CCORR_NORMED,
+    "TM_SQDIFF_NORMED": cv2.TM_SQDIFF_NORMED
+} if _CV2Available else {}
+
+_PytesseractImported = False
 try:
     import pytesseract
-    tesseract_cmd_path_env = os.getenv('TESSERACT_CMD')
-    tesseract_cmd_path_config = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-    final_tesseract_path = None
-    if tesseract_cmd_path_env and os.path.exists(tesseract_cmd_path_env):
-        final_tesseract_path = tesseract_cmd_path_env
-    elif os.path.exists(tesseract_cmd_path_config):
-        final_tesseract_path = tesseract_cmd_path_config
-    elif sys.platform.startswith('linux') and os.path.exists('/usr/bin/tesseract'): # type: ignore
-        final_tesseract_path = '/usr/bin/tesseract'
-    elif sys.platform.startswith('darwin') and os.path.exists('/usr/local/bin/tesseract'): # type: ignore
-        final_tesseract_path = '/usr/local/bin/tesseract'
-
-    if final_tesseract_path:
-        pytesseract.pytesseract.tesseract_cmd = final_tesseract_path
-        try:
-            version = pytesseract.get_tesseract_version()
-            _PytesseractAvailable = True
-            logger.info(f"core.condition: Tesseract OCR configured. Path: '{final_tesseract_path}', Version: {version}")
-        except pytesseract.TesseractNotFoundError:
-            _PytesseractAvailable = False
-            logger.error(f"core.condition: Tesseract command set to '{final_tesseract_path}', but TesseractNotFoundError occurred. OCR will fail.")
-        except Exception as e_tess_version:
-            _PytesseractAvailable = True
-            logger.warning(f"core.condition: Tesseract configured, but get_tesseract_version() failed: {e_tess_version}. Assuming Tesseract is available.")
-    else:
-        try:
-            version = pytesseract.get_tesseract_version()
-            _PytesseractAvailable = True
-            logger.info(f"core.condition: Tesseract OCR found in system PATH. Version: {version}")
-        except pytesseract.TesseractNotFoundError:
-            _PytesseractAvailable = False
-            logger.error("core.condition: Tesseract OCR not found in system PATH or configured manually. OCR features will be unavailable.")
-        except Exception:
-             _PytesseractAvailable = False
-             logger.error("core.condition: Error trying to get Tesseract version from system PATH. OCR features will be unavailable.")
+    _PytesseractImported = True
+except ImportError:
+    logger.warning("core.condition: Pytesseract library not imported. OCR needs tesserocr instead.")
+_TesseractNotFoundError = pytesseract.TesseractNotFoundError if _PytesseractImported else OSError
+
+_XXHashAvailable = False
+try:
+    import xxhash
+    _XXHashAvailable = True
 except ImportError:
-    _PytesseractAvailable = False
-    logger.error("core.condition: Pytesseract library not imported. OCR features will be unavailable.")
-except Exception as e_tess_init:
-     _PytesseractAvailable = False
-     logger.error(f"core.condition: Unexpected error during Pytesseract initialization: {e_tess_init}", exc_info=True)
+    import hashlib
+
+# tesserocr (libtesseract bindings) is imported lazily: OMP_THREAD_LIMIT must be set before the library loads.
+_TesserocrInstalled = importlib.util.find_spec("tesserocr") is not None
+_OCRLibraryImported = _PytesseractImported or _TesserocrInstalled
+if not _OCRLibraryImported:
+    logger.error("core.condition: Neither tesserocr nor pytesseract is installed. OCR features will be unavailable.")
+
+# Tesseract discovery loads libtesseract or spawns the tesseract process, so it is deferred to the first OCR check.
+_tesseract_lock = threading.Lock()
+_tesseract_state: Optional[bool] = None
+# "tesserocr" (in-process API, one handle per thread) or "pytesseract" (one tesseract process per call)
+_ocr_engine: Optional[str] = None
+_tesserocr: Any = None
+_tesserocr_local = threading.local()
+
+def _discover_tesseract() -> bool:
+    try:
+        tesseract_cmd_path_env = os.getenv('TESSERACT_CMD')
+        tesseract_cmd_path_config = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+        final_tesseract_path = None
+        if tesseract_cmd_path_env and os.path.exists(tesseract_cmd_path_env):
+            final_tesseract_path = tesseract_cmd_path_env
+        elif os.path.exists(tesseract_cmd_path_config):
+            final_tesseract_path = tesseract_cmd_path_config
+        elif sys.platform.startswith('linux') and os.path.exists('/usr/bin/tesseract'):
+            final_tesseract_path = '/usr/bin/tesseract'
+        elif sys.platform.startswith('darwin') and os.path.exists('/usr/local/bin/tesseract'):
+            final_tesseract_path = '/usr/local/bin/tesseract'
+
+        if final_tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = final_tesseract_path
+            try:
+                version = pytesseract.get_tesseract_version()
+                logger.info(f"core.condition: Tesseract OCR configured. Path: '{final_tesseract_path}', Version: {version}")
+                return True
+            except pytesseract.TesseractNotFoundError:
+                logger.error(f"core.condition: Tesseract command set to '{final_tesseract_path}', but TesseractNotFoundError occurred. OCR will fail.")
+                return False
+            except Exception as e_tess_version:
+                logger.warning(f"core.condition: Tesseract configured, but get_tesseract_version() failed: {e_tess_version}. Assuming Tesseract is available.")
+                return True
+        else:
+            try:
+                version = pytesseract.get_tesseract_version()
+                logger.info(f"core.condition: Tesseract OCR found in system PATH. Version: {version}")
+                return True
+            except pytesseract.TesseractNotFoundError:
+                logger.error("core.condition: Tesseract OCR not found in system PATH or configured manually. OCR features will be unavailable.")
+                return False
+            except Exception:
+                logger.error("core.condition: Error trying to get Tesseract version from system PATH. OCR features will be unavailable.")
+                return False
+    except Exception as e_tess_init:
+        logger.error(f"core.condition: Unexpected error during Pytesseract initialization: {e_tess_init}", exc_info=True)
+        return False
+
+def _discover_ocr_engine() -> Optional[str]:
+    # Tesseract's OpenMP threads oversubscribe the CPU when several conditions poll OCR concurrently.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    global _tesserocr
+    if _TesserocrInstalled:
+        try:
+            import tesserocr
+            _tesserocr = tesserocr
+            logger.info(f"core.condition: Using in-process tesserocr OCR engine (Tesseract {tesserocr.tesseract_version().splitlines()[0]}).")
+            return "tesserocr"
+        except Exception as e_tesserocr:
+            logger.warning(f"core.condition: tesserocr failed to load ({e_tesserocr}). Falling back to pytesseract.")
+    if _PytesseractImported and _discover_tesseract(): return "pytesseract"
+    return None
+
+def _ensure_tesseract() -> bool:
+    """Picks the OCR engine once (thread-safe) and returns whether OCR is usable."""
+    global _tesseract_state, _ocr_engine
+    if _tesseract_state is None:
+        with _tesseract_lock:
+            if _tesseract_state is None:
+                _ocr_engine = _discover_ocr_engine()
+                _tesseract_state = _ocr_engine is not None
+    return _tesseract_state
+
+def _get_tesserocr_api(language: str, user_words_file: Optional[str]) -> Any:
+    """Per-thread PyTessBaseAPI handle (the API is not thread-safe); language and user words are init-only."""
+    apis = getattr(_tesserocr_local, "apis", None)
+    if apis is None:
+        apis = {}
+        _tesserocr_local.apis = apis
+    api = apis.get((language, user_words_file))
+    if api is None:
+        variables = {"user_words_file": user_words_file} if user_words_file else {}
+        api = _tesserocr.PyTessBaseAPI(lang=language, oem=_tesserocr.OEM.DEFAULT, variables=variables)
+        apis[(language, user_words_file)] = api
+    return api
+
+@functools.lru_cache(maxsize=64)
+def _pytesseract_config(language: str, psm: str, char_whitelist: Optional[str], user_words_file: Optional[str]) -> str:
+    """Tesseract CLI config string, built once per distinct OCR setting."""
+    config_parts = [f'--psm {psm}', '--oem 3', f'-l {language}']
+    if char_whitelist: config_parts.append(f'-c tessedit_char_whitelist={char_whitelist}')
+    if user_words_file: config_parts.append(f'-c tessedit_user_words_file="{user_words_file}"')
+    return " ".join(config_parts)
+
+def _run_ocr(image_np: np.ndarray, language: str, psm: str, char_whitelist: Optional[str] = None, user_words_file: Optional[str] = None) -> str:
+    """
+    Recognizes text in a grayscale or BGR(A) uint8 image with the engine chosen by _ensure_tesseract().
+    Grayscale (the default OCR preprocessing) goes to the engine as-is; color needs RGB order.
+    """
+    if image_np.ndim not in (2, 3): raise ValueError(f"Unsupported OCR image dimensions: {image_np.ndim}")
+    image_np = np.ascontiguousarray(image_np, dtype=np.uint8)
+    if _ocr_engine == "tesserocr":
+        if image_np.ndim == 3:
+            image_np = cv2.cvtColor(image_np, cv2.COLOR_BGRA2RGB if image_np.shape[2] == 4 else cv2.COLOR_BGR2RGB)
+        api = _get_tesserocr_api(language, user_words_file)
+        api.SetPageSegMode(int(psm))
+        api.SetVariable("tessedit_char_whitelist", char_whitelist or "")
+        bpp = 1 if image_np.ndim == 2 else 3
+        api.SetImageBytes(image_np.tobytes(), image_np.shape[1], image_np.shape[0], bpp, image_np.strides[0])
+        return api.GetUTF8Text()
+    config_str = _pytesseract_config(language, psm, char_whitelist, user_words_file)
+    logger.debug(f"_run_ocr: Tesseract config: '{config_str}'")
+    ocr_input: Any = image_np
+    if image_np.ndim == 3:
+        # pytesseract wraps arrays in a PIL image anyway; PIL's raw BGR(X) decoder swaps channels while wrapping.
+        h, w = image_np.shape[:2]
+        ocr_input = Image.frombuffer("RGB", (w, h), image_np, "raw", "BGRX" if image_np.shape[2] == 4 else "BGR", 0, 1)
+    return pytesseract.image_to_string(ocr_input, config=config_str, output_type=pytesseract.Output.STRING)
 
 _BridgeImported = False
 try:
@@ -93,7 +221,7 @@ _UtilsImported = False
 try:
     from utils.image_storage import ImageStorage
     from utils.color_utils import hex_to_rgb, rgb_to_hex
-    from utils.image_analysis import analyze_region_colors
+    from utils.image_analysis import analyze_region_colors, target_color_bounds, count_target_color_pixels
     _UtilsImported = True
 except ImportError:
     logger.error("core.condition: image_storage, color_utils, or image_analysis_utils not found. Some condition features will be limited.")
@@ -103,9 +231,248 @@ except ImportError:
     def hex_to_rgb(hex_color: str) -> Tuple[int,int,int]: raise ImportError("color_utils not imported") # type: ignore
     def rgb_to_hex(rgb_color: Tuple[int,int,int]) -> str: raise ImportError("color_utils not imported") # type: ignore
     def analyze_region_colors(img, targets, sampling) -> Dict[str, float]: return {}
+    def target_color_bounds(targets_rgb, tolerances, bgr=False) -> Tuple[List[Any], List[Any]]: return [], []
     ImageStorage = DummyImageStorage # type: ignore
 
 
+def _image_digest(image_np: np.ndarray) -> Tuple[Any, ...]:
+    """Content key for a captured image: shape, dtype and a 64-bit hash of the pixels (xxh3 when available)."""
+    data = np.ascontiguousarray(image_np)
+    if _XXHashAvailable: digest: Any = xxhash.xxh3_64_intdigest(data)
+    else: digest = hashlib.blake2b(data, digest_size=8).digest()
+    return data.shape, data.dtype.str, digest
+
+
+def _make_pp_key(pp_params: Dict[str, Any]) -> frozenset:
+    """Hashable key for a preprocessing params dict (unhashable values fall back to repr)."""
+    items = []
+    for k, v in pp_params.items():
+        try: hash(v)
+        except TypeError: v = repr(v)
+        items.append((k, v))
+    return frozenset(items)
+
+
+def _hex_to_rgb_fast(hex_color: str) -> Tuple[int, int, int]:
+    """hex_to_rgb for the common '#RRGGBB' form via a single int() parse; anything else goes through hex_to_rgb."""
+    if len(hex_color) == 7 and hex_color[0] == "#":
+        try: v = int(hex_color[1:], 16)
+        except ValueError: return hex_to_rgb(hex_color)
+        return (v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF
+    return hex_to_rgb(hex_color)
+
+
+def _clamp_search_region(region: Tuple[int, int, int, int], image_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+    """Clamps (x1, y1, x2, y2) to the image bounds. Returns None if nothing is left."""
+    sx1, sy1, sx2, sy2 = region
+    h_main, w_main = image_shape[:2]
+    sx1 = max(0, min(sx1, w_main -1))
+    sy1 = max(0, min(sy1, h_main -1))
+    sx2 = max(sx1 + 1, min(sx2, w_main))
+    sy2 = max(sy1 + 1, min(sy2, h_main))
+    if sx2 <= sx1 or sy2 <= sy1: return None
+    return (sx1, sy1, sx2, sy2)
+
+
+def _clamp_search_regions(regions: np.ndarray, image_shape: Tuple[int, ...]) -> np.ndarray:
+    """Vectorized _clamp_search_region for an (N, 4) int array of (x1, y1, x2, y2) rows; never empty."""
+    h_main, w_main = image_shape[:2]
+    top_left = np.clip(regions[:, :2], 0, (w_main - 1, h_main - 1))
+    bottom_right = np.clip(regions[:, 2:], top_left + 1, (w_main, h_main))
+    return np.hstack((top_left, bottom_right))
+
+
+# ORB detectors, BFMatchers and matching buffers are not thread-safe to share: pooled per thread.
+_cv2_pool_local = threading.local()
+
+def _get_thread_orb(nfeatures: int) -> Any:
+    """The calling thread's ORB detector for nfeatures, created on first use."""
+    orb_pool = getattr(_cv2_pool_local, "orb", None)
+    if orb_pool is None:
+        orb_pool = {}
+        _cv2_pool_local.orb = orb_pool
+    orb = orb_pool.get(nfeatures)
+    if orb is None:
+        orb = cv2.ORB_create(nfeatures=nfeatures)
+        orb_pool[nfeatures] = orb
+    return orb
+
+def _matched_points(kp1: Any, kp2: Any, matches: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """(src, dst) float32 (N,1,2) point arrays for RANSAC: keypoints converted in C, then gathered by index."""
+    n = len(matches)
+    query_idx = np.fromiter((m.queryIdx for m in matches), dtype=np.intp, count=n)
+    train_idx = np.fromiter((m.trainIdx for m in matches), dtype=np.intp, count=n)
+    src_pts = cv2.KeyPoint_convert(kp1)[query_idx].reshape(-1, 1, 2)
+    dst_pts = cv2.KeyPoint_convert(kp2)[train_idx].reshape(-1, 1, 2)
+    return src_pts, dst_pts
+
+def _get_thread_match_buffers() -> Dict[Any, Any]:
+    """
+    The calling thread's matchTemplate result / integral image buffers (see get_result_buffer).
+    Capture regions are fixed per condition, so the same shapes come back every poll.
+    """
+    buffers = getattr(_cv2_pool_local, "match_buffers", None)
+    if buffers is None:
+        buffers = {}
+        _cv2_pool_local.match_buffers = buffers
+    return buffers
+
+def _get_thread_bf_matcher(cross_check: bool) -> Any:
+    """The calling thread's Hamming BFMatcher (crossCheck on or off), created on first use."""
+    bf_pool = getattr(_cv2_pool_local, "bf", None)
+    if bf_pool is None:
+        bf_pool = {}
+        _cv2_pool_local.bf = bf_pool
+    bf = bf_pool.get(cross_check)
+    if bf is None:
+        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=cross_check)
+        bf_pool[cross_check] = bf
+    return bf
+
+
+class _CachedTemplate:
+    """A decoded + preprocessed template; ORB features and FFT matching stats are computed lazily."""
+    def __init__(self, image: np.ndarray) -> None:
+        self.image = image
+        self._features: Dict[int, Tuple[Any, Any]] = {}
+        self._fft_stats: Dict[int, Tuple[np.ndarray, float]] = {}
+        self._pyramid: List[np.ndarray] = [image]
+        self._gpu_image = None
+        _, std_dev = cv2.meanStdDev(image)
+        self.is_flat = bool(np.all(std_dev < 1e-6))
+
+    def get_pyramid(self, levels: int) -> List[np.ndarray]:
+        if len(self._pyramid) <= levels:
+            self._pyramid = build_pyramid(self.image, levels)
+        return self._pyramid[:levels + 1]
+
+    def get_features(self, nfeatures: int) -> Tuple[Any, Any]:
+        features = self._features.get(nfeatures)
+        if features is None:
+            features = _get_thread_orb(nfeatures).detectAndCompute(self.image, None)
+            self._features[nfeatures] = features
+        return features
+
+    def get_gpu_image(self) -> Any:
+        """The template uploaded to the GPU (cv2.cuda_GpuMat), done once on first use."""
+        if self._gpu_image is None:
+            self._gpu_image = upload_template_cuda(self.image)
+        return self._gpu_image
+
+    def get_fft_stats(self, method: int) -> Tuple[np.ndarray, float]:
+        """template_fft_stats for this template (zero-mean kernel + norm for CCOEFF), computed once per method."""
+        stats = self._fft_stats.get(method)
+        if stats is None:
+            stats = template_fft_stats(self.image, method)
+            self._fft_stats[method] = stats
+        return stats
+
+
+@functools.lru_cache(maxsize=64)
+def _load_template_raw(full_path: str, mtime_ns: int, imread_flag: int) -> Optional[np.ndarray]:
+    """
+    Decodes a template file once per (path, mtime, decode flag); the preprocessed variants in
+    _load_template share it. Read through np.fromfile so non-ASCII Windows paths decode too.
+    Shared by every condition using the file, so callers must not modify it.
+    """
+    try: file_bytes = np.fromfile(full_path, dtype=np.uint8)
+    except OSError as e_read:
+        logger.debug(f"_load_template_raw: Could not read template '{full_path}': {e_read}")
+        return None
+    image = cv2.imdecode(file_bytes, imread_flag) if file_bytes.size else None
+    if image is None:
+        logger.debug(f"_load_template_raw: cv2.imdecode failed for template '{full_path}'.")
+        return None
+    return image
+
+
+@functools.lru_cache(maxsize=256)
+def _load_template(full_path: str, mtime_ns: int, pp_key: frozenset) -> Optional[_CachedTemplate]:
+    """
+    Reads and preprocesses a template image. Cached process-wide; mtime_ns is part of the key
+    so an edited template file is reloaded on the next lookup.
+    """
+    pp_params = dict(pp_key)
+    # Decode straight to the layout matching needs; nothing downstream uses the alpha channel.
+    imread_flag = cv2.IMREAD_COLOR if _keeps_color(pp_params) else cv2.IMREAD_GRAYSCALE
+    template_original_cv = _load_template_raw(full_path, mtime_ns, imread_flag)
+    if template_original_cv is None: return None
+    template_processed_cv = preprocess_for_image_matching(template_original_cv, pp_params)
+    if template_processed_cv is None or template_processed_cv.size == 0:
+        logger.debug(f"_load_template: Preprocessing failed for template '{full_path}'.")
+        return None
+    return _CachedTemplate(to_matching_format(template_processed_cv, keep_color=_keeps_color(pp_params)))
+
+
+def _keeps_color(pp_params: Dict[str, Any]) -> bool:
+    """True if the user explicitly turned grayscale preprocessing off (color matching)."""
+    return pp_params.get("grayscale", True) is False
+
+# Steps whose output at a pixel depends on its neighbourhood (blurs, CLAHE tiles, Canny) or on the whole image
+# (Otsu binarization): running them on a full frame and cropping differs from running them on the crop.
+_CROP_SENSITIVE_PP_STEPS = ('binarization', 'gaussian_blur', 'median_blur', 'clahe', 'bilateral_filter', 'canny_edges')
+
+def _is_pixelwise_pp(pp_params: Dict[str, Any]) -> bool:
+    """True if preprocessing with pp_params commutes with cropping (only grayscale/8-bit conversion enabled)."""
+    return not any(pp_params.get(step, False) for step in _CROP_SENSITIVE_PP_STEPS)
+
+
+def _get_cached_template(full_path: str, pp_params: Dict[str, Any], mtime_ns: Optional[int] = None,
+                         pp_key: Optional[frozenset] = None) -> Optional[_CachedTemplate]:
+    if mtime_ns is None:
+        try: mtime_ns = os.stat(full_path).st_mtime_ns
+        except OSError: return None
+    return _load_template(full_path, mtime_ns, pp_key if pp_key is not None else _make_pp_key(pp_params))
+
+
+# Shared by all conditions; cv2 matching releases the GIL, so independent matches overlap across cores.
+_MATCH_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="ConditionMatch")
+
+
+class _UserWordsResolver:
+    """
+    Resolves an OCR user-words path (through ImageStorage when given) to an existing file. A found path is
+    kept per storage instance, so steady-state checks skip get_full_path and the existence check; a missing
+    file is looked up again on the next check.
+    """
+    def __init__(self) -> None:
+        self._resolved: Tuple[Any, Optional[str]] = (None, None)
+
+    def resolve(self, relative_path: str, image_storage_instance: Any, log_prefix: str) -> Optional[str]:
+        storage_key = (id(image_storage_instance), relative_path)
+        cached_key, cached_path = self._resolved
+        if cached_key == storage_key: return cached_path
+        if image_storage_instance and isinstance(image_storage_instance, ImageStorage):
+            try: full_path = image_storage_instance.get_full_path(relative_path)
+            except Exception: full_path = os.path.abspath(relative_path)
+        else: full_path = os.path.abspath(relative_path)
+        if not os.path.isfile(full_path):
+            logger.warning(f"{log_prefix}: OCR user words file not found: '{relative_path}' (Resolved: '{full_path}')")
+            return None
+        logger.debug(f"{log_prefix}: Using user words file: {full_path}")
+        self._resolved = (storage_key, full_path)
+        return full_path
+
+
+# Screen size from the C# server, reused for SCREEN_SIZE_TTL_S so full-screen regions don't cost a pipe round-trip per check.
+SCREEN_SIZE_TTL_S = 5.0
+_screen_size_cache: Tuple[float, Optional[Tuple[int, int]]] = (0.0, None)
+
+def _get_screen_size_cached() -> Tuple[int, int]:
+    global _screen_size_cache
+    fetched_at, size = _screen_size_cache
+    now = time.monotonic()
+    if size is None or now - fetched_at > SCREEN_SIZE_TTL_S:
+        size = os_interaction_client.get_screen_size()
+        _screen_size_cache = (now, size)
+    return size
+
+
+# Auto-generated condition ids: one random per-process prefix + a counter, so bulk loads skip a urandom read per condition.
+_ID_PREFIX = uuid.uuid4().hex[:24]
+_id_counter = itertools.count()
+
+
 class Condition(ABC):
     id: str
     name: str
@@ -120,13 +487,14 @@ class Condition(ABC):
                  is_monitored_by_ai_brain: bool = False) -> None:
         if not isinstance(type, str) or not type:
             raise ValueError("Condition type must be a non-empty string.")
-        self.type = type
+        # Interned so type comparisons against the TYPE constants short-circuit on identity, even for parsed strings.
+        self.type = sys.intern(type)
         self.params = params if isinstance(params, dict) else {}
-        self.id = id if id and isinstance(id, str) and id.strip() else uuid.uuid4().hex
+        self.id = id if id and isinstance(id, str) and id.strip() else f"{_ID_PREFIX}{next(_id_counter):08x}"
         final_name = name
         if not (final_name and isinstance(final_name, str) and final_name.strip()):
             type_display = self.type.replace('_',' ').title()
-            final_name = f"{type_display}_{self.id[:8]}"
+            final_name = f"{type_display}_{uuid.uuid4().hex[:8]}" # Not the id suffix: that counter restarts every session.
         self.name = final_name.strip()
         self.is_monitored_by_ai_brain = bool(is_monitored_by_ai_brain)
         self._is_valid = True
@@ -152,6 +520,13 @@ class Condition(ABC):
                 self._is_valid = False
                 self._validation_error = f"Invalid region coordinate types: {e}"
 
+    def _bind_region(self, default_x2: int = 100, default_y2: int = 100) -> None:
+        """Binds the capture region to attributes (and writes it back to params) so check() skips the dict lookups."""
+        self.region_x1 = self.params.get("region_x1", 0); self.region_y1 = self.params.get("region_y1", 0)
+        self.region_x2 = self.params.get("region_x2", default_x2); self.region_y2 = self.params.get("region_y2", default_y2)
+        self.params["region_x1"] = self.region_x1; self.params["region_y1"] = self.region_y1
+        self.params["region_x2"] = self.region_x2; self.params["region_y2"] = self.region_y2
+
     @abstractmethod
     def check(self, **context: Any) -> bool:
         if not self._is_valid:
@@ -217,16 +592,22 @@ class NoneCondition(Condition):
 
 class MultiImageCondition(Condition):
     TYPE = "multi_image_on_screen"
+    TEMPLATE_PATH_RECHECK_INTERVAL_S = 5.0
+    FEATURE_MATCH_RATIO = 0.75
 
     def __init__(self, params: Optional[Dict[str, Any]] = None, id: Optional[str] = None, name: Optional[str] = None,
                  is_monitored_by_ai_brain: bool = False) -> None:
         super().__init__(type=self.TYPE, params=params, id=id, name=name, is_monitored_by_ai_brain=is_monitored_by_ai_brain)
+        # relative path -> (full_path, mtime_ns, monotonic time of last stat); None full_path = missing file
+        self._template_path_cache: Dict[str, Tuple[Optional[str], int, float]] = {}
+        # Per-thread scratch (result/gray buffers); sub-images are matched on _MATCH_POOL workers.
+        self._scratch_local = threading.local()
         if not self._is_valid: return
 
         if not _CV2Available:
             self._is_valid = False; self._validation_error = "OpenCV (cv2) is not available for MultiImageCondition."
             return
-        if not _ImageProcessingAvailable:
+        if not (_ImageProcessingAvailable and _TemplateMatchingAvailable):
             self._is_valid = False; self._validation_error = "Image processing utilities are not available."
             return
 
@@ -253,7 +634,7 @@ class MultiImageCondition(Condition):
             self.anchor_pp_params = {
                 "grayscale": self.params.get("grayscale", True),
             }
-
+        self._anchor_pp_key = _make_pp_key(self.anchor_pp_params)
 
         self.sub_images_definitions = self.params.get("sub_images", [])
         if not isinstance(self.sub_images_definitions, list):
@@ -269,6 +650,11 @@ class MultiImageCondition(Condition):
                 return
             sub_def["path"] = str(sub_def["path"]).strip()
 
+        # Parallel arrays for the per-check hot loop (avoids per-iteration dict lookups).
+        self._sub_paths: List[str] = [sub_def["path"] for sub_def in self.sub_images_definitions]
+        self._sub_offsets = np.array([(sub_def["offset_x_from_anchor"], sub_def["offset_y_from_anchor"])
+                                      for sub_def in self.sub_images_definitions], dtype=np.int32).reshape(-1, 2)
+
         self.sub_image_matching_method = str(self.params.get("sub_image_matching_method", "template")).lower()
         if self.sub_image_matching_method not in ["template", "feature"]: self.sub_image_matching_method = "template"
         self.params["sub_image_matching_method"] = self.sub_image_matching_method
@@ -287,7 +673,9 @@ class MultiImageCondition(Condition):
              self.sub_image_pp_params = {
                 "grayscale": self.params.get("grayscale", True),
             }
-
+        self._sub_image_pp_key = _make_pp_key(self.sub_image_pp_params)
+        # Sub-image crops may be sliced out of the anchor's preprocessed frame only if that gives the same pixels.
+        self._sub_reuses_anchor_frame = self._sub_image_pp_key == self._anchor_pp_key and _is_pixelwise_pp(self.sub_image_pp_params)
 
         try:
             self.position_tolerance_x = int(self.params.get("position_tolerance_x", 5))
@@ -298,6 +686,62 @@ class MultiImageCondition(Condition):
             self.position_tolerance_x = 5; self.position_tolerance_y = 5
         self.params["position_tolerance_x"] = self.position_tolerance_x
         self.params["position_tolerance_y"] = self.position_tolerance_y
+
+        # Feature-match geometry: "affine" (rotation/scale/translation) or full "perspective" homography.
+        self.homography_model = str(self.params.get("homography_model", "affine")).lower()
+        if self.homography_model not in ["affine", "perspective"]: self.homography_model = "affine"
+        self.params["homography_model"] = self.homography_model
+        # Sub-images are searched within +/- 3x the tolerance around their expected position.
+        self._sub_search_radii = np.array([[3 * self.position_tolerance_x, 3 * self.position_tolerance_y]], dtype=np.int32)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # threading.local cannot be copied/pickled; the scratch buffers are rebuilt lazily.
+        state = self.__dict__.copy()
+        state["_scratch_local"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._scratch_local = threading.local()
+
+    def _thread_scratch(self, name: str) -> Dict[Any, Any]:
+        """Returns the calling thread's scratch dict called name, creating it on first use."""
+        scratch = getattr(self._scratch_local, name, None)
+        if scratch is None:
+            scratch = {}
+            setattr(self._scratch_local, name, scratch)
+        return scratch
+
+    def _resolve_template_path(self, template_path_relative: str, image_storage_instance: Optional[ImageStorage]) -> Optional[Tuple[str, int]]: # type: ignore
+        """
+        Returns (full_path, mtime_ns) for a template, or None if it does not exist.
+        Results are cached per instance and re-validated at most every TEMPLATE_PATH_RECHECK_INTERVAL_S,
+        so steady-state polling does no filesystem calls.
+        """
+        now = time.monotonic()
+        cached_entry = self._template_path_cache.get(template_path_relative)
+        if cached_entry is not None and now - cached_entry[2] < self.TEMPLATE_PATH_RECHECK_INTERVAL_S:
+            return (cached_entry[0], cached_entry[1]) if cached_entry[0] else None
+
+        full_path: Optional[str] = None
+        if image_storage_instance:
+            try:
+                full_path = image_storage_instance.get_full_path(template_path_relative)
+                if not image_storage_instance.file_exists(template_path_relative): full_path = None
+            except: full_path = os.path.abspath(template_path_relative) # Fallback
+        else: full_path = os.path.abspath(template_path_relative)
+
+        mtime_ns = 0
+        if full_path:
+            try: mtime_ns = os.stat(full_path).st_mtime_ns
+            except OSError: full_path = None
+        self._template_path_cache[template_path_relative] = (full_path, mtime_ns, now)
+
+        if not full_path:
+            logger.debug(f"MultiImageCondition: Template '{template_path_relative}' not found.")
+            return None
+        return full_path, mtime_ns
+
     def _find_single_image(self,
                            screenshot_np: np.ndarray,
                            template_path_relative: str,
@@ -305,60 +749,70 @@ class MultiImageCondition(Condition):
                            matching_method_str: str,
                            preprocessing_params: Dict[str, Any],
                            image_storage_instance: Optional[ImageStorage], # type: ignore
-                           search_region_for_sub_image: Optional[Tuple[int,int,int,int]] = None
+                           search_region_for_sub_image: Optional[Tuple[int,int,int,int]] = None,
+                           preprocessed_screenshot_np: Optional[np.ndarray] = None,
+                           preprocessing_key: Optional[frozenset] = None,
+                           crop_cache: Optional[Dict[Tuple[frozenset, Tuple[int, int, int, int]], np.ndarray]] = None
                            ) -> Optional[Tuple[int, int, int, int]]: 
         """
         Helper function to find a single image (anchor or sub-image).
         If search_region_for_sub_image is provided, it searches within that sub-region of screenshot_np.
+        If preprocessed_screenshot_np is provided (screenshot_np already run through preprocessing_params),
+        the search area is sliced from it instead of being preprocessed again.
+        preprocessing_key is the frozen form of preprocessing_params; crop_cache memoizes preprocessed
+        sub-region crops for the duration of one check.
         The returned coordinates are relative to the original screenshot_np.
         """
         if not template_path_relative: return None
 
-        full_path: Optional[str] = None
-        if image_storage_instance:
-            try:
-                full_path = image_storage_instance.get_full_path(template_path_relative)
-                if not image_storage_instance.file_exists(template_path_relative): full_path = None
-            except: full_path = os.path.abspath(template_path_relative) # Fallback
-        else: full_path = os.path.abspath(template_path_relative)
-        
-        if not (full_path and os.path.exists(full_path)):
-            logger.debug(f"_find_single_image: Template '{template_path_relative}' not found at '{full_path}'.")
-            return None
-
-        template_original_cv = cv2.imread(full_path, cv2.IMREAD_UNCHANGED)
-        if template_original_cv is None:
-            logger.debug(f"_find_single_image: cv2.imread failed for template '{full_path}'.")
-            return None
+        resolved = self._resolve_template_path(template_path_relative, image_storage_instance)
+        if resolved is None: return None
+        full_path, mtime_ns = resolved
 
-        template_processed_cv = preprocess_for_image_matching(template_original_cv, preprocessing_params)
-        if template_processed_cv is None or template_processed_cv.size == 0:
-            logger.debug(f"_find_single_image: Preprocessing failed for template '{full_path}'.")
+        if preprocessing_key is None: preprocessing_key = _make_pp_key(preprocessing_params)
+        cached_template = _get_cached_template(full_path, preprocessing_params, mtime_ns, pp_key=preprocessing_key)
+        if cached_template is None:
+            logger.debug(f"_find_single_image: Could not load/preprocess template '{full_path}'.")
             return None
+        template_processed_cv = cached_template.image
 
-        search_target_cv = screenshot_np
+        search_source_cv = preprocessed_screenshot_np if preprocessed_screenshot_np is not None else screenshot_np
+        search_target_cv = search_source_cv
         offset_x_for_result, offset_y_for_result = 0, 0 
+        clamped_region = None
 
         if search_region_for_sub_image:
-            sx1, sy1, sx2, sy2 = search_region_for_sub_image
-            h_main, w_main = screenshot_np.shape[:2]
-            sx1 = max(0, min(sx1, w_main -1))
-            sy1 = max(0, min(sy1, h_main -1))
-            sx2 = max(sx1 + 1, min(sx2, w_main))
-            sy2 = max(sy1 + 1, min(sy2, h_main))
-            if sx2 <= sx1 or sy2 <= sy1:
+            clamped_region = _clamp_search_region(search_region_for_sub_image, search_source_cv.shape)
+            if clamped_region is None:
                 logger.debug(f"_find_single_image: Invalid sub-search region {search_region_for_sub_image}. Skipping.")
                 return None
-            search_target_cv = screenshot_np[sy1:sy2, sx1:sx2]
+            sx1, sy1, sx2, sy2 = clamped_region
+            search_target_cv = search_source_cv[sy1:sy2, sx1:sx2]
             offset_x_for_result, offset_y_for_result = sx1, sy1
             if search_target_cv.size == 0:
                 logger.debug(f"_find_single_image: Sub-search region is empty. Skipping.")
                 return None
         
-        search_target_processed_cv = preprocess_for_image_matching(search_target_cv.copy(), preprocessing_params) # Preprocess the search area
+        if preprocessed_screenshot_np is not None:
+            search_target_processed_cv = search_target_cv
+        elif clamped_region is not None and crop_cache is not None:
+            search_target_processed_cv = self._preprocess_crop(screenshot_np, clamped_region, preprocessing_params, preprocessing_key, crop_cache)
+        else:
+            search_target_processed_cv = preprocess_for_image_matching(search_target_cv, preprocessing_params) # Preprocess the search area
         if search_target_processed_cv is None or search_target_processed_cv.size == 0:
             logger.debug(f"_find_single_image: Preprocessing failed for search target area.")
             return None
+        keep_color = _keeps_color(preprocessing_params)
+        gray_buffer: Optional[np.ndarray] = None
+        if search_target_processed_cv.ndim == 3 and not keep_color:
+            # (h, w) -> reusable grayscale conversion buffer for search areas
+            gray_scratch = self._thread_scratch("gray")
+            gray_shape = search_target_processed_cv.shape[:2]
+            gray_buffer = gray_scratch.get(gray_shape)
+            if gray_buffer is None:
+                gray_buffer = np.empty(gray_shape, dtype=np.uint8)
+                gray_scratch[gray_shape] = gray_buffer
+        search_target_processed_cv = to_matching_format(search_target_processed_cv, keep_color=keep_color, dst=gray_buffer)
 
         if template_processed_cv.shape[0] > search_target_processed_cv.shape[0] or \
            template_processed_cv.shape[1] > search_target_processed_cv.shape[1]:
@@ -373,13 +827,17 @@ class MultiImageCondition(Condition):
             return None
         found_location_in_search_target: Optional[Tuple[int,int,int,int]] = None 
         if matching_method_str == "template":
+            if cached_template.is_flat:
+                logger.debug(f"_find_single_image: Template '{template_path_relative}' is flat (zero variance), NCC cannot match.")
+                return None
             try:
-                tm_method_cv2 = cv2.TM_CCOEFF_NORMED
-                res_matrix = cv2.matchTemplate(search_target_processed_cv, template_processed_cv, tm_method_cv2)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res_matrix)
-                
-                match_value = max_val
-                loc = max_loc
+                pyramid_levels = 0 if search_region_for_sub_image else pyramid_levels_for(search_target_processed_cv.shape, template_processed_cv.shape)
+                if pyramid_levels > 0:
+                    match_value, loc = find_best_match_pyramid(search_target_processed_cv, cached_template.get_pyramid(pyramid_levels), threshold)
+                else:
+                    match_value, loc = find_best_match_ccoeff_normed(search_target_processed_cv, template_processed_cv, threshold,
+                                                                     result_buffers=self._thread_scratch("match_result"),
+                                                                     template_stats=cached_template.get_fft_stats(cv2.TM_CCOEFF_NORMED))
                 if match_value >= threshold:
                     h_tpl, w_tpl = template_processed_cv.shape[:2]
                     found_location_in_search_target = (loc[0], loc[1], loc[0] + w_tpl, loc[1] + h_tpl)
@@ -397,27 +855,28 @@ class MultiImageCondition(Condition):
                 current_inlier_ratio = float(preprocessing_params.get("homography_inlier_ratio", self.params.get("homography_inlier_ratio", 0.75)))
 
 
-                orb = cv2.ORB_create(nfeatures=current_orb_nfeatures)
-                kp1, des1 = orb.detectAndCompute(template_processed_cv, None)
-                kp2, des2 = orb.detectAndCompute(search_target_processed_cv, None)
+                kp1, des1 = cached_template.get_features(current_orb_nfeatures)
+                kp2, des2 = _get_thread_orb(current_orb_nfeatures).detectAndCompute(search_target_processed_cv, None)
 
                 if des1 is not None and des2 is not None and len(kp1) >= 2 and len(kp2) >= 2:
-                    bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True) 
-                    matches = bf.match(des1, des2)
-                    matches = sorted(matches, key=lambda x: x.distance) 
-                    good_matches = matches
+                    # Lowe's ratio test: keep a match only if it is clearly better than the runner-up.
+                    matches = _get_thread_bf_matcher(cross_check=False).knnMatch(des1, des2, k=2)
+                    good_matches = [pair[0] for pair in matches
+                                    if len(pair) == 2 and pair[0].distance < self.FEATURE_MATCH_RATIO * pair[1].distance]
 
                     logger.debug(f"_find_single_image: Feature matching for '{template_path_relative}'. Total matches: {len(matches)}, Using 'good' matches: {len(good_matches)}")
 
                     if len(good_matches) >= current_min_matches:
                         if len(good_matches) >= 4:
-                            src_pts = np.float32([kp1[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-                            dst_pts = np.float32([kp2[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+                            src_pts, dst_pts = _matched_points(kp1, kp2, good_matches)
 
-                            M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+                            if self.homography_model == "perspective":
+                                M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+                            else: # UI elements only translate/scale: 4-DOF similarity needs far fewer RANSAC iterations
+                                M, mask = cv2.estimateAffinePartial2D(src_pts, dst_pts, method=cv2.RANSAC, ransacReprojThreshold=5.0)
 
                             if M is not None and mask is not None:
-                                inliers = np.sum(mask)
+                                inliers = cv2.countNonZero(mask)
                                 min_inliers_required_for_match = max(4, int(len(good_matches) * current_inlier_ratio))
 
                                 logger.debug(f"_find_single_image: Homography for '{template_path_relative}'. Inliers: {inliers}, Required inliers: {min_inliers_required_for_match}")
@@ -427,8 +886,11 @@ class MultiImageCondition(Condition):
                                     h_tpl, w_tpl = template_processed_cv.shape[:2]
                                     pts_template_corners = np.float32([[0, 0], [0, h_tpl - 1], [w_tpl - 1, h_tpl - 1], [w_tpl - 1, 0]]).reshape(-1, 1, 2)
 
-                                    if M.shape == (3,3): 
-                                        dst_corners_in_search_target = cv2.perspectiveTransform(pts_template_corners, M)
+                                    if M.shape in ((3, 3), (2, 3)):
+                                        if M.shape == (3, 3):
+                                            dst_corners_in_search_target = cv2.perspectiveTransform(pts_template_corners, M)
+                                        else:
+                                            dst_corners_in_search_target = cv2.transform(pts_template_corners, M)
 
                                         x_coords = dst_corners_in_search_target[:,0,0]
                                         y_coords = dst_corners_in_search_target[:,0,1]
@@ -444,11 +906,11 @@ class MultiImageCondition(Condition):
                                         else:
                                             logger.warning(f"_find_single_image: Feature match for '{template_path_relative}', but bounding box from homography is invalid: ({box_x1},{box_y1})-({box_x2},{box_y2}).")
                                     else:
-                                        logger.warning(f"_find_single_image: Homography matrix M for '{template_path_relative}' is not 3x3. Shape: {M.shape}")
+                                        logger.warning(f"_find_single_image: Transform matrix M for '{template_path_relative}' has unexpected shape {M.shape}.")
                                 else:
                                     logger.debug(f"_find_single_image: Not enough inliers for '{template_path_relative}' after homography.")
                             else:
-                                logger.debug(f"_find_single_image: findHomography returned None for '{template_path_relative}'.")
+                                logger.debug(f"_find_single_image: {self.homography_model} transform estimation returned None for '{template_path_relative}'.")
                         else:
                              logger.debug(f"_find_single_image: Not enough 'good' matches ({len(good_matches)}) for homography for '{template_path_relative}' (min 4 required).")
                     else:
@@ -467,14 +929,164 @@ class MultiImageCondition(Condition):
         return None
 
 
+    def _find_sub_images_batched(self,
+                                 screenshot_np: np.ndarray,
+                                 search_regions: List[Tuple[int, int, int, int]],
+                                 image_storage_instance: Optional[ImageStorage], # type: ignore
+                                 preprocessed_screenshot_np: Optional[np.ndarray] = None,
+                                 crop_cache: Optional[Dict[Tuple[frozenset, Tuple[int, int, int, int]], np.ndarray]] = None
+                                 ) -> List[Optional[Tuple[int, int, int, int]]]:
+        """
+        Template-mode sub-image search. Sub-images that share a template have their search crops
+        stacked into one strip and matched with a single cv2.matchTemplate call; the result matrix
+        is then split back per crop, ignoring positions that would straddle two crops.
+        If preprocessed_screenshot_np is given, crops are sliced from it instead of being preprocessed;
+        otherwise preprocessed crops are memoized in crop_cache (when given).
+        search_regions must already be clamped to screenshot_np (see _clamp_search_regions).
+        Returned rects are relative to screenshot_np, one entry (or None) per search region.
+        """
+        results: List[Optional[Tuple[int, int, int, int]]] = [None] * len(search_regions)
+        groups: Dict[str, List[Tuple[int, np.ndarray, Tuple[int, int]]]] = {}
+        templates: Dict[str, np.ndarray] = {}
+
+        for i, sub_path in enumerate(self._sub_paths):
+            resolved = self._resolve_template_path(sub_path, image_storage_instance)
+            if resolved is None: continue
+            full_path, mtime_ns = resolved
+            if full_path not in templates:
+                cached_template = _get_cached_template(full_path, self.sub_image_pp_params, mtime_ns, pp_key=self._sub_image_pp_key)
+                if cached_template is None: continue
+                templates[full_path] = cached_template.image
+            template_processed_cv = templates[full_path]
+
+            clamped_region = search_regions[i]
+            sx1, sy1, sx2, sy2 = clamped_region
+            if preprocessed_screenshot_np is not None:
+                crop_processed = preprocessed_screenshot_np[sy1:sy2, sx1:sx2]
+            else:
+                crop_processed = self._preprocess_crop(screenshot_np, clamped_region, self.sub_image_pp_params, self._sub_image_pp_key, crop_cache)
+            if crop_processed is None or crop_processed.size == 0: continue
+            crop_processed = to_matching_format(crop_processed, keep_color=_keeps_color(self.sub_image_pp_params))
+            if template_processed_cv.shape[0] > crop_processed.shape[0] or template_processed_cv.shape[1] > crop_processed.shape[1]: continue
+            if template_processed_cv.ndim != crop_processed.ndim or template_processed_cv.shape[2:] != crop_processed.shape[2:]: continue
+            groups.setdefault(full_path, []).append((i, crop_processed, (sx1, sy1)))
+
+        match_group = lambda full_path: self._match_template_group(full_path, templates[full_path], groups[full_path])
+        if len(groups) > 1:
+            group_results = _MATCH_POOL.map(match_group, list(groups))
+        else:
+            group_results = map(match_group, groups)
+        for group_result in group_results:
+            for i, rect in group_result:
+                results[i] = rect
+        return results
+
+    def _preprocess_crop(self,
+                         screenshot_np: np.ndarray,
+                         region: Tuple[int, int, int, int],
+                         preprocessing_params: Dict[str, Any],
+                         preprocessing_key: Optional[frozenset],
+                         crop_cache: Optional[Dict[Tuple[frozenset, Tuple[int, int, int, int]], np.ndarray]]
+                         ) -> Optional[np.ndarray]:
+        """Preprocesses screenshot_np[region] (a clamped (x1, y1, x2, y2)), reusing crop_cache entries for the same params and region."""
+        cache_key = None
+        if crop_cache is not None:
+            if preprocessing_key is None: preprocessing_key = _make_pp_key(preprocessing_params)
+            cache_key = (preprocessing_key, region)
+            crop_processed = crop_cache.get(cache_key)
+            if crop_processed is not None: return crop_processed
+        sx1, sy1, sx2, sy2 = region
+        crop_processed = preprocess_for_image_matching(screenshot_np[sy1:sy2, sx1:sx2], preprocessing_params)
+        if cache_key is not None and crop_processed is not None: crop_cache[cache_key] = crop_processed
+        return crop_processed
+
+    def _match_template_group(self,
+                              full_path: str,
+                              template_processed_cv: np.ndarray,
+                              members: List[Tuple[int, np.ndarray, Tuple[int, int]]]
+                              ) -> List[Tuple[int, Tuple[int, int, int, int]]]:
+        """Matches one template against its stacked crops. Returns (sub_index, rect) for each crop that matched."""
+        found: List[Tuple[int, Tuple[int, int, int, int]]] = []
+        h_tpl, w_tpl = template_processed_cv.shape[:2]
+        strip_w = max(crop.shape[1] for _, crop, _ in members)
+        strip_h = sum(crop.shape[0] for _, crop, _ in members)
+        first_crop = members[0][1]
+        strip = np.zeros((strip_h, strip_w) + first_crop.shape[2:], dtype=first_crop.dtype)
+        row_offsets: List[int] = []
+        row = 0
+        for _, crop, _ in members:
+            strip[row:row + crop.shape[0], :crop.shape[1]] = crop
+            row_offsets.append(row)
+            row += crop.shape[0]
+
+        try:
+            res_matrix = cv2.matchTemplate(strip, template_processed_cv, cv2.TM_CCOEFF_NORMED,
+                                           result=get_result_buffer(self._thread_scratch("match_result"), strip.shape, template_processed_cv.shape))
+        except cv2.error as e:
+            logger.warning(f"MultiImageCondition: Batched template matching error for '{full_path}': {e}")
+            return found
+
+        for (i, crop, (off_x, off_y)), row_offset in zip(members, row_offsets):
+            res_slice = res_matrix[row_offset:row_offset + crop.shape[0] - h_tpl + 1, :crop.shape[1] - w_tpl + 1]
+            _, max_val, _, max_loc = cv2.minMaxLoc(res_slice)
+            if max_val >= self.sub_image_threshold:
+                x1, y1 = max_loc[0] + off_x, max_loc[1] + off_y
+                found.append((i, (x1, y1, x1 + w_tpl, y1 + h_tpl)))
+        return found
+
+    def _check_sub_image(self,
+                         sub_index: int,
+                         screenshot_np: np.ndarray,
+                         search_regions: List[Tuple[int, int, int, int]],
+                         expected_tls: List[List[int]],
+                         image_storage_instance: Optional[ImageStorage], # type: ignore
+                         preprocessed_screenshot_np: Optional[np.ndarray] = None,
+                         batched_rects: Optional[List[Optional[Tuple[int, int, int, int]]]] = None,
+                         crop_cache: Optional[Dict[Tuple[frozenset, Tuple[int, int, int, int]], np.ndarray]] = None
+                         ) -> bool:
+        """
+        Finds sub-image sub_index near its expected position and checks the position tolerance.
+        If batched_rects is given, the already-computed match is used instead of searching.
+        """
+        sub_path = self._sub_paths[sub_index]
+        expected_sub_tl_x_in_capture, expected_sub_tl_y_in_capture = expected_tls[sub_index]
+
+        if batched_rects is not None:
+            sub_image_found_rect = batched_rects[sub_index]
+        else:
+            sub_image_found_rect = self._find_single_image(
+                screenshot_np,
+                sub_path,
+                self.sub_image_threshold,
+                self.sub_image_matching_method,
+                self.sub_image_pp_params,
+                image_storage_instance,
+                search_region_for_sub_image=search_regions[sub_index],
+                preprocessed_screenshot_np=preprocessed_screenshot_np,
+                preprocessing_key=self._sub_image_pp_key,
+                crop_cache=crop_cache
+            )
+
+        if sub_image_found_rect is None:
+            logger.debug(f"MultiImageCondition '{self.name}': Sub-image '{sub_path}' NOT found near expected relative position.")
+            return False
+        sub_actual_tl_x_in_capture, sub_actual_tl_y_in_capture, _, _ = sub_image_found_rect
+
+        if not (abs(sub_actual_tl_x_in_capture - expected_sub_tl_x_in_capture) <= self.position_tolerance_x and \
+                abs(sub_actual_tl_y_in_capture - expected_sub_tl_y_in_capture) <= self.position_tolerance_y):
+            logger.debug(f"MultiImageCondition '{self.name}': Sub-image '{sub_path}' found, but NOT within position tolerance. Expected TL:({expected_sub_tl_x_in_capture},{expected_sub_tl_y_in_capture}), Actual TL:({sub_actual_tl_x_in_capture},{sub_actual_tl_y_in_capture}), Tol:({self.position_tolerance_x},{self.position_tolerance_y})")
+            return False
+        logger.debug(f"MultiImageCondition '{self.name}': Sub-image '{sub_path}' found AND within position tolerance.")
+        return True
+
     def check(self, image_storage_instance: Optional[ImageStorage] = None, **context: Any) -> bool: # type: ignore
         if not super().check(**context): return False
-        if not _CV2Available or not _ImageProcessingAvailable: return False
+        if not _CV2Available or not _ImageProcessingAvailable or not _TemplateMatchingAvailable: return False
 
         # 1. Get the main screenshot
         region_x1 = self.params.get("region_x1", 0)
         region_y1 = self.params.get("region_y1", 0)
-        s_width, s_height = os_interaction_client.get_screen_size()
+        s_width, s_height = _get_screen_size_cached()
         region_x2 = self.params.get("region_x2", s_width)
         if region_x2 == -1: region_x2 = s_width
         region_y2 = self.params.get("region_y2", s_height)
@@ -492,6 +1104,12 @@ class MultiImageCondition(Condition):
         main_capture_offset_x = capture_result.get("x1", region_x1)
         main_capture_offset_y = capture_result.get("y1", region_y1)
 
+        # Preprocess the capture once; sub-images reuse it when they share the anchor's params and those are pixel-wise.
+        anchor_screenshot_processed = preprocess_for_image_matching(full_screenshot_np, self.anchor_pp_params)
+        if anchor_screenshot_processed is None or anchor_screenshot_processed.size == 0:
+            logger.debug("MultiImageCondition: Preprocessing failed for captured screenshot.")
+            return False
+
         # 2. Find Anchor Image (A4.1)
         anchor_found_rect = self._find_single_image(
             full_screenshot_np,
@@ -499,7 +1117,9 @@ class MultiImageCondition(Condition):
             self.anchor_threshold,
             self.anchor_matching_method,
             self.anchor_pp_params,
-            image_storage_instance
+            image_storage_instance,
+            preprocessed_screenshot_np=anchor_screenshot_processed,
+            preprocessing_key=self._anchor_pp_key
         )
 
         if anchor_found_rect is None:
@@ -530,40 +1150,41 @@ class MultiImageCondition(Condition):
             logger.debug(f"MultiImageCondition '{self.name}': Anchor found and no sub-images defined. Condition MET.")
             return True
 
-        for sub_def in self.sub_images_definitions:
-            sub_path = sub_def["path"]
-            offset_x = sub_def["offset_x_from_anchor"]
-            offset_y = sub_def["offset_y_from_anchor"]
-            expected_sub_tl_x_in_capture = anchor_top_left_x_in_capture + offset_x
-            expected_sub_tl_y_in_capture = anchor_top_left_y_in_capture + offset_y
-            search_radius_x = self.position_tolerance_x * 3 
-            search_radius_y = self.position_tolerance_y * 3
-            sub_search_x1 = expected_sub_tl_x_in_capture - search_radius_x
-            sub_search_y1 = expected_sub_tl_y_in_capture - search_radius_y
-            sub_search_x2 = expected_sub_tl_x_in_capture + search_radius_x 
-            sub_search_y2 = expected_sub_tl_y_in_capture + search_radius_y 
-
-
-            sub_image_found_rect = self._find_single_image(
-                full_screenshot_np, 
-                sub_path,
-                self.sub_image_threshold,
-                self.sub_image_matching_method,
-                self.sub_image_pp_params,
-                image_storage_instance,
-                search_region_for_sub_image=(sub_search_x1, sub_search_y1, sub_search_x2, sub_search_y2) # Pass the calculated sub-region
-            )
-
-            if sub_image_found_rect is None:
-                logger.debug(f"MultiImageCondition '{self.name}': Sub-image '{sub_path}' NOT found near expected relative position.")
-                return False 
-            sub_actual_tl_x_in_capture, sub_actual_tl_y_in_capture, _, _ = sub_image_found_rect
-            
-            if not (abs(sub_actual_tl_x_in_capture - expected_sub_tl_x_in_capture) <= self.position_tolerance_x and \
-                    abs(sub_actual_tl_y_in_capture - expected_sub_tl_y_in_capture) <= self.position_tolerance_y):
-                logger.debug(f"MultiImageCondition '{self.name}': Sub-image '{sub_path}' found, but NOT within position tolerance. Expected TL:({expected_sub_tl_x_in_capture},{expected_sub_tl_y_in_capture}), Actual TL:({sub_actual_tl_x_in_capture},{sub_actual_tl_y_in_capture}), Tol:({self.position_tolerance_x},{self.position_tolerance_y})")
-                return False
-            logger.debug(f"MultiImageCondition '{self.name}': Sub-image '{sub_path}' found AND within position tolerance.")
+        expected_sub_tls = self._sub_offsets + np.array([anchor_top_left_x_in_capture, anchor_top_left_y_in_capture], dtype=np.int32)
+        # All sub-search boxes, already clamped to the capture, in one vectorized pass.
+        sub_search_rects = _clamp_search_regions(np.hstack((expected_sub_tls - self._sub_search_radii, expected_sub_tls + self._sub_search_radii)),
+                                                 full_screenshot_np.shape)
+        sub_search_regions: List[Tuple[int, int, int, int]] = [tuple(region) for region in sub_search_rects.tolist()]
+        expected_sub_tl_list: List[List[int]] = expected_sub_tls.tolist()
+
+        sub_screenshot_processed = anchor_screenshot_processed if self._sub_reuses_anchor_frame else None
+        # (pp key, clamped region) -> preprocessed crop; only valid for this capture, so it lives for one check.
+        sub_crop_cache: Dict[Tuple[frozenset, Tuple[int, int, int, int]], np.ndarray] = {}
+
+        batched_sub_rects: Optional[List[Optional[Tuple[int, int, int, int]]]] = None
+        if self.sub_image_matching_method == "template":
+            batched_sub_rects = self._find_sub_images_batched(full_screenshot_np, sub_search_regions, image_storage_instance,
+                                                              preprocessed_screenshot_np=sub_screenshot_processed,
+                                                              crop_cache=sub_crop_cache)
+
+        check_sub_image = functools.partial(self._check_sub_image,
+                                            screenshot_np=full_screenshot_np,
+                                            search_regions=sub_search_regions,
+                                            expected_tls=expected_sub_tl_list,
+                                            image_storage_instance=image_storage_instance,
+                                            preprocessed_screenshot_np=sub_screenshot_processed,
+                                            batched_rects=batched_sub_rects,
+                                            crop_cache=sub_crop_cache)
+        sub_indices = range(len(self._sub_paths))
+        if batched_sub_rects is not None or len(self._sub_paths) == 1:
+            # Matching already happened (batched) or there is nothing to overlap.
+            if not all(check_sub_image(sub_index) for sub_index in sub_indices): return False
+        else:
+            futures = [_MATCH_POOL.submit(check_sub_image, sub_index) for sub_index in sub_indices]
+            for future in concurrent.futures.as_completed(futures):
+                if not future.result():
+                    for pending in futures: pending.cancel()
+                    return False
 
         logger.info(f"MultiImageCondition '{self.name}': All sub-images found in correct relative positions. Condition MET.")
         return True 
@@ -576,14 +1197,17 @@ class MultiImageCondition(Condition):
 
 class ImageOnScreenCondition(Condition):
     TYPE = "image_on_screen"
+    FEATURE_MATCH_RATIO = 0.75
+    STRONG_MATCH_MAX_HAMMING = 64  # ORB descriptor distance (of 256 bits) that counts as a strong match
 
     def __init__(self, params: Optional[Dict[str, Any]] = None, id: Optional[str] = None, name: Optional[str] = None,
                  is_monitored_by_ai_brain: bool = False) -> None:
         super().__init__(type=self.TYPE, params=params, id=id, name=name, is_monitored_by_ai_brain=is_monitored_by_ai_brain)
         if not self._is_valid: return
+        self._bind_region()
 
         if not _CV2Available: self._is_valid = False; self._validation_error = "OpenCV (cv2) is not available."; return
-        if not _ImageProcessingAvailable: self._is_valid = False; self._validation_error = "Image processing utilities are not available."; return
+        if not (_ImageProcessingAvailable and _TemplateMatchingAvailable): self._is_valid = False; self._validation_error = "Image processing utilities are not available."; return
 
         self.image_path_relative = str(self.params.get("image_path", "")).strip()
         if not self.image_path_relative: self._is_valid = False; self._validation_error = "Image path cannot be empty."; return
@@ -604,17 +1228,14 @@ class ImageOnScreenCondition(Condition):
              self.orb_nfeatures = 500; self.params["orb_nfeatures"] = 500
              self.min_feature_matches = 10; self.params["min_feature_matches"] = 10
              self.homography_inlier_ratio = 0.8; self.params["homography_inlier_ratio"] = 0.8
+        # Accept without RANSAC when there are at least 2x min_feature_matches strong matches.
+        self.skip_homography_if_strong_matches = bool(self.params.get("skip_homography_if_strong_matches", False))
+        self.params["skip_homography_if_strong_matches"] = self.skip_homography_if_strong_matches
 
         self.template_matching_method_str = str(self.params.get("template_matching_method", "TM_CCOEFF_NORMED"))
-        valid_tm_methods: Dict[str, Optional[int]] = {}
-        if _CV2Available:
-            valid_tm_methods = {
-                "TM_CCOEFF_NORMED": cv2.TM_CCOEFF_NORMED, "TM_CCORR_NORMED": cv2.TM_CCORR_NORMED,
-                "TM_SQDIFF_NORMED": cv2.TM_SQDIFF_NORMED
-            }
-        self.template_matching_method_cv2 = valid_tm_methods.get(self.template_matching_method_str)
+        self.template_matching_method_cv2 = _VALID_TM_METHODS.get(self.template_matching_method_str)
         if self.template_matching_method_cv2 is None:
-            self.template_matching_method_cv2 = valid_tm_methods.get("TM_CCOEFF_NORMED") if _CV2Available else None
+            self.template_matching_method_cv2 = _VALID_TM_METHODS.get("TM_CCOEFF_NORMED")
             self.params["template_matching_method"] = "TM_CCOEFF_NORMED"
 
         self.selection_strategy = str(self.params.get("selection_strategy", "first_found")).lower()
@@ -623,6 +1244,12 @@ class ImageOnScreenCondition(Condition):
             self.params["selection_strategy"] = "first_found"
         self.reference_point_for_closest_strategy = parse_tuple_str(str(self.params.get("reference_point_for_closest_strategy", "")), 2, int)
 
+        # Coarse-to-fine search depth for template matching (0 = always match at full resolution).
+        try:
+            self.pyramid_levels = int(self.params.get("pyramid_levels", 2))
+            self.pyramid_levels = max(0, min(PYRAMID_MAX_LEVELS, self.pyramid_levels)); self.params["pyramid_levels"] = self.pyramid_levels
+        except (ValueError, TypeError): self.pyramid_levels = 2; self.params["pyramid_levels"] = 2
+
         self.params.setdefault("grayscale", True); self.params.setdefault("binarization", False)
         self.params.setdefault("gaussian_blur", False); self.params.setdefault("gaussian_blur_kernel", "3,3")
         self.params.setdefault("median_blur", False); self.params.setdefault("median_blur_kernel", 3)
@@ -631,10 +1258,20 @@ class ImageOnScreenCondition(Condition):
         self.params.setdefault("bilateral_d", 9); self.params.setdefault("bilateral_sigma_color", 75.0)
         self.params.setdefault("bilateral_sigma_space", 75.0); self.params.setdefault("canny_edges", False)
         self.params.setdefault("canny_threshold1", 50.0); self.params.setdefault("canny_threshold2", 150.0)
+        # Template cache key: only the params preprocessing actually reads (not region, threshold, ...).
+        self._pp_key = _make_pp_key({k: self.params[k] for k in IMAGE_MATCHING_PARAM_KEYS if k in self.params})
+        # (screenshot digest, nfeatures) -> ORB (keypoints, descriptors) of the previous feature-mode poll.
+        self._last_scr_features: Tuple[Any, Any] = (None, None)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # cv2.KeyPoint objects cannot be copied/pickled; the screenshot feature cache just restarts empty.
+        state = self.__dict__.copy()
+        state["_last_scr_features"] = (None, None)
+        return state
 
     def check(self, image_storage_instance: Optional[ImageStorage] = None, last_click_position: Optional[Tuple[int,int]] = None, **context: Any) -> bool: # type: ignore
         if not super().check(**context): return False
-        if not _CV2Available or not _ImageProcessingAvailable or not self.image_path_relative: return False
+        if not _CV2Available or not _ImageProcessingAvailable or not _TemplateMatchingAvailable or not self.image_path_relative: return False
 
         template_full_path: Optional[str] = None; image_file_exists: bool = False
         if _UtilsImported and isinstance(image_storage_instance, ImageStorage):
@@ -654,35 +1291,35 @@ class ImageOnScreenCondition(Condition):
             return False
 
         try:
-            template_image_original = cv2.imread(template_full_path, cv2.IMREAD_UNCHANGED)
-            if template_image_original is None: logger.debug(f"cv2.imread failed for template '{template_full_path}'."); return False
-
-            template_image_processed = preprocess_for_image_matching(template_image_original, self.params)
-            if template_image_processed is None or template_image_processed.size == 0:
-                logger.debug(f"Preprocessing failed for template '{template_full_path}'.")
+            # Decoded + preprocessed once per (path, mtime, pp params); ORB features are cached alongside.
+            cached_template = _get_cached_template(template_full_path, self.params, pp_key=self._pp_key)
+            if cached_template is None:
+                logger.debug(f"Could not load/preprocess template '{template_full_path}'.")
                 return False
+            template_image_processed = cached_template.image
 
-            region_x1 = self.params.get("region_x1", 0); region_y1 = self.params.get("region_y1", 0)
-            region_x2 = self.params.get("region_x2", 100); region_y2 = self.params.get("region_y2", 100)
+            region_x1, region_y1, region_x2, region_y2 = self.region_x1, self.region_y1, self.region_x2, self.region_y2
 
             capture_result = os_interaction_client.capture_region(region_x1, region_y1, region_x2, region_y2, useGrayscale=False, useBinarization=False)
             screenshot_raw = capture_result.get("image_np")
             if screenshot_raw is None or screenshot_raw.shape[0] <= 0 or screenshot_raw.shape[1] <= 0:
                 logger.debug("Failed to capture screen region or captured empty image.")
                 return False
+            # Preprocessing keeps the image size, so a template that cannot fit is known before any filtering runs.
+            if self.matching_method == "template" and (template_image_processed.shape[0] > screenshot_raw.shape[0] or \
+               template_image_processed.shape[1] > screenshot_raw.shape[1]):
+                logger.debug("Template larger than captured screenshot. No match possible.")
+                return False
 
             screenshot_processed = preprocess_for_image_matching(screenshot_raw, self.params)
             if screenshot_processed is None or screenshot_processed.size == 0:
                 logger.debug("Preprocessing failed for captured screenshot.")
                 return False
+            screenshot_processed = to_matching_format(screenshot_processed, keep_color=_keeps_color(self.params))
             match_found_overall: bool = False
 
             if self.matching_method == "template":
                 if self.template_matching_method_cv2 is None: logger.debug("Template matching method (cv2 enum) is None."); return False
-                if template_image_processed.shape[0] > screenshot_processed.shape[0] or \
-                   template_image_processed.shape[1] > screenshot_processed.shape[1]:
-                    logger.debug("Template larger than screenshot after processing. No match possible.")
-                    return False
                 if template_image_processed.ndim != screenshot_processed.ndim:
                     logger.debug(f"Dimension mismatch: Template ({template_image_processed.ndim}D) vs Screen ({screenshot_processed.ndim}D).")
                     return False
@@ -691,30 +1328,27 @@ class ImageOnScreenCondition(Condition):
                     logger.debug(f"Channel mismatch: Template ({template_image_processed.shape[2]}ch) vs Screen ({screenshot_processed.shape[2]}ch).")
                     return False
                 try:
-                    result_matrix = cv2.matchTemplate(screenshot_processed, template_image_processed, self.template_matching_method_cv2)
-
-                    locations = []
-                    h, w = template_image_processed.shape[:2]
                     is_diff_method = self.template_matching_method_cv2 == cv2.TM_SQDIFF_NORMED
 
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result_matrix)
-                    match_value = min_val if is_diff_method else max_val
-                    loc = min_loc if is_diff_method else max_loc
-                    
-                    if (is_diff_method and match_value <= (1.0 - self.threshold)) or \
-                       (not is_diff_method and match_value >= self.threshold):
-                        locations.append({"x": loc[0], "y": loc[1], "width": w, "height": h, "score": match_value})
-                    if not locations:
-                        match_found_overall = False
+                    pyramid_levels = min(self.pyramid_levels, pyramid_levels_for(screenshot_processed.shape, template_image_processed.shape))
+                    if pyramid_levels > 0:
+                        match_value, loc = find_best_match_pyramid(screenshot_processed, cached_template.get_pyramid(pyramid_levels),
+                                                                   self.threshold, method=self.template_matching_method_cv2)
+                    elif self.selection_strategy == "first_found" and \
+                         tiled_search_worthwhile(screenshot_processed.shape, template_image_processed.shape):
+                        # Any hit will do: scan tiles in raster order and stop at the first one.
+                        match_value, loc = find_first_match_tiled(screenshot_processed, template_image_processed,
+                                                                  self.threshold, self.template_matching_method_cv2)
                     else:
-                        best_single_match = locations[0] 
+                        result_matrix = match_template(screenshot_processed, template_image_processed, self.template_matching_method_cv2,
+                                                       result_buffers=_get_thread_match_buffers(),
+                                                       template_stats=cached_template.get_fft_stats(self.template_matching_method_cv2))
+                        # Only the extreme the method needs; located only on a hit.
+                        match_value, loc = best_score_if_match(result_matrix, self.threshold, self.template_matching_method_cv2)
 
-                        if self.selection_strategy == "first_found":
-                            match_found_overall = True
-                        elif self.selection_strategy == "top_most":
-                            match_found_overall = True 
-                        else: 
-                             match_found_overall = True
+                    # One peak per search, so every selection strategy reduces to "found or not".
+                    match_found_overall = loc is not None and ((is_diff_method and match_value <= (1.0 - self.threshold)) or \
+                                                               (not is_diff_method and match_value >= self.threshold))
 
                     logger.debug(f"Template match: Method={self.template_matching_method_str}, BestVal={match_value:.4f}, Thresh={self.threshold:.2f}, Found={match_found_overall}")
                 except cv2.error as e_match: logger.warning(f"cv2.matchTemplate error: {e_match}"); return False
@@ -727,20 +1361,30 @@ class ImageOnScreenCondition(Condition):
                    screenshot_processed.shape[0] < min_dim_for_orb or screenshot_processed.shape[1] < min_dim_for_orb:
                     logger.debug("Images too small for ORB feature matching."); return False
                 try:
-                    orb = cv2.ORB_create(nfeatures=self.orb_nfeatures)
-                    kp1, des1 = orb.detectAndCompute(template_image_processed, None)
-                    kp2, des2 = orb.detectAndCompute(screenshot_processed, None)
+                    kp1, des1 = cached_template.get_features(self.orb_nfeatures)
+                    scr_key = (_image_digest(screenshot_processed), self.orb_nfeatures)
+                    last_key, last_features = self._last_scr_features
+                    if scr_key == last_key: kp2, des2 = last_features
+                    else:
+                        kp2, des2 = _get_thread_orb(self.orb_nfeatures).detectAndCompute(screenshot_processed, None)
+                        self._last_scr_features = (scr_key, (kp2, des2))
                     if des1 is None or des2 is None or len(kp1) < 2 or len(kp2) < 2 :
                         logger.debug(f"Not enough descriptors/keypoints. Tpl KP: {len(kp1)}, Scr KP: {len(kp2)}"); return False
-                    bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-                    matches = bf.match(des1, des2); matches = sorted(matches, key=lambda x: x.distance)
+                    # Lowe's ratio test on the 2 nearest neighbours rejects ambiguous matches before RANSAC sees them.
+                    knn_matches = _get_thread_bf_matcher(cross_check=False).knnMatch(des1, des2, k=2)
+                    matches = [pair[0] for pair in knn_matches
+                               if len(pair) == 2 and pair[0].distance < self.FEATURE_MATCH_RATIO * pair[1].distance]
                     good_matches_count = len(matches)
                     if good_matches_count >= self.min_feature_matches:
-                        if good_matches_count >= 4: 
-                            src_pts = np.float32([ kp1[m.queryIdx].pt for m in matches ]).reshape(-1,1,2); dst_pts = np.float32([ kp2[m.trainIdx].pt for m in matches ]).reshape(-1,1,2)
+                        strong_count = sum(1 for m in matches if m.distance < self.STRONG_MATCH_MAX_HAMMING) if self.skip_homography_if_strong_matches else 0
+                        if strong_count >= 2 * self.min_feature_matches:
+                            match_found_overall = True
+                            logger.debug(f"Feature match: {strong_count} strong matches (>= 2x min {self.min_feature_matches}), homography skipped. Found=True")
+                        elif good_matches_count >= 4: 
+                            src_pts, dst_pts = _matched_points(kp1, kp2, matches)
                             M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
                             if M is not None and mask is not None:
-                                inliers_count = np.sum(mask); min_inliers_required = max(4, int(good_matches_count * self.homography_inlier_ratio));
+                                inliers_count = cv2.countNonZero(mask); min_inliers_required = max(4, int(good_matches_count * self.homography_inlier_ratio));
                                 match_found_overall = inliers_count >= min_inliers_required
                                 logger.debug(f"Feature match: GoodMatches={good_matches_count}, Inliers={inliers_count} (Req based on ratio: {min_inliers_required}), Found={match_found_overall}")
                             else: match_found_overall = False; logger.debug("Feature match: Homography failed.")
@@ -771,9 +1415,10 @@ class TextOnScreenCondition(Condition):
     def __init__(self, params: Optional[Dict[str, Any]] = None, id: Optional[str] = None, name: Optional[str] = None, is_monitored_by_ai_brain: bool = False) -> None:
         super().__init__(type=self.TYPE, params=params, id=id, name=name, is_monitored_by_ai_brain=is_monitored_by_ai_brain)
         if not self._is_valid: return
+        self._bind_region()
 
-        if not (_CV2Available and _PytesseractAvailable and _ImageProcessingAvailable):
-            self._is_valid = False; self._validation_error = "Missing dependencies for TextOnScreen (OpenCV, Pytesseract, or ImageProcessing)."; return
+        if not (_CV2Available and _OCRLibraryImported and _ImageProcessingAvailable):
+            self._is_valid = False; self._validation_error = "Missing dependencies for TextOnScreen (OpenCV, tesserocr/Pytesseract, or ImageProcessing)."; return
 
         self.target_text = str(self.params.get("target_text", "")).strip()
         self.case_sensitive = bool(self.params.get("case_sensitive", False))
@@ -789,6 +1434,13 @@ class TextOnScreenCondition(Condition):
         if not self.target_text and not self.use_regex:
             self._is_valid = False; self._validation_error = "Target text cannot be empty unless 'Use Regex' is enabled."
             return
+        self._compiled_regex: Optional[re.Pattern] = None
+        # Plain-text needle, casefolded once unless the search is case-sensitive.
+        self._needle = self.target_text if self.case_sensitive else self.target_text.casefold()
+        if self.use_regex:
+            try: self._compiled_regex = re.compile(self.target_text, flags=0 if self.case_sensitive else re.IGNORECASE)
+            except re.error as e_regex:
+                self._is_valid = False; self._validation_error = f"Invalid regex '{self.target_text}': {e_regex}"; return
 
         try:
             psm_int = int(self.ocr_psm)
@@ -816,15 +1468,17 @@ class TextOnScreenCondition(Condition):
         self.params.setdefault("bilateral_d", 5); self.params.setdefault("bilateral_sigma_color", 75.0);
         self.params.setdefault("bilateral_sigma_space", 75.0)
         self.params.pop("canny_edges", None); self.params.pop("canny_threshold1", None); self.params.pop("canny_threshold2", None)
+        # (capture digest, user words file) -> recognized text of the previous poll; a static region skips OCR.
+        self._last_ocr: Tuple[Any, str] = (None, "")
+        self._user_words = _UserWordsResolver()
 
 
     def check(self, image_storage_instance: Optional[ImageStorage] = None, **context: Any) -> bool: # type: ignore
         if not super().check(**context): return False
-        if not (_CV2Available and _PytesseractAvailable and _ImageProcessingAvailable): return False
+        if not (_CV2Available and _ImageProcessingAvailable and _ensure_tesseract()): return False
 
         try:
-            region_x1 = self.params.get("region_x1", 0); region_y1 = self.params.get("region_y1", 0)
-            region_x2 = self.params.get("region_x2", 100); region_y2 = self.params.get("region_y2", 100)
+            region_x1, region_y1, region_x2, region_y2 = self.region_x1, self.region_y1, self.region_x2, self.region_y2
 
             capture_result = os_interaction_client.capture_region(region_x1, region_y1, region_x2, region_y2, useGrayscale=False, useBinarization=False)
             screenshot_raw = capture_result.get("image_np")
@@ -832,65 +1486,35 @@ class TextOnScreenCondition(Condition):
                 logger.debug("TextOnScreen: Failed to capture screen region or captured empty image.")
                 return False
 
-            screenshot_processed_for_ocr = preprocess_for_ocr(screenshot_raw, self.params)
-            if screenshot_processed_for_ocr is None or screenshot_processed_for_ocr.size == 0:
-                logger.debug("TextOnScreen: Preprocessing for OCR failed.")
-                return False
-
-            img_pil_for_ocr: Optional[Image.Image] = None
-            try:
-                 if screenshot_processed_for_ocr.ndim == 3:
-                     img_pil_for_ocr = Image.fromarray(cv2.cvtColor(screenshot_processed_for_ocr, cv2.COLOR_BGR2RGB))
-                 elif screenshot_processed_for_ocr.ndim == 2:
-                     img_pil_for_ocr = Image.fromarray(screenshot_processed_for_ocr, 'L')
-                 else: logger.debug(f"TextOnScreen: Processed image has unsupported dimensions ({screenshot_processed_for_ocr.ndim})."); return False
-            except Exception as e_pil: logger.error(f"TextOnScreen: Error converting processed numpy to PIL Image: {e_pil}"); return False
-
-            if img_pil_for_ocr is None: logger.debug("TextOnScreen: PIL image conversion resulted in None."); return False
-
-            tesseract_config_parts = [f'--psm {self.ocr_psm}', '--oem 3', f'-l {self.ocr_language}']
-            if self.ocr_char_whitelist: tesseract_config_parts.append(f'-c tessedit_char_whitelist={self.ocr_char_whitelist}')
-
+            user_words_file: Optional[str] = None
             if self.user_words_file_path:
-                full_user_words_path = ""
-                if image_storage_instance and isinstance(image_storage_instance, ImageStorage):
-                    try: full_user_words_path = image_storage_instance.get_full_path(self.user_words_file_path)
-                    except Exception: full_user_words_path = os.path.abspath(self.user_words_file_path)
-                else: full_user_words_path = os.path.abspath(self.user_words_file_path)
-
-                if os.path.exists(full_user_words_path) and os.path.isfile(full_user_words_path):
-                    tesseract_config_parts.append(f'-c tessedit_user_words_file="{full_user_words_path}"')
-                    logger.debug(f"TextOnScreen: Using user words file: {full_user_words_path}")
-                else:
-                    logger.warning(f"TextOnScreen: User words file specified but not found: '{self.user_words_file_path}' (Resolved: '{full_user_words_path}')")
+                user_words_file = self._user_words.resolve(self.user_words_file_path, image_storage_instance, "TextOnScreen")
 
-            tesseract_config_str = " ".join(tesseract_config_parts)
-            logger.debug(f"TextOnScreen: Tesseract config: '{tesseract_config_str}'")
+            ocr_key = (_image_digest(screenshot_raw), user_words_file)
+            last_key, last_text = self._last_ocr
+            if ocr_key == last_key:
+                recognized_text_cleaned = last_text
+                logger.debug("TextOnScreen: Region unchanged since last poll, reusing OCR result.")
+            else:
+                screenshot_processed_for_ocr = preprocess_for_ocr(screenshot_raw, self.params)
+                if screenshot_processed_for_ocr is None or screenshot_processed_for_ocr.size == 0:
+                    logger.debug("TextOnScreen: Preprocessing for OCR failed.")
+                    return False
+                if screenshot_processed_for_ocr.ndim not in (2, 3):
+                    logger.debug(f"TextOnScreen: Processed image has unsupported dimensions ({screenshot_processed_for_ocr.ndim})."); return False
 
-            recognized_text = pytesseract.image_to_string(img_pil_for_ocr, config=tesseract_config_str)
-            recognized_text_cleaned = recognized_text.strip()
+                recognized_text_cleaned = _run_ocr(screenshot_processed_for_ocr, self.ocr_language, self.ocr_psm, self.ocr_char_whitelist, user_words_file).strip()
+                self._last_ocr = (ocr_key, recognized_text_cleaned)
             logger.debug(f"TextOnScreen: Recognized text (cleaned): '{recognized_text_cleaned[:100]}{'...' if len(recognized_text_cleaned)>100 else ''}'")
 
-            target_to_check = self.target_text
-            text_to_search_in = recognized_text_cleaned
-            match_flags = 0 if self.case_sensitive else re.IGNORECASE
-
-            if self.use_regex:
-                try:
-                    match_result = bool(re.search(target_to_check, text_to_search_in, flags=match_flags))
-                    logger.debug(f"TextOnScreen: Regex search for '{target_to_check}' in text. Result: {match_result}")
-                    return match_result
-                except re.error as e_regex:
-                    logger.warning(f"TextOnScreen: Invalid regex '{target_to_check}': {e_regex}. Condition returns False.")
-                    return False
-            else:
-                if not self.case_sensitive:
-                    found = target_to_check.lower() in text_to_search_in.lower()
-                else:
-                    found = target_to_check in text_to_search_in
-                logger.debug(f"TextOnScreen: Plain text search for '{target_to_check}' (CaseSensitive={self.case_sensitive}). Result: {found}")
-                return found
-        except pytesseract.TesseractNotFoundError:
+            if self._compiled_regex is not None:
+                match_result = self._compiled_regex.search(recognized_text_cleaned) is not None
+                logger.debug(f"TextOnScreen: Regex search for '{self.target_text}' in text. Result: {match_result}")
+                return match_result
+            found = self._needle in (recognized_text_cleaned if self.case_sensitive else recognized_text_cleaned.casefold())
+            logger.debug(f"TextOnScreen: Plain text search for '{self.target_text}' (CaseSensitive={self.case_sensitive}). Result: {found}")
+            return found
+        except _TesseractNotFoundError:
             logger.error("TextOnScreen: Tesseract not found. Ensure it's installed and in PATH or tesseract_cmd is set.")
             return False
         except Exception as e_check_ocr:
@@ -907,6 +1531,9 @@ class TextOnScreenCondition(Condition):
 
 class ColorAtPositionCondition(Condition):
     TYPE = "color_at_position"
+    # A bounding-box capture only beats one GetPixelColor round-trip per pixel while the box stays small relative
+    # to the number of pixels read from it; the allowed area grows by this many pixels per condition in the batch.
+    BATCH_CAPTURE_AREA_PER_PIXEL = 64 * 64
 
     def __init__(self, params: Optional[Dict[str, Any]] = None, id: Optional[str] = None, name: Optional[str] = None, is_monitored_by_ai_brain: bool = False) -> None:
         super().__init__(type=self.TYPE, params=params, id=id, name=name, is_monitored_by_ai_brain=is_monitored_by_ai_brain)
@@ -930,6 +1557,7 @@ class ColorAtPositionCondition(Condition):
             self.target_color_hex = str(self.params.get("color_hex", "#000000")).strip()
             self.target_color_rgb = hex_to_rgb(self.target_color_hex)
             self.params["color_hex"] = rgb_to_hex(self.target_color_rgb)
+            self._target_rgb_np = np.array(self.target_color_rgb, dtype=np.int16)
 
             self.tolerance = int(self.params.get("tolerance", 0))
             self.tolerance = max(0, min(765, self.tolerance)); self.params["tolerance"] = self.tolerance
@@ -949,11 +1577,10 @@ class ColorAtPositionCondition(Condition):
                 logger.debug(f"ColorAtPosition: get_pixel_color returned None for ({self.abs_color_x},{self.abs_color_y}).")
                 return False
 
-            actual_color_rgb = hex_to_rgb(actual_color_hex)
-            dist = abs(actual_color_rgb[0] - self.target_color_rgb[0]) + \
-                   abs(actual_color_rgb[1] - self.target_color_rgb[1]) + \
-                   abs(actual_color_rgb[2] - self.target_color_rgb[2])
-            
+            r, g, b = _hex_to_rgb_fast(actual_color_hex)
+            tr, tg, tb = self.target_color_rgb
+            dist = abs(r - tr) + abs(g - tg) + abs(b - tb)
+
             is_match = dist <= self.tolerance
             logger.debug(f"ColorAtPosition ({self.abs_color_x},{self.abs_color_y}): Target={self.target_color_hex}, Actual={actual_color_hex}, Dist={dist}, Tol={self.tolerance}, Match={is_match}")
             return is_match
@@ -962,6 +1589,51 @@ class ColorAtPositionCondition(Condition):
             logger.error(f"ColorAtPosition: Error during check for '{self.name}': {e_check_color}", exc_info=True)
             return False
 
+    @classmethod
+    def batch_check(cls, conditions: List['ColorAtPositionCondition'], capture_fn: Optional[Callable[..., Dict[str, Any]]] = None, **context: Any) -> Dict[str, bool]:
+        """
+        Checks many color conditions against one capture of their coordinates' bounding box instead of one
+        get_pixel_color round-trip each. capture_fn defaults to os_interaction_client.capture_region.
+        Falls back to per-condition check() when the box exceeds BATCH_CAPTURE_AREA_PER_PIXEL per condition or the capture fails. Returns {id: result}.
+        """
+        results: Dict[str, bool] = {}
+        pending = []
+        for cond in conditions:
+            if cond._is_valid and _BridgeImported and _UtilsImported: pending.append(cond)
+            else: results[cond.id] = cond.check(**context)
+        if not pending: return results
+
+        xs = np.fromiter((c.abs_color_x for c in pending), dtype=np.int64, count=len(pending))
+        ys = np.fromiter((c.abs_color_y for c in pending), dtype=np.int64, count=len(pending))
+        x1, y1, x2, y2 = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+        img = None
+        if len(pending) > 1 and (x2 - x1) * (y2 - y1) <= len(pending) * cls.BATCH_CAPTURE_AREA_PER_PIXEL:
+            try:
+                capture = (capture_fn or os_interaction_client.capture_region)(x1, y1, x2, y2)
+                img = capture.get("image_np") if isinstance(capture, dict) else None
+                if img is not None and img.ndim == 3 and img.shape[2] >= 3:
+                    x1 = int(capture.get("x1", x1)); y1 = int(capture.get("y1", y1))
+                else: img = None
+            except Exception as e_capture:
+                logger.warning(f"ColorAtPosition.batch_check: Capture of ({x1},{y1})-({x2},{y2}) failed, checking individually: {e_capture}")
+                img = None
+        if img is None:
+            for cond in pending: results[cond.id] = cond.check(**context)
+            return results
+
+        rows = ys - y1; cols = xs - x1
+        inside = (rows >= 0) & (rows < img.shape[0]) & (cols >= 0) & (cols < img.shape[1])
+        pixels_rgb = img[rows[inside], cols[inside], 2::-1].astype(np.int16)  # capture is BGR(A)
+        targets = np.stack([c._target_rgb_np for c, ok in zip(pending, inside) if ok]) if inside.any() else np.empty((0, 3), np.int16)
+        dists = np.abs(pixels_rgb - targets).sum(axis=-1)
+        dist_iter = iter(dists.tolist())
+        for cond, ok in zip(pending, inside.tolist()):
+            if not ok: results[cond.id] = cond.check(**context); continue
+            dist = next(dist_iter)
+            results[cond.id] = dist <= cond.tolerance
+            logger.debug(f"ColorAtPosition (batch) ({cond.abs_color_x},{cond.abs_color_y}): Target={cond.target_color_hex}, Dist={dist}, Tol={cond.tolerance}, Match={results[cond.id]}")
+        return results
+
     def __str__(self) -> str:
         coords = f"({getattr(self,'abs_color_x','?')},{getattr(self,'abs_color_y','?')})"
         hex_val = getattr(self,'target_color_hex','?')
@@ -1026,6 +1698,13 @@ class ProcessExistsCondition(Condition):
         return f"'{self.name}' (Process: '{self.params.get('process_name', '')}'){ai_monitored_str}"
 
 
+# relative_to_corner -> ((a, b, d) for x, (a, b, d) for y): the anchor coordinate is (a*c1 + b*c2) // d.
+_RELATIVE_CORNER_WEIGHTS: Dict[str, Tuple[Tuple[int, int, int], Tuple[int, int, int]]] = {
+    "top_left": ((1, 0, 1), (1, 0, 1)), "top_right": ((0, 1, 1), (1, 0, 1)),
+    "bottom_left": ((1, 0, 1), (0, 1, 1)), "bottom_right": ((0, 1, 1), (0, 1, 1)),
+    "center": ((1, 1, 2), (1, 1, 2)),
+}
+
 class TextInRelativeRegionCondition(Condition):
     TYPE = "text_in_relative_region"
 
@@ -1034,7 +1713,7 @@ class TextInRelativeRegionCondition(Condition):
         super().__init__(type=self.TYPE, params=params, id=id, name=name, is_monitored_by_ai_brain=is_monitored_by_ai_brain)
         if not self._is_valid: return
 
-        if not (_CV2Available and _PytesseractAvailable and _ImageProcessingAvailable and _BridgeImported):
+        if not (_CV2Available and _OCRLibraryImported and _ImageProcessingAvailable and _BridgeImported):
             self._is_valid = False; self._validation_error = "Missing dependencies for TextInRelativeRegion."; return
 
         self.anchor_image_path = str(self.params.get("anchor_image_path", "")).strip()
@@ -1044,11 +1723,23 @@ class TextInRelativeRegionCondition(Condition):
         try: self.anchor_threshold = float(self.params.get("anchor_threshold", 0.8)); self.params["anchor_threshold"] = max(0.0, min(1.0, self.anchor_threshold))
         except (ValueError, TypeError): self.anchor_threshold = 0.8; self.params["anchor_threshold"] = 0.8
         self.params.setdefault("anchor_pp_grayscale", True)
+        # Coarse-to-fine anchor search depth (0 = always match at full resolution).
+        try:
+            self.anchor_pyramid_levels = int(self.params.get("anchor_pyramid_levels", 1))
+            self.anchor_pyramid_levels = max(0, min(PYRAMID_MAX_LEVELS, self.anchor_pyramid_levels)); self.params["anchor_pyramid_levels"] = self.anchor_pyramid_levels
+        except (ValueError, TypeError): self.anchor_pyramid_levels = 1; self.params["anchor_pyramid_levels"] = 1
 
         self.text_to_find = str(self.params.get("text_to_find", "")).strip()
         self.ocr_use_regex = bool(self.params.get("ocr_use_regex", False))
         if not self.text_to_find and not self.ocr_use_regex: self._is_valid = False; self._validation_error = "Text to find (or Regex) is required."; return
         self.ocr_case_sensitive = bool(self.params.get("ocr_case_sensitive", False))
+        self._compiled_regex: Optional[re.Pattern] = None
+        # Plain-text needle, casefolded once unless the search is case-sensitive.
+        self._needle = self.text_to_find if self.ocr_case_sensitive else self.text_to_find.casefold()
+        if self.ocr_use_regex:
+            try: self._compiled_regex = re.compile(self.text_to_find, flags=0 if self.ocr_case_sensitive else re.IGNORECASE)
+            except re.error as e_regex:
+                self._is_valid = False; self._validation_error = f"Invalid regex '{self.text_to_find}': {e_regex}"; return
         self.ocr_language = str(self.params.get("ocr_language", "eng")).strip() or "eng"; self.params["ocr_language"] = self.ocr_language
         self.ocr_psm = str(self.params.get("ocr_psm", "6")).strip() or "6"; self.params["ocr_psm"] = self.ocr_psm
         self.ocr_char_whitelist = str(self.params.get("ocr_char_whitelist", "")).strip() or None
@@ -1058,6 +1749,10 @@ class TextInRelativeRegionCondition(Condition):
         if self.ocr_user_words_file_path is not None: self.params["ocr_user_words_file_path"] = self.ocr_user_words_file_path
         else: self.params.pop("ocr_user_words_file_path", None)
         self.params.setdefault("ocr_pp_grayscale", True)
+        # Preprocessing params are fixed per condition: split out once, with the anchor's template cache key.
+        self._anchor_pp_params = {k.replace("anchor_pp_", ""): v for k,v in self.params.items() if k.startswith("anchor_pp_")}
+        self._anchor_pp_key = _make_pp_key(self._anchor_pp_params)
+        self._ocr_pp_params = {k.replace("ocr_pp_", ""): v for k,v in self.params.items() if k.startswith("ocr_pp_")}
 
         try:
             self.relative_x_offset = int(self.params.get("relative_x_offset", 0))
@@ -1068,32 +1763,68 @@ class TextInRelativeRegionCondition(Condition):
             if self.relative_height <= 0: self._is_valid = False; self._validation_error = "Relative height must be positive."; return
         except (ValueError, TypeError): self._is_valid = False; self._validation_error = "Relative region dimensions/offsets must be integers."; return
         self.relative_to_corner = str(self.params.get("relative_to_corner", "top_left")).lower()
-        if self.relative_to_corner not in ["top_left", "top_right", "bottom_left", "bottom_right", "center"]:
+        if self.relative_to_corner not in _RELATIVE_CORNER_WEIGHTS:
             self.relative_to_corner = "top_left"; self.params["relative_to_corner"] = "top_left"
-
-    def _find_anchor_image(self, screenshot_np: np.ndarray, image_storage_instance: Optional[ImageStorage]) -> Optional[Tuple[int, int, int, int]]: # type: ignore
-        if not self.anchor_image_path or not _CV2Available: return None
-
-        anchor_full_path: Optional[str] = None
+        # OCR origin = (a*anchor_x1 + b*anchor_x2) // d + offset (same for y): weights per corner, so check() does no string compares.
+        self._corner_x_weights, self._corner_y_weights = _RELATIVE_CORNER_WEIGHTS[self.relative_to_corner]
+        # (frame key, decision, anchor+OCR bounds) of the previous poll; an identical frame with the same anchor file and OCR target skips anchor search and OCR.
+        self.enable_frame_cache = bool(self.params.get("enable_frame_cache", True)); self.params["enable_frame_cache"] = self.enable_frame_cache
+        self._last_frame: Tuple[Any, bool, Optional[Tuple[int, int, int, int]]] = (None, False, None)
+        # Pixels captured around the last anchor + OCR region on the next poll (-1 = always capture the whole search region).
+        try: self.capture_margin = int(self.params.get("capture_margin", 64)); self.params["capture_margin"] = self.capture_margin
+        except (ValueError, TypeError): self.capture_margin = 64; self.params["capture_margin"] = 64
+        # Only ever replaced whole (one attribute store), since the observer and job threads may check concurrently.
+        self._last_roi_abs: Optional[Tuple[int, int, int, int]] = None
+        self._user_words = _UserWordsResolver()
+        # Per-thread grayscale buffers for the anchor search and OCR crop, reallocated only when the capture size changes.
+        self._scratch_local = threading.local()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # threading.local cannot be copied/pickled; the scratch buffers are rebuilt lazily.
+        state = self.__dict__.copy()
+        state["_scratch_local"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._scratch_local = threading.local()
+
+    def _gray_scratch(self, name: str, image_np: np.ndarray) -> Optional[np.ndarray]:
+        """The calling thread's (H, W) uint8 buffer called name for a grayscale conversion of image_np, or None if it is not color."""
+        if image_np.ndim != 3: return None
+        shape = image_np.shape[:2]
+        buffer = getattr(self._scratch_local, name, None)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            setattr(self._scratch_local, name, buffer)
+        return buffer
+
+    def _resolve_anchor_path(self, image_storage_instance: Optional[ImageStorage]) -> Optional[str]:
+        if not self.anchor_image_path: return None
         if _UtilsImported and isinstance(image_storage_instance, ImageStorage):
-            try: anchor_full_path = image_storage_instance.get_full_path(self.anchor_image_path)
-            except Exception: anchor_full_path = os.path.abspath(self.anchor_image_path)
-        else: anchor_full_path = os.path.abspath(self.anchor_image_path)
-
-        if not (anchor_full_path and os.path.exists(anchor_full_path)):
-            logger.debug(f"TextInRelativeRegion: Anchor image '{self.anchor_image_path}' not found at '{anchor_full_path}'."); return None
-
-        anchor_tpl_original = cv2.imread(anchor_full_path, cv2.IMREAD_UNCHANGED)
-        if anchor_tpl_original is None: logger.debug(f"TextInRelativeRegion: Failed to load anchor template '{anchor_full_path}'."); return None
-
-        anchor_pp_params = {k.replace("anchor_pp_", ""): v for k,v in self.params.items() if k.startswith("anchor_pp_")}
-        if not anchor_pp_params: anchor_pp_params = {"grayscale": self.params.get("anchor_pp_grayscale", True)}
-
-        anchor_tpl_processed = preprocess_for_image_matching(anchor_tpl_original, anchor_pp_params)
-        if anchor_tpl_processed is None or anchor_tpl_processed.size == 0: logger.debug("TextInRelativeRegion: Anchor template preprocessing failed."); return None
-
-        screenshot_for_anchor_match = preprocess_for_image_matching(screenshot_np.copy(), anchor_pp_params)
+            try: return image_storage_instance.get_full_path(self.anchor_image_path)
+            except Exception: pass
+        return os.path.abspath(self.anchor_image_path)
+
+    def _ocr_target_key(self, image_storage_instance: Optional[ImageStorage]) -> Tuple[Any, ...]:
+        """Everything besides the pixels and the anchor file that decides the result of one frame."""
+        return (self.text_to_find, self.ocr_use_regex, self.ocr_case_sensitive, self.ocr_language, self.ocr_psm, self.ocr_char_whitelist,
+                self.ocr_user_words_file_path, id(image_storage_instance), _make_pp_key(self._ocr_pp_params), self.anchor_threshold,
+                self.relative_x_offset, self.relative_y_offset, self.relative_width, self.relative_height, self.relative_to_corner)
+
+    def _find_anchor_image(self, screenshot_np: np.ndarray, anchor_full_path: Optional[str], anchor_mtime_ns: Optional[int]) -> Optional[Tuple[int, int, int, int]]: # type: ignore
+        if not anchor_full_path or not _CV2Available: return None
+
+        anchor_pp_params = self._anchor_pp_params
+        # Decoded and preprocessed once per (path, mtime, pp params) in the shared template cache; its stat doubles as the existence check.
+        cached_anchor = _get_cached_template(anchor_full_path, anchor_pp_params, anchor_mtime_ns, pp_key=self._anchor_pp_key)
+        if cached_anchor is None: logger.debug(f"TextInRelativeRegion: Anchor image '{self.anchor_image_path}' missing or unreadable at '{anchor_full_path}'."); return None
+        anchor_tpl_processed = cached_anchor.image
+
+        # preprocess_for_image_matching never writes into its input, so the capture is passed without a copy.
+        screenshot_for_anchor_match = preprocess_for_image_matching(screenshot_np, anchor_pp_params, gray_dst=self._gray_scratch("anchor_gray", screenshot_np))
         if screenshot_for_anchor_match is None or screenshot_for_anchor_match.size == 0: logger.debug("TextInRelativeRegion: Screenshot preprocessing for anchor failed."); return None
+        screenshot_for_anchor_match = to_matching_format(screenshot_for_anchor_match, keep_color=_keeps_color(anchor_pp_params))
 
         if anchor_tpl_processed.shape[0] > screenshot_for_anchor_match.shape[0] or anchor_tpl_processed.shape[1] > screenshot_for_anchor_match.shape[1]:
             logger.debug("TextInRelativeRegion: Anchor template larger than screenshot. No match possible."); return None
@@ -1103,8 +1834,16 @@ class TextInRelativeRegionCondition(Condition):
             logger.debug(f"TextInRelativeRegion: Anchor/Screen channel mismatch. Tpl:{anchor_tpl_processed.shape[2]}ch, Scr:{screenshot_for_anchor_match.shape[2]}ch"); return None
 
         try:
-            result = cv2.matchTemplate(screenshot_for_anchor_match, anchor_tpl_processed, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            pyramid_levels = min(self.anchor_pyramid_levels, pyramid_levels_for(screenshot_for_anchor_match.shape, anchor_tpl_processed.shape))
+            if cuda_match_worthwhile(screenshot_for_anchor_match, anchor_tpl_processed):
+                # Exact full-resolution NCC on the GPU; the anchor stays resident on the device between checks.
+                max_val, max_loc = find_best_match_cuda(screenshot_for_anchor_match, anchor_tpl_processed, cv2.TM_CCOEFF_NORMED, cached_anchor.get_gpu_image())
+            elif pyramid_levels > 0:
+                # Search the downsampled capture, then refine in a small full-resolution window.
+                max_val, max_loc = find_best_match_pyramid(screenshot_for_anchor_match, cached_anchor.get_pyramid(pyramid_levels), self.anchor_threshold)
+            else:
+                result = cv2.matchTemplate(screenshot_for_anchor_match, anchor_tpl_processed, cv2.TM_CCOEFF_NORMED)
+                _, max_val, _, max_loc = cv2.minMaxLoc(result)
             if max_val >= self.anchor_threshold:
                 h, w = anchor_tpl_processed.shape[:2]
                 top_left_x, top_left_y = max_loc
@@ -1118,6 +1857,7 @@ class TextInRelativeRegionCondition(Condition):
 
     def check(self, image_storage_instance: Optional[ImageStorage] = None, **context: Any) -> bool: # type: ignore
         if not super().check(**context): return False
+        if not _ensure_tesseract(): logger.debug("TextInRelativeRegion: Tesseract OCR is unavailable."); return False
 
         screen_region_x1 = self.params.get("region_x1", 0)
         screen_region_y1 = self.params.get("region_y1", 0)
@@ -1126,7 +1866,7 @@ class TextInRelativeRegionCondition(Condition):
 
         if screen_region_x2 == -1 or screen_region_y2 == -1:
             try:
-                s_width, s_height = os_interaction_client.get_screen_size()
+                s_width, s_height = _get_screen_size_cached()
                 if screen_region_x2 == -1: screen_region_x2 = s_width
                 if screen_region_y2 == -1: screen_region_y2 = s_height
             except Exception as e_scr_size:
@@ -1138,24 +1878,66 @@ class TextInRelativeRegionCondition(Condition):
             logger.warning(f"TextInRelativeRegion: Invalid overall search region after defaults/screen size. ({screen_region_x1},{screen_region_y1})-({screen_region_x2},{screen_region_y2})")
             return False
 
-        capture_result = os_interaction_client.capture_region(screen_region_x1, screen_region_y1, screen_region_x2, screen_region_y2)
+        last_roi_abs = self._last_roi_abs # Read once: another thread may replace it meanwhile.
+        if self.capture_margin >= 0 and last_roi_abs is not None:
+            # Capture only around where the anchor + OCR region were last seen; fall back to the full region if the anchor moved out.
+            roi_x1, roi_y1, roi_x2, roi_y2 = last_roi_abs
+            narrow_x1 = max(screen_region_x1, roi_x1 - self.capture_margin); narrow_y1 = max(screen_region_y1, roi_y1 - self.capture_margin)
+            narrow_x2 = min(screen_region_x2, roi_x2 + self.capture_margin); narrow_y2 = min(screen_region_y2, roi_y2 + self.capture_margin)
+            if narrow_x2 > narrow_x1 and narrow_y2 > narrow_y1 and \
+               (narrow_x1, narrow_y1, narrow_x2, narrow_y2) != (screen_region_x1, screen_region_y1, screen_region_x2, screen_region_y2):
+                outcome = self._capture_and_check(narrow_x1, narrow_y1, narrow_x2, narrow_y2, image_storage_instance)
+                if outcome is not None and outcome[1] is not None:
+                    self._last_roi_abs = outcome[1]
+                    return outcome[0]
+                logger.debug("TextInRelativeRegion: Anchor not in the narrowed capture, retrying with the full search region.")
+
+        outcome = self._capture_and_check(screen_region_x1, screen_region_y1, screen_region_x2, screen_region_y2, image_storage_instance)
+        if outcome is None:
+            self._last_roi_abs = None
+            logger.debug("TextInRelativeRegion: Failed to capture main screen area."); return False
+        result, self._last_roi_abs = outcome
+        return result
+
+    def _capture_and_check(self, x1: int, y1: int, x2: int, y2: int, image_storage_instance: Optional[ImageStorage]) -> Optional[Tuple[bool, Optional[Tuple[int, int, int, int]]]]:
+        """
+        Captures (x1,y1)-(x2,y2) and evaluates it. Returns (result, screen bounds of anchor + OCR region or None
+        when the anchor was not found), or None if the capture failed.
+        """
+        capture_result = os_interaction_client.capture_region(x1, y1, x2, y2)
         full_screenshot_np = capture_result.get("image_np")
-        if full_screenshot_np is None or full_screenshot_np.size == 0: logger.debug("TextInRelativeRegion: Failed to capture main screen area."); return False
-
-        anchor_bounds_in_screenshot = self._find_anchor_image(full_screenshot_np, image_storage_instance)
-        if anchor_bounds_in_screenshot is None: logger.debug("TextInRelativeRegion: Anchor image not found."); return False
+        if full_screenshot_np is None or full_screenshot_np.size == 0: return None
+
+        anchor_full_path = self._resolve_anchor_path(image_storage_instance)
+        try: anchor_mtime_ns = os.stat(anchor_full_path).st_mtime_ns if anchor_full_path else None
+        except OSError: anchor_mtime_ns = None
+        # A replaced anchor file or a changed OCR target invalidates the cached decision even when the pixels match.
+        frame_key = (_image_digest(full_screenshot_np), anchor_full_path, anchor_mtime_ns, self._anchor_pp_key,
+                     self._ocr_target_key(image_storage_instance)) if self.enable_frame_cache else None
+        if frame_key is not None and frame_key == self._last_frame[0]:
+            logger.debug("TextInRelativeRegion: Captured area unchanged since last poll, reusing previous result.")
+            _, result, roi = self._last_frame
+        else:
+            result, roi = self._check_frame(full_screenshot_np, image_storage_instance, anchor_full_path, anchor_mtime_ns)
+            if frame_key is not None: self._last_frame = (frame_key, result, roi)
+        origin_x, origin_y = capture_result.get("x1", x1), capture_result.get("y1", y1)
+        return result, None if roi is None else (roi[0] + origin_x, roi[1] + origin_y, roi[2] + origin_x, roi[3] + origin_y)
+
+    def _check_frame(self, full_screenshot_np: np.ndarray, image_storage_instance: Optional[ImageStorage],
+                     anchor_full_path: Optional[str], anchor_mtime_ns: Optional[int]) -> Tuple[bool, Optional[Tuple[int, int, int, int]]]:
+        """Anchor search, relative crop and OCR on one captured frame. Returns (result, anchor + OCR bounds in the frame; None if no anchor)."""
+        anchor_bounds_in_screenshot = self._find_anchor_image(full_screenshot_np, anchor_full_path, anchor_mtime_ns)
+        if anchor_bounds_in_screenshot is None: logger.debug("TextInRelativeRegion: Anchor image not found."); return False, None
         
         ax1, ay1, ax2, ay2 = anchor_bounds_in_screenshot
         logger.debug(f"TextInRelativeRegion: Anchor found at relative coords ({ax1},{ay1})-({ax2},{ay2}) within captured region.")
 
-        ocr_x1, ocr_y1 = 0, 0
-        if self.relative_to_corner == "top_left": ocr_x1, ocr_y1 = ax1 + self.relative_x_offset, ay1 + self.relative_y_offset
-        elif self.relative_to_corner == "top_right": ocr_x1, ocr_y1 = ax2 + self.relative_x_offset, ay1 + self.relative_y_offset
-        elif self.relative_to_corner == "bottom_left": ocr_x1, ocr_y1 = ax1 + self.relative_x_offset, ay2 + self.relative_y_offset
-        elif self.relative_to_corner == "bottom_right": ocr_x1, ocr_y1 = ax2 + self.relative_x_offset, ay2 + self.relative_y_offset
-        elif self.relative_to_corner == "center": ocr_x1, ocr_y1 = (ax1+ax2)//2 + self.relative_x_offset, (ay1+ay2)//2 + self.relative_y_offset
+        (xa, xb, xd), (ya, yb, yd) = self._corner_x_weights, self._corner_y_weights
+        ocr_x1 = (xa * ax1 + xb * ax2) // xd + self.relative_x_offset
+        ocr_y1 = (ya * ay1 + yb * ay2) // yd + self.relative_y_offset
         
         ocr_x2, ocr_y2 = ocr_x1 + self.relative_width, ocr_y1 + self.relative_height
+        roi = (min(ax1, ocr_x1), min(ay1, ocr_y1), max(ax2, ocr_x2), max(ay2, ocr_y2))
         logger.debug(f"TextInRelativeRegion: Calculated relative OCR region (coords in screenshot): ({ocr_x1},{ocr_y1})-({ocr_x2},{ocr_y2})")
 
         h_screen, w_screen = full_screenshot_np.shape[:2]
@@ -1165,45 +1947,30 @@ class TextInRelativeRegionCondition(Condition):
         ocr_y2_clamped = max(ocr_y1_clamped + 1, min(ocr_y2, h_screen))
 
         if ocr_x2_clamped <= ocr_x1_clamped or ocr_y2_clamped <= ocr_y1_clamped:
-            logger.debug(f"TextInRelativeRegion: Clamped OCR region is invalid or zero-size. Original: ({ocr_x1},{ocr_y1})-({ocr_x2},{ocr_y2}), Clamped: ({ocr_x1_clamped},{ocr_y1_clamped})-({ocr_x2_clamped},{ocr_y2_clamped})"); return False
+            logger.debug(f"TextInRelativeRegion: Clamped OCR region is invalid or zero-size. Original: ({ocr_x1},{ocr_y1})-({ocr_x2},{ocr_y2}), Clamped: ({ocr_x1_clamped},{ocr_y1_clamped})-({ocr_x2_clamped},{ocr_y2_clamped})"); return False, roi
         
+        # A view into the capture: preprocess_for_ocr reads strided input directly and _run_ocr makes the final image contiguous only if needed.
         relative_region_np = full_screenshot_np[ocr_y1_clamped:ocr_y2_clamped, ocr_x1_clamped:ocr_x2_clamped]
-        if relative_region_np is None or relative_region_np.size == 0: logger.debug("TextInRelativeRegion: Cropped relative region is empty."); return False
+        if relative_region_np is None or relative_region_np.size == 0: logger.debug("TextInRelativeRegion: Cropped relative region is empty."); return False, roi
 
-        ocr_pp_params = {k.replace("ocr_pp_", ""): v for k,v in self.params.items() if k.startswith("ocr_pp_")}
-        if not ocr_pp_params: ocr_pp_params = {"grayscale": self.params.get("ocr_pp_grayscale", True)}
-
-        ocr_region_processed = preprocess_for_ocr(relative_region_np, ocr_pp_params)
-        if ocr_region_processed is None or ocr_region_processed.size == 0: logger.debug("TextInRelativeRegion: OCR region preprocessing failed."); return False
+        ocr_region_processed = preprocess_for_ocr(relative_region_np, self._ocr_pp_params, gray_dst=self._gray_scratch("ocr_gray", relative_region_np))
+        if ocr_region_processed is None or ocr_region_processed.size == 0: logger.debug("TextInRelativeRegion: OCR region preprocessing failed."); return False, roi
         
         try:
-            img_pil_for_ocr: Optional[Image.Image] = None
-            if ocr_region_processed.ndim == 3: img_pil_for_ocr = Image.fromarray(cv2.cvtColor(ocr_region_processed, cv2.COLOR_BGR2RGB))
-            elif ocr_region_processed.ndim == 2: img_pil_for_ocr = Image.fromarray(ocr_region_processed, 'L')
-            if img_pil_for_ocr is None: logger.debug("TextInRelativeRegion: PIL conversion for OCR region failed."); return False
+            if ocr_region_processed.ndim not in (2, 3): logger.debug("TextInRelativeRegion: Unsupported OCR region dimensions."); return False, roi
 
-            t_conf_parts = [f'--psm {self.ocr_psm}', '--oem 3', f'-l {self.ocr_language}']
-            if self.ocr_char_whitelist: t_conf_parts.append(f'-c tessedit_char_whitelist={self.ocr_char_whitelist}')
+            user_words_file: Optional[str] = None
             if self.ocr_user_words_file_path:
-                full_user_words_path_rel = ""
-                if image_storage_instance and isinstance(image_storage_instance, ImageStorage):
-                    try: full_user_words_path_rel = image_storage_instance.get_full_path(self.ocr_user_words_file_path)
-                    except: full_user_words_path_rel = os.path.abspath(self.ocr_user_words_file_path)
-                else: full_user_words_path_rel = os.path.abspath(self.ocr_user_words_file_path)
-                if os.path.exists(full_user_words_path_rel): t_conf_parts.append(f'-c tessedit_user_words_file="{full_user_words_path_rel}"')
-                else: logger.warning(f"TextInRelativeRegion: OCR user words file not found: '{full_user_words_path_rel}'")
-            
-            t_conf_str = " ".join(t_conf_parts)
-            recognized_text = pytesseract.image_to_string(img_pil_for_ocr, config=t_conf_str).strip()
+                user_words_file = self._user_words.resolve(self.ocr_user_words_file_path, image_storage_instance, "TextInRelativeRegion")
+
+            recognized_text = _run_ocr(ocr_region_processed, self.ocr_language, self.ocr_psm, self.ocr_char_whitelist, user_words_file).strip()
             logger.debug(f"TextInRelativeRegion: OCR Text from relative region: '{recognized_text[:50]}...'")
 
-            match_flags = 0 if self.ocr_case_sensitive else re.IGNORECASE
-            if self.ocr_use_regex:
-                return bool(re.search(self.text_to_find, recognized_text, flags=match_flags))
-            else:
-                return self.text_to_find.lower() in recognized_text.lower() if not self.ocr_case_sensitive else self.text_to_find in recognized_text
-        except pytesseract.TesseractNotFoundError: logger.error("TextInRelativeRegion: Tesseract not found."); return False
-        except Exception as e_ocr_rel: logger.error(f"TextInRelativeRegion: Error during OCR: {e_ocr_rel}", exc_info=True); return False
+            if self._compiled_regex is not None:
+                return self._compiled_regex.search(recognized_text) is not None, roi
+            return self._needle in (recognized_text if self.ocr_case_sensitive else recognized_text.casefold()), roi
+        except _TesseractNotFoundError: logger.error("TextInRelativeRegion: Tesseract not found."); return False, roi
+        except Exception as e_ocr_rel: logger.error(f"TextInRelativeRegion: Error during OCR: {e_ocr_rel}", exc_info=True); return False, roi
 
     def __str__(self) -> str:
         anchor_name = os.path.basename(self.anchor_image_path) if self.anchor_image_path else "None"
@@ -1213,6 +1980,14 @@ class TextInRelativeRegionCondition(Condition):
 
 RegionColorLogic = Literal["ANY_TARGET_MET_THRESHOLD", "ALL_TARGETS_MET_THRESHOLD", "TOTAL_PERCENTAGE_ABOVE_THRESHOLD"]
 
+class _RegionColorTarget(NamedTuple):
+    """A validated target_colors entry; _asdict() gives back the serialized params form (same keys)."""
+    hex: str
+    rgb: Tuple[int, int, int]
+    tolerance: int
+    label: str
+    threshold: float
+
 class RegionColorCondition(Condition):
     TYPE = "region_color"
 
@@ -1220,10 +1995,11 @@ class RegionColorCondition(Condition):
                  is_monitored_by_ai_brain: bool = False) -> None:
         super().__init__(type=self.TYPE, params=params, id=id, name=name, is_monitored_by_ai_brain=is_monitored_by_ai_brain)
         if not self._is_valid: return
+        self._bind_region()
         if not _UtilsImported: self._is_valid = False; self._validation_error = "color_utils or image_analysis_utils dependency missing."; return
         if not _CV2Available: self._is_valid = False; self._validation_error = "OpenCV (cv2) is not available for image processing."; return
 
-        self.target_colors_list: List[Dict[str, Any]] = []
+        self.target_colors_list: List[_RegionColorTarget] = []
         raw_target_colors = self.params.get("target_colors", [])
         if not isinstance(raw_target_colors, list):
             self._is_valid = False; self._validation_error = "'target_colors' must be a list of color definitions."; return
@@ -1238,13 +2014,11 @@ class RegionColorCondition(Condition):
                 color_threshold = float(color_def.get("threshold", self.params.get("match_percentage_threshold", 75.0)))
                 color_threshold = max(0.0, min(100.0, color_threshold))
 
-                self.target_colors_list.append({
-                    "hex": rgb_to_hex(rgb_val), "rgb": rgb_val, "tolerance": tolerance, "label": label, "threshold": color_threshold
-                })
+                self.target_colors_list.append(_RegionColorTarget(rgb_to_hex(rgb_val), rgb_val, tolerance, label, color_threshold))
             except (ValueError, TypeError) as e_color_def:
                 self._is_valid = False; self._validation_error = f"Invalid color definition at index {i}: {e_color_def}"; return
         
-        self.params["target_colors"] = self.target_colors_list
+        self.params["target_colors"] = [target._asdict() for target in self.target_colors_list]
 
         self.match_percentage_threshold = float(self.params.get("match_percentage_threshold", 75.0))
         self.match_percentage_threshold = max(0.0, min(100.0, self.match_percentage_threshold))
@@ -1260,6 +2034,15 @@ class RegionColorCondition(Condition):
         
         if not self.target_colors_list and self.condition_logic in ["ANY_TARGET_MET_THRESHOLD", "ALL_TARGETS_MET_THRESHOLD"]:
             self._is_valid = False; self._validation_error = "At least one target color must be defined for the selected logic."; return
+        # Targets as BGR channel bounds, so captures are counted as-is (no per-check list building or color conversion).
+        self._target_lowers_bgr, self._target_uppers_bgr = target_color_bounds(
+            [target.rgb for target in self.target_colors_list], [target.tolerance for target in self.target_colors_list], bgr=True)
+        # Targets sharing a hex pool their pixels (as the per-hex percentages always did); each target keeps its own threshold.
+        self._hex_keys: List[str] = list(dict.fromkeys(target.hex for target in self.target_colors_list))
+        self._target_hex_index = np.array([self._hex_keys.index(target.hex) for target in self.target_colors_list], dtype=np.intp)
+        self._target_thresholds = np.array([target.threshold for target in self.target_colors_list], dtype=np.float64)
+        # ANY logic is decided by the first target reaching its threshold on its own (pooling per hex only adds to it).
+        self._stop_fractions = self._target_thresholds / 100.0 if self.condition_logic == "ANY_TARGET_MET_THRESHOLD" else None
 
 
     def check(self, **context: Any) -> bool:
@@ -1267,8 +2050,7 @@ class RegionColorCondition(Condition):
         if not _UtilsImported or not _CV2Available: return False
 
         try:
-            region_x1 = self.params.get("region_x1", 0); region_y1 = self.params.get("region_y1", 0)
-            region_x2 = self.params.get("region_x2", 100); region_y2 = self.params.get("region_y2", 100)
+            region_x1, region_y1, region_x2, region_y2 = self.region_x1, self.region_y1, self.region_x2, self.region_y2
 
             capture_result = os_interaction_client.capture_region(region_x1, region_y1, region_x2, region_y2, useGrayscale=False, useBinarization=False)
             region_image_np = capture_result.get("image_np")
@@ -1276,45 +2058,34 @@ class RegionColorCondition(Condition):
                 logger.debug("RegionColorCondition: Failed to capture region or captured empty image.")
                 return False
 
-            img_rgb = None
-            if region_image_np.shape[2] == 4: img_rgb = cv2.cvtColor(region_image_np, cv2.COLOR_BGRA2RGB)
-            elif region_image_np.shape[2] == 3: img_rgb = cv2.cvtColor(region_image_np, cv2.COLOR_BGR2RGB)
-            else: logger.warning(f"RegionColorCondition: Captured image has unexpected channel count: {region_image_np.shape[2]}"); return False
-            if img_rgb is None: return False
+            if region_image_np.ndim != 3 or region_image_np.shape[2] not in (3, 4):
+                logger.warning(f"RegionColorCondition: Captured image has unexpected shape: {region_image_np.shape}"); return False
 
-            targets_for_analysis: List[Tuple[Tuple[int,int,int], int]] = []
-            for color_def in self.target_colors_list:
-                targets_for_analysis.append((color_def["rgb"], color_def["tolerance"]))
+            if not self.target_colors_list:
+                # ANY needs a target, ALL is vacuously met, TOTAL compares a 0% sum.
+                if self.condition_logic == "ANY_TARGET_MET_THRESHOLD": return False
+                if self.condition_logic == "ALL_TARGETS_MET_THRESHOLD": return True
+                is_met = 0.0 >= self.match_percentage_threshold
+                logger.debug(f"RegionColorCondition '{self.name}': TOTAL logic (no targets). Sum: 0.0%, Threshold: {self.match_percentage_threshold:.2f}%. Met: {is_met}")
+                return is_met
 
-            color_percentages = analyze_region_colors(img_rgb, targets_for_analysis, self.sampling_step)
-            logger.debug(f"RegionColorCondition '{self.name}': Analyzed percentages: {color_percentages}")
+            counts, total_sampled = count_target_color_pixels(region_image_np, self._target_lowers_bgr, self._target_uppers_bgr, self.sampling_step,
+                                                             stop_fractions=self._stop_fractions)
+            hex_percentages = np.bincount(self._target_hex_index, weights=counts, minlength=len(self._hex_keys)) * (100.0 / total_sampled)
+            target_percentages = hex_percentages[self._target_hex_index]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"RegionColorCondition '{self.name}': Analyzed percentages: {dict(zip(self._hex_keys, hex_percentages.tolist()))}")
 
             if self.condition_logic == "ANY_TARGET_MET_THRESHOLD":
-                if not self.target_colors_list: return False
-                for color_def in self.target_colors_list:
-                    hex_key = color_def["hex"]
-                    individual_threshold = color_def.get("threshold", self.match_percentage_threshold)
-                    if color_percentages.get(hex_key, 0.0) >= individual_threshold:
-                        logger.debug(f"RegionColorCondition '{self.name}': ANY logic MET for {hex_key} ({color_percentages.get(hex_key,0.0):.2f}% >= {individual_threshold:.2f}%)")
-                        return True
-                logger.debug(f"RegionColorCondition '{self.name}': ANY logic NOT MET for any target.")
-                return False
+                is_met = bool(np.any(target_percentages >= self._target_thresholds))
+                logger.debug(f"RegionColorCondition '{self.name}': ANY logic {'MET' if is_met else 'NOT MET'}.")
+                return is_met
             elif self.condition_logic == "ALL_TARGETS_MET_THRESHOLD":
-                if not self.target_colors_list: return True
-                for color_def in self.target_colors_list:
-                    hex_key = color_def["hex"]
-                    individual_threshold = color_def.get("threshold", self.match_percentage_threshold)
-                    if color_percentages.get(hex_key, 0.0) < individual_threshold:
-                        logger.debug(f"RegionColorCondition '{self.name}': ALL logic FAILED for {hex_key} ({color_percentages.get(hex_key,0.0):.2f}% < {individual_threshold:.2f}%)")
-                        return False
-                logger.debug(f"RegionColorCondition '{self.name}': ALL logic MET for all targets.")
-                return True
+                is_met = bool(np.all(target_percentages >= self._target_thresholds))
+                logger.debug(f"RegionColorCondition '{self.name}': ALL logic {'MET' if is_met else 'NOT MET'}.")
+                return is_met
             elif self.condition_logic == "TOTAL_PERCENTAGE_ABOVE_THRESHOLD":
-                if not self.target_colors_list: # If no targets, total is 0
-                    is_met = 0.0 >= self.match_percentage_threshold
-                    logger.debug(f"RegionColorCondition '{self.name}': TOTAL logic (no targets). Sum: 0.0%, Threshold: {self.match_percentage_threshold:.2f}%. Met: {is_met}")
-                    return is_met
-                total_percentage = sum(color_percentages.get(cd["hex"], 0.0) for cd in self.target_colors_list)
+                total_percentage = float(target_percentages.sum())
                 is_met = total_percentage >= self.match_percentage_threshold
                 logger.debug(f"RegionColorCondition '{self.name}': TOTAL logic. Sum: {total_percentage:.2f}%, Threshold: {self.match_percentage_threshold:.2f}%. Met: {is_met}")
                 return is_met
@@ -1328,7 +2099,7 @@ class RegionColorCondition(Condition):
 
     def __str__(self) -> str:
         num_targets = len(self.target_colors_list)
-        first_target_hex = self.target_colors_list[0]["hex"] if num_targets > 0 else "N/A"
+        first_target_hex = self.target_colors_list[0].hex if num_targets > 0 else "N/A"
         logic_disp = self.condition_logic.replace("_", " ").title()
         ai_monitored_str = " (AI Monitored)" if self.is_monitored_by_ai_brain else ""
         return f"'{self.name}' (RegColors: {num_targets} tgts e.g. {first_target_hex}, Logic: {logic_disp}, Thresh: {self.match_percentage_threshold}%){ai_monitored_str}"
@@ -1390,6 +2161,8 @@ CONDITION_TYPE_SETTINGS: Dict[str, Dict[str, Any]] = {
     MultiImageCondition.TYPE: {"display_name": "Multiple Images Pattern", "create_params_ui": lambda s: s._create_multi_image_params_ui(), "show_preview": True},
     RegionColorCondition.TYPE: {"display_name": "Color in Region (%)", "create_params_ui": lambda s: s._create_region_color_params(), "show_preview": True,},
 }
-ACTION_CONDITION_TYPES_INTERNAL = list(CONDITION_TYPE_SETTINGS.keys())
-ACTION_CONDITION_TYPES_DISPLAY = [settings["display_name"] for settings in CONDITION_TYPE_SETTINGS.values()]
-ACTION_CONDITION_DISPLAY_TO_INTERNAL_MAP = {settings["display_name"]: type_key for type_key, settings in CONDITION_TYPE_SETTINGS.items()}
+# Derived once from CONDITION_TYPE_SETTINGS in a single pass; read-only.
+_condition_type_pairs = tuple((type_key, settings["display_name"]) for type_key, settings in CONDITION_TYPE_SETTINGS.items())
+ACTION_CONDITION_TYPES_INTERNAL = tuple(type_key for type_key, _ in _condition_type_pairs)
+ACTION_CONDITION_TYPES_DISPLAY = tuple(display for _, display in _condition_type_pairs)
+ACTION_CONDITION_DISPLAY_TO_INTERNAL_MAP = MappingProxyType({display: type_key for type_key, display in _condition_type_pairs})
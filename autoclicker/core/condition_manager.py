@@ -1,57 +1,96 @@
 # core/condition_manager.py
 import logging
-import copy
-from typing import Dict, List, Optional, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Set, Tuple, Mapping, Iterator, ValuesView
 from core.condition import Condition, create_condition, NoneCondition # << THÊM NoneCondition
 
 logger = logging.getLogger(__name__)
 
+# "Always True" conditions are never stored in the shared library; bound once for the type checks below.
+_NONE_TYPE: str = NoneCondition.TYPE
+
+# Libraries at least this large are built on a short-lived thread pool; any file-system or native work inside
+# create_condition overlaps across workers. Smaller libraries are not worth the pool startup.
+PARALLEL_LOAD_THRESHOLD = 500
+
+def _build_shared_condition(cond_data: Any) -> Optional[Condition]:
+    """Builds one library entry from profile data, or logs why it is skipped and returns None."""
+    if not isinstance(cond_data, dict):
+        logger.warning("Skipping invalid condition data item (not a dict): %s", cond_data)
+        return None
+    if cond_data.get("type") == _NONE_TYPE:
+        logger.debug("Skipping loading of 'Always True' (NoneCondition) condition into shared library: %s",
+                     cond_data.get('name') or cond_data.get('id') or 'Unknown')
+        return None
+    try:
+        condition_obj = create_condition(cond_data)
+        if condition_obj and condition_obj.id and condition_obj.type != _NONE_TYPE:
+            return condition_obj
+        reason = "Failed to create valid condition object"
+        if not condition_obj: pass
+        elif not condition_obj.id: reason = "Missing ID"
+        elif condition_obj.type == _NONE_TYPE: reason = "Is an Always True condition"
+        logger.warning("%s from data: %s", reason, cond_data)
+    except Exception as e:
+        logger.error("Error creating shared condition from data %s: %s", cond_data, e, exc_info=True)
+    return None
+
 class ConditionManager:
+    """
+    The profile's shared condition library. Stored Condition objects are owned by the manager and kept
+    as given (no defensive copies): conditions built by create_condition on load/update are fresh, and
+    objects passed to add_or_update_shared_condition must not be reused by the caller.
+    """
     def __init__(self):
         self.shared_conditions: Dict[str, Condition] = {}
+        # Reverse index condition_id -> {(job_name, action_index)}, plus job_name -> condition ids for unregistering.
+        # Kept up to date by JobManager when jobs are loaded/added/updated/deleted.
+        self._usage_index: Dict[str, Set[Tuple[str, int]]] = {}
+        self._job_condition_ids: Dict[str, Set[str]] = {}
+        self._usage_index_built = False
+        # Built on first request, dropped by every mutator (_invalidate_views); handed out read-only.
+        self._summary_cache: Optional[Dict[str, Dict[str, str]]] = None
+        self._display_map_cache: Optional[Dict[str, str]] = None
         logger.debug("ConditionManager initialized.")
 
+    def _invalidate_views(self) -> None:
+        self._summary_cache = None
+        self._display_map_cache = None
+
     def load_shared_conditions(self, conditions_data_list: List[Dict[str, Any]]):
-        self.shared_conditions.clear()
-        loaded_count = 0
-        error_count = 0
+        self._invalidate_views()
+        loaded: Dict[str, Condition] = {}
         if not isinstance(conditions_data_list, list):
-            logger.warning(f"load_shared_conditions received invalid data type: {type(conditions_data_list)}. Expected list.")
+            self.shared_conditions = loaded
+            logger.warning("load_shared_conditions received invalid data type: %s. Expected list.", type(conditions_data_list))
             return
 
-        for cond_data in conditions_data_list:
-            if not isinstance(cond_data, dict):
-                logger.warning(f"Skipping invalid condition data item (not a dict): {cond_data}")
-                error_count += 1
-                continue
-
-            condition_type = cond_data.get("type")
-            if condition_type == NoneCondition.TYPE:
-                logger.debug(f"Skipping loading of 'Always True' (NoneCondition) condition into shared library: {cond_data.get('name', cond_data.get('id', 'Unknown'))}")
-                error_count +=1 
-                continue
-
-            try:
-                condition_obj = create_condition(cond_data) 
-                if condition_obj and condition_obj.id and condition_obj.type != NoneCondition.TYPE: 
-                    self.shared_conditions[condition_obj.id] = condition_obj
-                    loaded_count += 1
-                else:
-                    reason = "Failed to create valid condition object"
-                    if not condition_obj: pass
-                    elif not condition_obj.id: reason = "Missing ID"
-                    elif condition_obj.type == NoneCondition.TYPE: reason = "Is an Always True condition"
-                    logger.warning(f"{reason} from data: {cond_data}")
-                    error_count += 1
-            except Exception as e:
-                logger.error(f"Error creating shared condition from data {cond_data}: {e}", exc_info=True)
-                error_count += 1
-        logger.info(f"ConditionManager loaded {loaded_count} shared conditions (skipped {error_count}).")
+        if len(conditions_data_list) >= PARALLEL_LOAD_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="ConditionLoad") as ex:
+                built = list(ex.map(_build_shared_condition, conditions_data_list))
+        else:
+            built = [_build_shared_condition(cond_data) for cond_data in conditions_data_list]
 
-    def get_all_shared_conditions(self) -> List[Condition]:
+        error_count = 0
+        for condition_obj in built: # In input order, so a duplicate ID still keeps the last entry.
+            if condition_obj is None: error_count += 1
+            else: loaded[condition_obj.id] = condition_obj
+        # Built off to the side and swapped in whole: readers never see a half-loaded library.
+        self.shared_conditions = loaded
+        logger.info("ConditionManager loaded %d shared conditions (skipped %d).", len(loaded), error_count)
+
+    def get_all_shared_conditions(self) -> ValuesView[Condition]:
+        # Live view for callers that just iterate on the Tk thread; use the snapshot from other threads.
+        return self.shared_conditions.values()
+
+    def get_all_shared_conditions_snapshot(self) -> List[Condition]:
         return list(self.shared_conditions.values())
 
-    def get_all_shared_conditions_summary(self) -> Dict[str, Dict[str, str]]:
+    def get_all_shared_conditions_summary(self) -> Mapping[str, Dict[str, str]]:
+        if self._summary_cache is not None:
+            return MappingProxyType(self._summary_cache)
         summary = {}
         for cond_id, cond_obj in self.shared_conditions.items():
             try:
@@ -62,8 +101,9 @@ class ConditionManager:
                     "str": str(cond_obj)
                 }
             except Exception as e:
-                logger.warning(f"Error generating summary for condition ID '{cond_id}': {e}")
-        return summary
+                logger.warning("Error generating summary for condition ID '%s': %s", cond_id, e)
+        self._summary_cache = summary
+        return MappingProxyType(summary)
 
     def get_shared_condition_by_id(self, condition_id: str) -> Optional[Condition]:
         if not condition_id:
@@ -74,15 +114,16 @@ class ConditionManager:
         if not isinstance(condition_obj, Condition) or not condition_obj.id:
             logger.error("Cannot add/update shared condition: Invalid Condition object or missing ID.")
             return False
-        if condition_obj.type == NoneCondition.TYPE:
-            logger.warning(f"Cannot add/update Shared Condition '{condition_obj.name}' (ID: {condition_obj.id}): 'Always True' conditions are not allowed in the shared library.")
+        if condition_obj.type == _NONE_TYPE:
+            logger.warning("Cannot add/update Shared Condition '%s' (ID: %s): 'Always True' conditions are not allowed in the shared library.", condition_obj.name, condition_obj.id)
             return False
         
         is_update = condition_obj.id in self.shared_conditions
         action_taken = "Updated" if is_update else "Added"
 
         self.shared_conditions[condition_obj.id] = condition_obj
-        logger.info(f"{action_taken} shared condition: '{condition_obj.name}' (ID: {condition_obj.id})")
+        self._invalidate_views()
+        logger.info("%s shared condition: '%s' (ID: %s)", action_taken, condition_obj.name, condition_obj.id)
         return True
 
     def update_shared_condition_from_data(self, condition_id: str, updated_condition_data: Dict[str, Any]) -> bool:
@@ -91,75 +132,115 @@ class ConditionManager:
             return False
 
         if condition_id not in self.shared_conditions:
-            logger.warning(f"Cannot update shared condition: ID '{condition_id}' not found. Consider adding it instead.")
+            logger.warning("Cannot update shared condition: ID '%s' not found. Consider adding it instead.", condition_id)
             return False
         new_type = updated_condition_data.get("type")
-        if new_type == NoneCondition.TYPE:
-            logger.error(f"Cannot update shared condition ID '{condition_id}' to type 'Always True'. This type is not allowed in the shared library.")
+        if new_type == _NONE_TYPE:
+            logger.error("Cannot update shared condition ID '%s' to type 'Always True'. This type is not allowed in the shared library.", condition_id)
             return False
 
         try:
             if "id" in updated_condition_data and updated_condition_data["id"] != condition_id:
-                logger.warning(f"ID mismatch during update. Provided data ID '{updated_condition_data['id']}' differs from target ID '{condition_id}'. Using target ID.")
+                logger.warning("ID mismatch during update. Provided data ID '%s' differs from target ID '%s'. Using target ID.", updated_condition_data['id'], condition_id)
             updated_condition_data["id"] = condition_id 
 
             if "name" not in updated_condition_data or not str(updated_condition_data.get("name", "")).strip():
                 original_name = self.shared_conditions[condition_id].name
                 updated_condition_data["name"] = original_name
-                logger.debug(f"Update for condition ID '{condition_id}': Name not in update data or empty, preserving original name '{original_name}'.")
+                logger.debug("Update for condition ID '%s': Name not in update data or empty, preserving original name '%s'.", condition_id, original_name)
 
             updated_condition_obj = create_condition(updated_condition_data)
             if not updated_condition_obj:
-                logger.error(f"Failed to create valid condition object from updated data for ID '{condition_id}'.")
+                logger.error("Failed to create valid condition object from updated data for ID '%s'.", condition_id)
                 return False
-            if updated_condition_obj.type == NoneCondition.TYPE:
-                 logger.error(f"Attempted to update condition ID '{condition_id}' to an 'Always True' type through create_condition. Update aborted.")
+            if updated_condition_obj.type == _NONE_TYPE:
+                 logger.error("Attempted to update condition ID '%s' to an 'Always True' type through create_condition. Update aborted.", condition_id)
                  return False
             
             self.shared_conditions[condition_id] = updated_condition_obj
-            logger.info(f"Updated shared condition: '{updated_condition_obj.name}' (ID: {condition_id})")
+            self._invalidate_views()
+            logger.info("Updated shared condition: '%s' (ID: %s)", updated_condition_obj.name, condition_id)
             return True
         except Exception as e:
-            logger.error(f"Error updating shared condition ID '{condition_id}' from data: {e}", exc_info=True)
+            logger.error("Error updating shared condition ID '%s' from data: %s", condition_id, e, exc_info=True)
             return False
 
     def delete_shared_condition(self, condition_id: str) -> bool:
         if not condition_id:
             logger.warning("Cannot delete shared condition: ID is empty.")
             return False
-        if condition_id in self.shared_conditions:
-            removed_condition_name = self.shared_conditions[condition_id].name
-            del self.shared_conditions[condition_id]
-            logger.info(f"Deleted shared condition: '{removed_condition_name}' (ID: {condition_id})")
-            return True
-        else:
-            logger.warning(f"Cannot delete shared condition: ID '{condition_id}' not found.")
+        removed = self.shared_conditions.pop(condition_id, None)
+        if removed is None:
+            logger.warning("Cannot delete shared condition: ID '%s' not found.", condition_id)
             return False
+        self._invalidate_views()
+        logger.info("Deleted shared condition: '%s' (ID: %s)", removed.name, condition_id)
+        return True
+
+    def iter_serializable(self) -> Iterator[Dict[str, Any]]:
+        """Yields each stored condition's to_dict() lazily, so a streaming writer holds one at a time."""
+        for cond in list(self.shared_conditions.values()):
+            if cond.type != _NONE_TYPE:
+                yield cond.to_dict()
 
     def get_serializable_data(self) -> List[Dict[str, Any]]:
-        return [
-            cond.to_dict()
-            for cond in self.shared_conditions.values()
-            if cond.type != NoneCondition.TYPE
-        ]
+        return list(self.iter_serializable())
 
     def clear_all_shared_conditions(self):
         self.shared_conditions.clear()
+        self._invalidate_views()
         logger.info("All shared conditions cleared from ConditionManager.")
 
-    def get_condition_display_map(self) -> Dict[str, str]:
-        return {
-            cond_id: f"{cond.name} ({cond.type})"
-            for cond_id, cond in self.shared_conditions.items()
-        }
+    def get_condition_display_map(self) -> Mapping[str, str]:
+        if self._display_map_cache is None:
+            self._display_map_cache = {
+                cond_id: f"{cond.name} ({cond.type})"
+                for cond_id, cond in self.shared_conditions.items()
+            }
+        return MappingProxyType(self._display_map_cache)
+
+    def register_job_usage(self, job: Any) -> None:
+        """Indexes the shared conditions referenced by job's actions (replacing any previous entries for its name)."""
+        job_name = getattr(job, 'name', None)
+        if not job_name: return
+        self.unregister_job_usage(job_name)
+        actions = getattr(job, 'actions', None)
+        if not isinstance(actions, list): return
+        # Job keeps only Action instances in .actions and Action always sets condition_id, so the loop reads it directly.
+        usage_index = self._usage_index
+        condition_ids: Set[str] = set()
+        for action_index, action in enumerate(actions):
+            condition_id = action.condition_id
+            if condition_id:
+                usage_index.setdefault(condition_id, set()).add((job_name, action_index))
+                condition_ids.add(condition_id)
+        if condition_ids: self._job_condition_ids[job_name] = condition_ids
+
+    def unregister_job_usage(self, job_name: str) -> None:
+        for condition_id in self._job_condition_ids.pop(job_name, ()):
+            users = self._usage_index.get(condition_id)
+            if users is None: continue
+            users.difference_update({user for user in users if user[0] == job_name})
+            if not users: del self._usage_index[condition_id]
+
+    def rebuild_usage_index(self, all_jobs: List[Any]) -> None:
+        """Cold-start build of the usage index from every job."""
+        self._usage_index.clear()
+        self._job_condition_ids.clear()
+        for job in all_jobs:
+            self.register_job_usage(job)
+        self._usage_index_built = True
 
-    def is_condition_id_in_use(self, condition_id_to_check: str, all_jobs: List[Any]) -> bool:
+    def is_condition_id_in_use(self, condition_id_to_check: str, all_jobs: Optional[List[Any]] = None) -> bool:
         if not condition_id_to_check:
             return False
-        for job in all_jobs:
-            if hasattr(job, 'actions') and isinstance(job.actions, list):
-                for action in job.actions:
-                    if hasattr(action, 'condition_id') and action.condition_id == condition_id_to_check:
-                        logger.debug(f"Condition ID '{condition_id_to_check}' is in use by action of type '{getattr(action,'type','unknown')}' in job '{getattr(job,'name','unknown')}'.")
-                        return True
+        if not self._usage_index_built:
+            if all_jobs is None: return False
+            self.rebuild_usage_index(all_jobs)
+        users = self._usage_index.get(condition_id_to_check)
+        if users:
+            if logger.isEnabledFor(logging.DEBUG):
+                job_name, action_index = next(iter(users))
+                logger.debug("Condition ID '%s' is in use by action #%d in job '%s' (%d use(s)).", condition_id_to_check, action_index + 1, job_name, len(users))
+            return True
         return False
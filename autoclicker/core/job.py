@@ -6,10 +6,8 @@ from typing import List, Dict, Any, Optional # Thêm Optional
 
 logger = logging.getLogger(__name__)
 
-_ActionImported = False
 try:
     from core.action import Action
-    _ActionImported = True
 except ImportError:
     logger.warning("Could not import Action class. Job serialization/deserialization involving actions may fail or be limited.")
     class Action: # type: ignore
@@ -32,13 +30,10 @@ except ImportError:
             return cls( str(data.get("type", "dummy_error")), data.get("params", {}), data.get("condition_id"),
                         data.get("next_action_index_if_condition_met"), data.get("next_action_index_if_condition_not_met") )
         def __repr__(self) -> str: return f"DummyAction(type='{self.type}', ...)"
-    _ActionImported = False
 
 
-_JobRunConditionImported = False
 try:
     from core.job_run_condition import JobRunCondition, InfiniteRunCondition, create_job_run_condition
-    _JobRunConditionImported = True
 except ImportError:
     logger.warning("Could not import JobRunCondition classes. Job run condition handling will be limited.")
     class JobRunCondition: # type: ignore
@@ -48,13 +43,32 @@ except ImportError:
     class InfiniteRunCondition(JobRunCondition): # type: ignore
         def __init__(self, params:Optional[Dict[str,Any]]=None): super().__init__("infinite", params)
     def create_job_run_condition(data: Optional[Dict[str,Any]]) -> JobRunCondition: # type: ignore
-        if data and isinstance(data, dict) and data.get("type") == "infinite": return InfiniteRunCondition(data.get("params"))
-        return InfiniteRunCondition() 
-    _JobRunConditionImported = False
+        # Keeps the stored type/params so a save round-trips them even without the real classes.
+        if not data or not isinstance(data, dict): return InfiniteRunCondition()
+        params = data.get("params", {})
+        return JobRunCondition(str(data.get("type", "infinite")), params if isinstance(params, dict) else {})
 
 
+def _is_branching(a: Action) -> bool:
+    m = getattr(a, 'next_action_index_if_condition_met', None)
+    n = getattr(a, 'next_action_index_if_condition_not_met', None)
+    return (isinstance(m, int) and m >= 0) or (isinstance(n, int) and n >= 0)
+
+
+# Non-dict or malformed entries are skipped; Action.from_dict is bound once as a default.
+def _deserialize_actions(actions_data: Any, action_from_dict=Action.from_dict) -> List[Action]:
+    actions: List[Action] = []
+    if not isinstance(actions_data, list): return actions
+    for a_data in actions_data:
+        if not isinstance(a_data, dict): continue
+        try: actions.append(action_from_dict(a_data))
+        except Exception: pass
+    return actions
+
 
 class Job:
+    # Fixed attribute set (no per-instance __dict__); nothing assigns other attributes on jobs.
+    __slots__ = ("name", "actions", "hotkey", "stop_key", "enabled", "run_condition", "running", "params")
     name: str
     actions: List[Action]
     hotkey: str
@@ -73,44 +87,29 @@ class Job:
             raise ValueError("Job name must be a non-empty string.")
         self.name = name.strip()
 
-        self.actions = []
-        if actions is not None:
-            if isinstance(actions, list):
-                 valid_actions: List[Action] = []
-                 for item in actions:
-                     if _ActionImported and isinstance(item, Action): 
-                         valid_actions.append(item)
-                 self.actions = valid_actions
+        # Action / JobRunCondition / InfiniteRunCondition are the real classes or their working stand-ins above,
+        # so the checks below need no import flags.
+        if isinstance(actions, list):
+            self.actions = [a for a in actions if isinstance(a, Action)]
+        else:
+            self.actions = []
 
         self.hotkey = hotkey if isinstance(hotkey, str) else ""
         self.stop_key = stop_key if isinstance(stop_key, str) else ""
         self.enabled = bool(enabled)
 
-        if _JobRunConditionImported and isinstance(run_condition, JobRunCondition):
-             self.run_condition = run_condition
-        else:
-             self.run_condition = InfiniteRunCondition() if _JobRunConditionImported else JobRunCondition("infinite") # type: ignore
+        self.run_condition = run_condition if isinstance(run_condition, JobRunCondition) else InfiniteRunCondition()
 
         self.params = job_params if isinstance(job_params, dict) else {} 
         self.running = False
 
     
     def to_dict(self) -> Dict[str, Any]:
-        actions_data: List[Dict[str, Any]] = []
-        if isinstance(self.actions, list):
-            for action in self.actions:
-                try:
-                    if _ActionImported and isinstance(action, Action):
-                        actions_data.append(action.to_dict())
-                    elif isinstance(action, dict): 
-                         actions_data.append(action)
-                except Exception:
-                     pass
-
-        run_condition_data: Dict[str, Any] = {"type": "infinite", "params": {}} 
-        if hasattr(self.run_condition, 'to_dict'):
-             try: run_condition_data = self.run_condition.to_dict()
-             except Exception: pass
+        # __init__ only admits Action instances, so no per-item type check or handler is needed here.
+        actions_data: List[Dict[str, Any]] = [a.to_dict() for a in self.actions]
+
+        try: run_condition_data: Dict[str, Any] = self.run_condition.to_dict()
+        except Exception: run_condition_data = {"type": "infinite", "params": {}}
         
         job_dict: Dict[str, Any] = {
              "name": self.name, "actions": actions_data,
@@ -131,24 +130,9 @@ class Job:
 
         hotkey = data.get("hotkey", ""); stop_key = data.get("stop_key", "")
         enabled = data.get("enabled", True)
-        actions_data = data.get("actions", [])
-        deserialized_actions: List[Action] = []
-        
-        if isinstance(actions_data, list):
-             if _ActionImported: 
-                 for a_data in actions_data:
-                     try:
-                         if isinstance(a_data, dict): deserialized_actions.append(Action.from_dict(a_data))
-                     except Exception: pass
-
-        run_condition_data = data.get("run_condition")
-        run_condition_obj: JobRunCondition
-        if _JobRunConditionImported:
-            run_condition_obj = create_job_run_condition(run_condition_data) # type: ignore
-        else: 
-            run_condition_obj = JobRunCondition("infinite" if not run_condition_data or not isinstance(run_condition_data, dict) else str(run_condition_data.get("type","infinite")), 
-                                                run_condition_data.get("params",{}) if run_condition_data and isinstance(run_condition_data, dict) else {}) # type: ignore
-        
+        deserialized_actions = _deserialize_actions(data.get("actions", []))
+        run_condition_obj = create_job_run_condition(data.get("run_condition"))
+
         job_params_data = data.get("params", {}) 
         if not isinstance(job_params_data, dict): job_params_data = {}
 
@@ -166,13 +150,7 @@ class Job:
         run_cond_desc = str(self.run_condition) if hasattr(self.run_condition, '__str__') else "Unknown RunCond"
         hotkey_display = self.hotkey if self.hotkey and self.hotkey.strip() else "None"
         stopkey_display = self.stop_key if self.stop_key and self.stop_key.strip() else "None"
-        is_brain = False
-        if isinstance(self.actions, list):
-            for a in self.actions:
-                 if isinstance(a, Action): 
-                      if (hasattr(a, 'next_action_index_if_condition_met') and isinstance(a.next_action_index_if_condition_met, int) and a.next_action_index_if_condition_met >= 0) or \
-                         (hasattr(a, 'next_action_index_if_condition_not_met') and isinstance(a.next_action_index_if_condition_not_met, int) and a.next_action_index_if_condition_not_met >= 0):
-                          is_brain = True; break
+        is_brain = any(map(_is_branching, self.actions))
         brain_status = " (Logic Flow)" if is_brain else ""
         return (f"Job(name='{self.name}', actions={len(self.actions)}, {run_cond_desc}, "
                 f"hotkey='{hotkey_display}', stop_key='{stopkey_display}', {enabled_status}, {status}){brain_status}")
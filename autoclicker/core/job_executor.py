@@ -35,6 +35,8 @@ except ImportError as e:
 
          def execute(self, job_stop_event:Optional[threading.Event]=None, condition_manager:Any=None, **context:Any) -> bool: return True
          def _execute_core_logic(self, job_stop_event:Optional[threading.Event]=None, **context:Any) -> None: pass
+         @property
+         def fallback_actions(self) -> List[Any]: return [create_action(d) for d in self.fallback_action_sequence or ()]
      def create_action(data: Optional[Dict[str, Any]]) -> Action: 
           if data and isinstance(data, dict):
               return Action(data.get("type","dummy"), data.get("params",{}), data.get("condition_id"),
@@ -67,6 +69,7 @@ class JobExecutor:
     _current_run_count: int
     _start_time: float
     _job_context: JobContext 
+    _action_context: Dict[str, Any]
 
     _MAX_FALLBACK_DEPTH = 3 
     _ABSOLUTE_ACTION_MAX_RETRIES = 10 
@@ -98,6 +101,12 @@ class JobExecutor:
         self._current_run_count = 0
         self._start_time = 0.0
         self._job_context = JobContext(job_name=self._job.name)
+        # Constant for the executor's lifetime (job_context is updated in place), so built once for every action.execute().
+        self._action_context = {
+            "job_name": self._job.name,
+            "image_storage_instance": self._image_storage,
+            "job_context": self._job_context
+        }
 
 
     def start(self) -> None:
@@ -156,34 +165,35 @@ class JobExecutor:
             logger.warning(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}): Max fallback depth ({self._MAX_FALLBACK_DEPTH}) reached. Skipping further fallbacks for this branch.")
             return False, current_action_index + 1 
 
-        action_context_for_execute = {
-            "job_name": self._job.name,
-            "image_storage_instance": self._image_storage,
-            "job_context": self._job_context 
-        }
+        stop_is_set = self._stop_event.is_set
+        # Action.__init__ normalizes both jump targets to a non-negative int or None; resolve them once per call.
+        jump_if_met = action_to_execute.next_action_index_if_condition_met
+        if jump_if_met is None: jump_if_met = current_action_index + 1
+        jump_if_not_met = action_to_execute.next_action_index_if_condition_not_met
+        if jump_if_not_met is None: jump_if_not_met = current_action_index + 1
 
         absolute_retries_left = self._ABSOLUTE_ACTION_MAX_RETRIES if action_to_execute.is_absolute else 1
         condition_met_for_this_action = False 
 
         while absolute_retries_left > 0:
-            if not self._is_executing or self._stop_event.is_set():
+            if not self._is_executing or stop_is_set():
                 logger.info(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}): Stop signal received during action processing (depth {fallback_depth}).")
                 self._is_executing = False
                 return condition_met_for_this_action, current_action_index + 1 
 
             try:
-                logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}, Depth {fallback_depth}): Calling action.execute(). Absolute: {action_to_execute.is_absolute}, Retries left: {absolute_retries_left}")
+                logger.debug("Job '%s', Action Idx %s (%s, Depth %s): Calling action.execute(). Absolute: %s, Retries left: %s", self._job.name, current_action_index, action_to_execute.type, fallback_depth, action_to_execute.is_absolute, absolute_retries_left)
                 condition_met_for_this_action = action_to_execute.execute(
                     job_stop_event=self._stop_event,
                     condition_manager=self._condition_manager,
-                    **action_context_for_execute
+                    **self._action_context
                 )
-                logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}): action.execute() returned: {condition_met_for_this_action}")
+                logger.debug("Job '%s', Action Idx %s (%s): action.execute() returned: %s", self._job.name, current_action_index, action_to_execute.type, condition_met_for_this_action)
 
                 if hasattr(action_to_execute, 'type') and action_to_execute.type == "click" and condition_met_for_this_action:
                      if hasattr(action_to_execute, 'x') and hasattr(action_to_execute, 'y'):
                         self._job_context.last_click_position = (action_to_execute.x, action_to_execute.y) # type: ignore
-                        logger.debug(f"JobContext: Updated last_click_position to ({action_to_execute.x}, {action_to_execute.y})")
+                        logger.debug("JobContext: Updated last_click_position to (%s, %s)", action_to_execute.x, action_to_execute.y)
 
 
             except (ValueError, RuntimeError) as e_action: 
@@ -199,11 +209,8 @@ class JobExecutor:
                 return condition_met_for_this_action, current_action_index + 1
 
             if condition_met_for_this_action:
-                logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}, Depth {fallback_depth}): Successfully executed (condition met and core logic ran).")
-                if hasattr(action_to_execute, 'next_action_index_if_condition_met') and isinstance(action_to_execute.next_action_index_if_condition_met, int) and action_to_execute.next_action_index_if_condition_met >=0:
-                    return True, action_to_execute.next_action_index_if_condition_met
-                else:
-                    return True, current_action_index + 1 
+                logger.debug("Job '%s', Action Idx %s (%s, Depth %s): Successfully executed (condition met and core logic ran).", self._job.name, current_action_index, action_to_execute.type, fallback_depth)
+                return True, jump_if_met
             else: 
                 if action_to_execute.is_absolute:
                     absolute_retries_left -= 1
@@ -218,23 +225,24 @@ class JobExecutor:
                         logger.warning(f"Job '{self._job.name}', Absolute Action Idx {current_action_index} ({action_to_execute.type}, Depth {fallback_depth}): Max retries reached, condition still not met. Treating as 'condition not met'.")
                         pass 
                 else: 
-                    logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}, Depth {fallback_depth}): Condition not met (Non-absolute).")
+                    logger.debug("Job '%s', Action Idx %s (%s, Depth %s): Condition not met (Non-absolute).", self._job.name, current_action_index, action_to_execute.type, fallback_depth)
 
                     pass 
-            if not condition_met_for_this_action and hasattr(action_to_execute, 'fallback_action_sequence') and action_to_execute.fallback_action_sequence:
+            if not condition_met_for_this_action and action_to_execute.fallback_action_sequence:
                 logger.info(f"Job '{self._job.name}', Action Idx {current_action_index} ({action_to_execute.type}): Condition not met. Attempting fallback sequence (Depth {fallback_depth}).")
 
                 any_fallback_successful = False
                 last_fallback_next_index = current_action_index + 1
 
-                for i, fallback_action_data in enumerate(action_to_execute.fallback_action_sequence):
-                    if not self._is_executing or self._stop_event.is_set(): break
+                # Built once per Action and reused on every later fallback; see Action.fallback_actions.
+                fallback_action_data_list = action_to_execute.fallback_action_sequence
+                for i, fallback_action_obj in enumerate(action_to_execute.fallback_actions):
+                    if not self._is_executing or stop_is_set(): break
                     
-                    logger.debug(f"Job '{self._job.name}', Fallback Action #{i+1} for Action Idx {current_action_index}. Data: {fallback_action_data.get('type')}")
+                    logger.debug("Job '%s', Fallback Action #%s for Action Idx %s. Type: %s", self._job.name, i+1, current_action_index, getattr(fallback_action_obj, 'type', None))
                     try:
-                        fallback_action_obj = create_action(fallback_action_data)
                         if not isinstance(fallback_action_obj, Action):
-                            logger.warning(f"Could not create valid fallback action object from data: {fallback_action_data}")
+                            logger.warning(f"Could not create valid fallback action object from data: {fallback_action_data_list[i]}")
                             continue
                         
                         fallback_condition_met, next_idx_from_fallback = self._execute_action_with_fallback(
@@ -248,52 +256,43 @@ class JobExecutor:
                             logger.info(f"Job '{self._job.name}', Fallback Action #{i+1} (Type: {fallback_action_obj.type}) for Action Idx {current_action_index} was successful.")
                             break 
                         else:
-                             logger.debug(f"Job '{self._job.name}', Fallback Action #{i+1} (Type: {fallback_action_obj.type}) for Action Idx {current_action_index} did not meet its condition or failed.")
+                             logger.debug("Job '%s', Fallback Action #%s (Type: %s) for Action Idx %s did not meet its condition or failed.", self._job.name, i+1, fallback_action_obj.type, current_action_index)
 
 
                     except Exception as e_create_fallback:
-                        logger.error(f"Error creating/executing fallback action #{i+1} for Action Idx {current_action_index}: {e_create_fallback}", exc_info=True)
+                        logger.error(f"Error executing fallback action #{i+1} for Action Idx {current_action_index}: {e_create_fallback}", exc_info=True)
 
                 if any_fallback_successful:
-                    logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index}: At least one fallback successful. Proceeding based on main action's 'condition_not_met' logic.")
-                    if hasattr(action_to_execute, 'next_action_index_if_condition_not_met') and isinstance(action_to_execute.next_action_index_if_condition_not_met, int) and action_to_execute.next_action_index_if_condition_not_met >=0:
-                        return True, action_to_execute.next_action_index_if_condition_not_met
-                    else:
-                        return True, current_action_index + 1
+                    logger.debug("Job '%s', Action Idx %s: At least one fallback successful. Proceeding based on main action's 'condition_not_met' logic.", self._job.name, current_action_index)
+                    return True, jump_if_not_met
                 else:
-                    logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index}: No fallback successful or no fallback defined. Proceeding based on main action's 'condition_not_met' logic.")
-                    if hasattr(action_to_execute, 'next_action_index_if_condition_not_met') and isinstance(action_to_execute.next_action_index_if_condition_not_met, int) and action_to_execute.next_action_index_if_condition_not_met >=0:
-                        return False, action_to_execute.next_action_index_if_condition_not_met
-                    else:
-                        return False, current_action_index + 1
+                    logger.debug("Job '%s', Action Idx %s: No fallback successful or no fallback defined. Proceeding based on main action's 'condition_not_met' logic.", self._job.name, current_action_index)
+                    return False, jump_if_not_met
 
-            if hasattr(action_to_execute, 'next_action_index_if_condition_not_met') and isinstance(action_to_execute.next_action_index_if_condition_not_met, int) and action_to_execute.next_action_index_if_condition_not_met >=0:
-                return False, action_to_execute.next_action_index_if_condition_not_met
-            else:
-                return False, current_action_index + 1
+            return False, jump_if_not_met
 
-        if hasattr(action_to_execute, 'next_action_index_if_condition_not_met') and isinstance(action_to_execute.next_action_index_if_condition_not_met, int) and action_to_execute.next_action_index_if_condition_not_met >=0:
-             return False, action_to_execute.next_action_index_if_condition_not_met
-        else:
-             return False, current_action_index + 1
+        return False, jump_if_not_met
 
 
     def _execute_loop(self) -> None:
+        # _is_executing stays an attribute read: stop() clears it from another thread.
+        stop_is_set = self._stop_event.is_set
+        job_context = self._job_context
         try:
             logger.info(f"Job '{self._job.name}': Execution loop started.")
-            while self._is_executing and not self._stop_event.is_set():
-                self._job_context.run_count = self._current_run_count 
-                self._job_context.start_time = self._start_time    
+            while self._is_executing and not stop_is_set():
+                job_context.run_count = self._current_run_count 
+                job_context.start_time = self._start_time    
                 should_continue_job_run_cycle = False
                 if not isinstance(self._job.run_condition, JobRunCondition) and self._job.run_condition is not None:
                      logger.error(f"Job '{self._job.name}': Invalid run_condition type ({type(self._job.run_condition)}). Stopping job.")
                 elif self._job.run_condition is None:
-                     logger.debug(f"Job '{self._job.name}': No run condition, assuming infinite run for this cycle.")
+                     logger.debug("Job '%s': No run condition, assuming infinite run for this cycle.", self._job.name)
                      should_continue_job_run_cycle = True
                 else:
                     try:
-                        should_continue_job_run_cycle = self._job.run_condition.check_continue(self._job_context)
-                        logger.debug(f"Job '{self._job.name}': Run condition check_continue returned {should_continue_job_run_cycle} (Run {self._current_run_count}).")
+                        should_continue_job_run_cycle = self._job.run_condition.check_continue(job_context)
+                        logger.debug("Job '%s': Run condition check_continue returned %s (Run %s).", self._job.name, should_continue_job_run_cycle, self._current_run_count)
                     except Exception as e_rc_check:
                          logger.error(f"Job '{self._job.name}': Error checking run condition: {e_rc_check}. Stopping job.", exc_info=True)
                          should_continue_job_run_cycle = False
@@ -305,35 +304,39 @@ class JobExecutor:
                     break
 
                 current_action_index = 0
-                actions_list = self._job.actions
-                logger.debug(f"Job '{self._job.name}', Run {self._current_run_count}: Starting action sequence (Total actions: {len(actions_list)}).")
-
-                execution_history: List[Tuple[int, str, Optional[str]]] = [] 
-                MAX_HISTORY_LENGTH = 20 
+                actions_list = list(self._job.actions) # Snapshot so the table below stays aligned for the whole cycle.
+                # Per-cycle dispatch table: the loop-detection signature of each slot, or None for non-Action items.
+                action_signatures = [(i, a.type, a.condition_id) if isinstance(a, Action) else None for i, a in enumerate(actions_list)]
+                action_count = len(action_signatures)
+                logger.debug("Job '%s', Run %s: Starting action sequence (Total actions: %s).", self._job.name, self._current_run_count, action_count)
+
+                # Loop detection only needs the run length of identical consecutive signatures. A signature starts with
+                # its slot index and the table is fixed for the cycle, so equal signatures <=> equal indices: compare ints.
+                last_action_index = -1
+                signature_repeat_count = 0
                 MIN_REPETITIONS_FOR_LOOP_DETECTION = 3 
 
-                while 0 <= current_action_index < len(actions_list):
-                    if not self._is_executing or self._stop_event.is_set():
+                while 0 <= current_action_index < action_count:
+                    if not self._is_executing or stop_is_set():
                         logger.info(f"Job '{self._job.name}': Loop/stop event triggered. Breaking action sequence.")
                         self._is_executing = False
                         break
 
                     action = actions_list[current_action_index]
-                    if not isinstance(action, Action):
+                    current_action_signature = action_signatures[current_action_index]
+                    if current_action_signature is None:
                          logger.warning(f"Job '{self._job.name}', Action Idx {current_action_index}: Item is not an Action instance (Type: {type(action)}). Skipping.")
                          current_action_index += 1
                          continue
 
-                    current_action_signature = (current_action_index, action.type, action.condition_id)
-                    execution_history.append(current_action_signature)
-                    if len(execution_history) > MAX_HISTORY_LENGTH:
-                        execution_history.pop(0)
+                    if current_action_index == last_action_index:
+                        signature_repeat_count += 1
+                    else:
+                        last_action_index = current_action_index; signature_repeat_count = 1
 
-                    if len(execution_history) >= MIN_REPETITIONS_FOR_LOOP_DETECTION:
-                        recent_signatures = execution_history[-MIN_REPETITIONS_FOR_LOOP_DETECTION:]
-                        if all(sig == current_action_signature for sig in recent_signatures):
-                            logger.error(f"Job '{self._job.name}': Potential infinite loop detected! Action signature {current_action_signature} repeated {MIN_REPETITIONS_FOR_LOOP_DETECTION} times consecutively. Stopping job.")
-                            self._is_executing = False; self._stop_event.set(); break
+                    if signature_repeat_count >= MIN_REPETITIONS_FOR_LOOP_DETECTION:
+                        logger.error(f"Job '{self._job.name}': Potential infinite loop detected! Action signature {current_action_signature} repeated {MIN_REPETITIONS_FOR_LOOP_DETECTION} times consecutively. Stopping job.")
+                        self._is_executing = False; self._stop_event.set(); break
 
 
                     final_condition_check_result_for_jump, next_index_to_jump_to = self._execute_action_with_fallback(
@@ -344,7 +347,7 @@ class JobExecutor:
                          self._is_executing = False; self._stop_event.set(); break
 
 
-                    logger.debug(f"Job '{self._job.name}', Action Idx {current_action_index}: Jump logic. Condition result for jump: {final_condition_check_result_for_jump}. Next index: {next_index_to_jump_to}")
+                    logger.debug("Job '%s', Action Idx %s: Jump logic. Condition result for jump: %s. Next index: %s", self._job.name, current_action_index, final_condition_check_result_for_jump, next_index_to_jump_to)
                     current_action_index = next_index_to_jump_to
 
                 if not self._is_executing:
@@ -356,10 +359,10 @@ class JobExecutor:
 
                 loop_delay_seconds = self._job.params.get("delay_between_runs_s", 0.01)
                 loop_delay_seconds = max(0.0, loop_delay_seconds) # Đảm bảo không âm
-                logger.debug(f"Job '{self._job.name}': Loop delay is {loop_delay_seconds}s.")
+                logger.debug("Job '%s': Loop delay is %ss.", self._job.name, loop_delay_seconds)
 
-                if self._is_executing and not self._stop_event.is_set() and loop_delay_seconds > 0:
-                     logger.debug(f"Job '{self._job.name}': Waiting for {loop_delay_seconds}s before next run cycle.")
+                if self._is_executing and not stop_is_set() and loop_delay_seconds > 0:
+                     logger.debug("Job '%s': Waiting for %ss before next run cycle.", self._job.name, loop_delay_seconds)
                      if self._stop_event.wait(timeout=loop_delay_seconds):
                          logger.info(f"Job '{self._job.name}': Stop event set during loop delay. Exiting.")
                          self._is_executing = False
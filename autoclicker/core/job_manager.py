@@ -6,7 +6,7 @@ import threading
 import logging
 import copy
 import time
-from typing import Dict, List, Optional, Any, TYPE_CHECKING, Callable 
+from typing import Dict, List, Optional, Any, TYPE_CHECKING, Callable, Mapping, Iterable
 
 if TYPE_CHECKING:
     from core.condition import Condition
@@ -62,13 +62,19 @@ except ImportError as e:
         def load_shared_conditions(self, data_list: List[Dict[str,Any]]) -> None: pass
         def clear_all_shared_conditions(self) -> None: pass
         def get_serializable_data(self) -> List[Dict[str,Any]]: return []
+        def iter_serializable(self) -> Iterable[Dict[str,Any]]: return iter(())
+        def get_all_shared_conditions(self) -> Iterable[Any]: return ()
+        def get_all_shared_conditions_snapshot(self) -> List[Any]: return []
         def get_all_shared_conditions_summary(self) -> Dict[str, Dict[str,str]]: return {}
         def get_condition_display_map(self) -> Dict[str,str]: return {}
         def get_shared_condition_by_id(self,id_str:str) -> Optional[Any]: return None
         def add_or_update_shared_condition(self, c_obj: Any) -> bool: return False
         def update_shared_condition_from_data(self, id_str:str, data: Dict[str,Any]) -> bool: return False
         def delete_shared_condition(self, id_str:str) -> bool: return False
-        def is_condition_id_in_use(self, id_str:str, jobs: List[Job]) -> bool: return False
+        def is_condition_id_in_use(self, id_str:str, jobs: Optional[List[Job]] = None) -> bool: return False
+        def register_job_usage(self, job: Any) -> None: pass
+        def unregister_job_usage(self, job_name: str) -> None: pass
+        def rebuild_usage_index(self, jobs: List[Job]) -> None: pass
     class Condition: id: str; name: str; type: str; is_monitored_by_ai_brain: bool
 
 try:
@@ -234,7 +240,9 @@ class JobManager:
             
             self.jobs = new_jobs; self.triggers = new_triggers; self.shape_templates = loaded_shape_templates_data
             self.current_profile_name = profile_name 
-            if self.condition_manager: self.condition_manager.load_shared_conditions(loaded_shared_conditions_data)
+            if self.condition_manager:
+                self.condition_manager.load_shared_conditions(loaded_shared_conditions_data)
+                self.condition_manager.rebuild_usage_index(list(self.jobs.values()))
 
             if self.observer:
                  self.observer.load_triggers(list(self.triggers.values()))
@@ -258,8 +266,9 @@ class JobManager:
                 current_jobs_data = {name: job.to_dict() for name, job in self.jobs.items() if isinstance(job, Job)}
                 current_triggers_data = {name: trigger.to_dict() for name, trigger in self.triggers.items() if isinstance(trigger, Trigger)}
                 current_shape_templates_data = copy.deepcopy(self.shape_templates)
-                current_shared_conditions_data: List[Dict[str, Any]] = []
-                if self.condition_manager: current_shared_conditions_data = self.condition_manager.get_serializable_data()
+                # Streamed: save_profile writes the shared conditions one entry at a time.
+                current_shared_conditions_data: Iterable[Dict[str, Any]] = []
+                if self.condition_manager: current_shared_conditions_data = self.condition_manager.iter_serializable()
                 
                 profile_data_to_save = {
                     "jobs": current_jobs_data, "triggers": current_triggers_data,
@@ -332,6 +341,7 @@ class JobManager:
             if not name: raise ValueError("Job name cannot be empty.")
             if name in self.jobs: raise ValueError(f"Job '{name}' already exists. Use update_job.")
             self.jobs[name] = job
+            if self.condition_manager: self.condition_manager.register_job_usage(job)
             self.save_current_profile()
             if job.enabled and not self._is_globally_recording_keys: self._bind_job_keys(job)
             logger.info(f"Job '{name}' added.")
@@ -362,6 +372,9 @@ class JobManager:
             
             if original_name != new_name: del self.jobs[original_name]
             self.jobs[new_name] = updated_job
+            if self.condition_manager:
+                self.condition_manager.unregister_job_usage(original_name)
+                self.condition_manager.register_job_usage(updated_job)
             
             if updated_job.enabled and not self._is_globally_recording_keys: self._bind_job_keys(updated_job)
             self.save_current_profile()
@@ -379,6 +392,7 @@ class JobManager:
             if job_ref and not self._is_globally_recording_keys: self._unbind_job_keys(job_ref)
             
             del self.jobs[name]
+            if self.condition_manager: self.condition_manager.unregister_job_usage(name)
             self.save_current_profile()
             logger.info(f"Job '{name}' deleted.")
 
@@ -488,10 +502,10 @@ class JobManager:
     def get_shared_condition_by_id(self, condition_id: str) -> Optional['Condition']:
         return self.condition_manager.get_shared_condition_by_id(condition_id) if self.condition_manager else None
 
-    def get_all_shared_conditions_summary(self) -> Dict[str, Dict[str, str]]:
+    def get_all_shared_conditions_summary(self) -> Mapping[str, Dict[str, str]]:
         return self.condition_manager.get_all_shared_conditions_summary() if self.condition_manager else {}
     
-    def get_condition_display_map_for_ui(self) -> Dict[str,str]:
+    def get_condition_display_map_for_ui(self) -> Mapping[str,str]:
         return self.condition_manager.get_condition_display_map() if self.condition_manager else {}
 
     def add_shape_template(self, template_name: str, template_data: Dict[str, Any]) -> None:
@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 _CoreClassesImported = False
 try:
     from core.trigger import Trigger, TriggerAction
-    from core.condition import Condition
+    from core.condition import Condition, ColorAtPositionCondition
     _CoreClassesImported = True
 except ImportError as e:
     _CoreClassesImported = False
@@ -31,6 +31,7 @@ except ImportError as e:
         def check_conditions(self, **c: Any) -> bool: return False 
         def trigger(self, t: float) -> Optional[List[Any]]: return self.actions if self.actions else None
     class TriggerAction: pass # type: ignore
+    class ColorAtPositionCondition(Condition): pass # type: ignore
     
 
 if TYPE_CHECKING:
@@ -115,8 +116,8 @@ class Observer:
             self._monitored_conditions_map.clear()
             condition_manager = self.job_manager.condition_manager
             all_shared_conditions: List[Condition] = []
-            if hasattr(condition_manager, 'get_all_shared_conditions'):
-                all_shared_conditions = condition_manager.get_all_shared_conditions()
+            if hasattr(condition_manager, 'get_all_shared_conditions_snapshot'):
+                all_shared_conditions = condition_manager.get_all_shared_conditions_snapshot()
 
             for cond in all_shared_conditions:
                 if (_CoreClassesImported and isinstance(cond, Condition) and cond.is_monitored_by_ai_brain) or \
@@ -239,20 +240,30 @@ class Observer:
             return
 
         condition_manager = self.job_manager.condition_manager
+        context = {"image_storage_instance": self.image_storage, "condition_manager": condition_manager}
         with self.lock:
             monitored_ids_copy = list(self._monitored_conditions_map.keys())
+            color_conditions: List[ColorAtPositionCondition] = []
             for cond_id in monitored_ids_copy: 
                 condition_obj = condition_manager.get_shared_condition_by_id(cond_id)
                 if condition_obj and hasattr(condition_obj, 'is_monitored_by_ai_brain') and condition_obj.is_monitored_by_ai_brain:
-                    context = {"image_storage_instance": self.image_storage, "condition_manager": condition_manager}
+                    if _CoreClassesImported and isinstance(condition_obj, ColorAtPositionCondition):
+                        color_conditions.append(condition_obj); continue
                     try:
                         current_check_result = condition_obj.check(**context)
                         self._monitored_conditions_map[cond_id] = current_check_result
-                    except Exception:
+                    except Exception as e_check:
+                        logger.error(f"Observer: Error checking monitored condition '{cond_id}': {e_check}", exc_info=True)
                         self._monitored_conditions_map[cond_id] = False 
                 else:
                     if cond_id in self._monitored_conditions_map:
                         del self._monitored_conditions_map[cond_id]
+            if color_conditions:
+                # One capture for all monitored pixel checks instead of a GetPixelColor round-trip each.
+                try: self._monitored_conditions_map.update(ColorAtPositionCondition.batch_check(color_conditions, **context))
+                except Exception as e_batch:
+                    logger.error(f"Observer: Error batch-checking {len(color_conditions)} color condition(s): {e_batch}", exc_info=True)
+                    for cond in color_conditions: self._monitored_conditions_map[cond.id] = False
         
     def _check_ai_trigger_conditions(self, ai_trigger: Trigger, current_time: float) -> bool:
         logger.debug("_check_ai_trigger_conditions")
@@ -2,7 +2,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
-from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable, Iterable
 import copy # Thêm copy
 
 logger = logging.getLogger(__name__)
@@ -132,7 +132,7 @@ class AIBrainManagementTab(ttk.Frame):
                 return
 
             condition_manager = self.job_manager.condition_manager
-            all_shared: List[Condition] = []
+            all_shared: Iterable[Condition] = ()
             if hasattr(condition_manager, 'get_all_shared_conditions'):
                 all_shared = condition_manager.get_all_shared_conditions()
 
@@ -7,6 +7,8 @@ import subprocess
 import io
 import sys
 import logging
+import threading
+import atexit
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,13 @@ except ImportError:
     _CV2Available = False
     logger.error("OpenCV (cv2) library not found. Cannot decode captured images.")
 
+try:
+    from multiprocessing import shared_memory
+    _SharedMemoryAvailable = True
+except ImportError:
+    _SharedMemoryAvailable = False
+    logger.warning("multiprocessing.shared_memory not available. Captures will be transferred as PNG over the pipe.")
+
 
 PIPE_NAME = r'\\.\pipe\AutoClickerEnhanced_OS_Interaction_Pipe'
 BUFFER_SIZE = 8192 * 4 
@@ -67,6 +76,29 @@ class OSInteractionClient:
              logger.critical("OSInteractionClient cannot function on Windows because pywin32 is not installed.")
         if not _CV2Available:
             logger.error("OpenCV is not available, image decoding will fail.")
+        # Capture handoff buffer: the C# service writes raw BGRA pixels here instead of PNG/Base64 over the pipe.
+        self._capture_shm = None
+        self._capture_shm_lock = threading.Lock()
+        self._capture_shm_enabled = _IS_WINDOWS and _SharedMemoryAvailable
+        atexit.register(self._release_capture_shm)
+
+    def _get_capture_shm(self, min_size: int):
+        """Returns the shared memory block for captures, (re)allocating it if smaller than min_size."""
+        if self._capture_shm is not None and self._capture_shm.size >= min_size:
+            return self._capture_shm
+        self._release_capture_shm()
+        self._capture_shm = shared_memory.SharedMemory(create=True, size=min_size)
+        logger.debug(f"Allocated capture shared memory '{self._capture_shm.name}' ({self._capture_shm.size} bytes).")
+        return self._capture_shm
+
+    def _release_capture_shm(self):
+        if self._capture_shm is None: return
+        try:
+            self._capture_shm.close()
+            self._capture_shm.unlink()
+        except Exception as e:
+            logger.debug(f"Error releasing capture shared memory: {e}")
+        self._capture_shm = None
 
     def _connect_to_pipe(self, timeout_seconds=INITIAL_CONNECT_TIMEOUT_SECONDS):
         if not _IS_WINDOWS or not _WinPipeAvailable:
@@ -221,6 +253,10 @@ class OSInteractionClient:
             "useGrayscale": useGrayscale,
             "useBinarization": useBinarization,
         }
+        # The shared memory block always carries raw BGRA, so preprocessed captures go through the PNG transfer.
+        if self._capture_shm_enabled and not useGrayscale and not useBinarization and x2 > x1 and y2 > y1:
+            shm_capture = self._capture_region_shm(params, (x2 - x1) * (y2 - y1) * 4)
+            if shm_capture is not None: return shm_capture
         result = self._send_request("CaptureRegion", params) 
 
         if isinstance(result, dict) and result.get("captured_image_bytes") is not None:
@@ -253,6 +289,45 @@ class OSInteractionClient:
              logger.error(f"Invalid or incomplete result received from C# CaptureRegion: {result}")
              raise ValueError("Invalid or incomplete result from C# CaptureRegion (missing 'captured_image_bytes').")
 
+    def _capture_region_shm(self, params: dict, min_size: int) -> dict | None:
+        """
+        CaptureRegion via the shared memory block. Returns None (caller falls back to the PNG transfer)
+        if shared memory cannot be used. Shared memory is only switched off for good when the block cannot
+        be allocated or the service predates the shared memory protocol.
+        """
+        with self._capture_shm_lock: # One capture buffer; the next capture may overwrite it.
+            try:
+                shm = self._get_capture_shm(min_size)
+            except (OSError, ValueError) as shm_err:
+                logger.warning(f"Could not allocate capture shared memory ({shm_err}). Falling back to PNG transfer.")
+                self._capture_shm_enabled = False
+                return None
+            try:
+                result = self._send_request("CaptureRegion", dict(params, shm_name=shm.name, shm_size=shm.size))
+            except RuntimeError as service_err:
+                # An error status is usually transient (secure desktop, display change): PNG for this call only.
+                logger.warning(f"Shared memory CaptureRegion failed ({service_err}). Falling back to PNG transfer for this capture.")
+                return None
+            if not isinstance(result, dict) or result.get("shm_width") is None:
+                logger.warning("C# service did not use shared memory for CaptureRegion. Falling back to PNG transfer.")
+                self._capture_shm_enabled = False
+                return None
+            try:
+                width, height = int(result["shm_width"]), int(result["shm_height"])
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"C# CaptureRegion returned invalid shared memory size: {result}") from e
+            if width <= 0 or height <= 0 or width * height * 4 > shm.size:
+                raise ValueError(f"C# CaptureRegion returned out-of-range shared memory size: {width}x{height}")
+            # Copy out while holding the lock: callers keep (and sometimes mutate) the image after the buffer is reused.
+            img_np = np.ndarray((height, width, 4), dtype=np.uint8, buffer=shm.buf).copy()
+
+        actual_x1 = result.get("actual_x1", params["x1"])
+        actual_y1 = result.get("actual_y1", params["y1"])
+        actual_x2 = result.get("actual_x2", actual_x1 + width)
+        actual_y2 = result.get("actual_y2", actual_y1 + height)
+        logger.debug(f"CaptureRegion (shared memory) success. Shape: {img_np.shape}, Actual Bounds: ({actual_x1},{actual_y1})-({actual_x2},{actual_y2})")
+        return {"image_np": img_np, "x1": actual_x1, "y1": actual_y1, "x2": actual_x2, "y2": actual_y2}
+
     def get_pixel_color(self, x: int, y: int) -> str:
         params = {"x": x, "y": y}
         result = self._send_request("GetPixelColor", params) 
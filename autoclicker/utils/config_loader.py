@@ -5,6 +5,7 @@ import os
 import logging
 import glob
 import shutil 
+import tempfile
 from typing import List, Dict, Any, Optional 
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,24 @@ logger = logging.getLogger(__name__)
 DEFAULT_PROFILE_NAME = "default"
 PROFILE_EXTENSION = ".profile.json"
 
+def _dump_profile(data_to_save: Dict[str, Any], f: Any) -> None:
+    """
+    Same output as json.dump(data_to_save, f, indent=4), except that a non-list "shared_conditions"
+    (the last key; e.g. ConditionManager.iter_serializable()) is encoded and written one entry at a time.
+    """
+    shared_conditions = data_to_save["shared_conditions"]
+    if isinstance(shared_conditions, list):
+        json.dump(data_to_save, f, indent=4)
+        return
+    head = json.dumps({k: v for k, v in data_to_save.items() if k != "shared_conditions"}, indent=4)
+    f.write(head[:-2]) # drop the closing "\n}"
+    f.write(',\n    "shared_conditions": [')
+    wrote_any = False
+    for cond_data in shared_conditions:
+        f.write(("," if wrote_any else "") + "\n        " + json.dumps(cond_data, indent=4).replace("\n", "\n        "))
+        wrote_any = True
+    f.write("\n    ]\n}" if wrote_any else "]\n}")
+
 class ConfigLoader:
     profile_dir: str
     general_config_file: str
@@ -107,13 +126,23 @@ class ConfigLoader:
         }
 
         self._ensure_profile_dir_exists()
+        # Shared conditions are serialized lazily while writing, so write to a temp file next to the profile and
+        # swap it in only once complete: a failing to_dict() or non-JSON param never leaves a truncated profile.
+        tmp_path: Optional[str] = None
         try:
-            with open(profile_path, "w", encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=4)
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(profile_path) + ".", suffix=".tmp", dir=os.path.dirname(profile_path) or ".")
+            with os.fdopen(fd, "w", encoding='utf-8') as f:
+                _dump_profile(data_to_save, f)
+            os.replace(tmp_path, profile_path)
+            tmp_path = None
         except TypeError as e:
             raise ValueError(f"Data for profile '{profile_name}' is not JSON serializable.") from e
         except Exception as e:
             raise IOError(f"Error saving profile '{profile_name}': {e}") from e
+        finally:
+            if tmp_path is not None:
+                try: os.remove(tmp_path)
+                except OSError: pass
 
     def delete_profile(self, profile_name: str) -> bool:
         if profile_name == DEFAULT_PROFILE_NAME: return False
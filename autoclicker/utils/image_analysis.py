@@ -4,7 +4,7 @@ import cv2
 import numpy as np
 import logging
 from collections import Counter
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Sequence
 
 try:
     from .color_utils import rgb_to_hex, hex_to_rgb 
@@ -20,6 +20,91 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+_NumbaAvailable = False
+try:
+    from numba import njit, prange
+    _NumbaAvailable = True
+except ImportError:
+    logger.debug("image_analysis: numba not available, region color counting uses the cv2.inRange path.")
+
+if _NumbaAvailable:
+    @njit(parallel=True, cache=True, nogil=True)
+    def _count_target_pixels_njit(image, lowers, uppers, step):
+        rows = (image.shape[0] + step - 1) // step
+        cols = (image.shape[1] + step - 1) // step
+        n_targets, n_channels = lowers.shape
+        row_counts = np.zeros((rows, n_targets), dtype=np.int64)
+        for ri in prange(rows):
+            y = ri * step
+            for xi in range(cols):
+                x = xi * step
+                for t in range(n_targets):
+                    hit = True
+                    for ch in range(n_channels):
+                        v = image[y, x, ch]
+                        if v < lowers[t, ch] or v > uppers[t, ch]:
+                            hit = False
+                            break
+                    if hit:
+                        row_counts[ri, t] += 1
+                        break
+        return row_counts.sum(axis=0)
+
+def target_color_bounds(
+    targets_rgb: List[Tuple[int, int, int]],
+    tolerances: List[int],
+    bgr: bool = False
+) -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]:
+    """
+    Per-target inclusive (lower, upper) channel bounds for count_target_color_pixels: a pixel matches
+    a target when every channel is within tolerance. With bgr=True the bounds are in BGR order, so
+    captures can be analyzed without a color conversion.
+    """
+    lowers: List[Tuple[int, ...]] = []; uppers: List[Tuple[int, ...]] = []
+    for rgb, tolerance in zip(targets_rgb, tolerances):
+        channels = tuple(reversed(rgb)) if bgr else tuple(rgb)
+        lowers.append(tuple(max(0, int(c) - tolerance) for c in channels))
+        uppers.append(tuple(min(255, int(c) + tolerance) for c in channels))
+    return lowers, uppers
+
+def count_target_color_pixels(
+    image_np: np.ndarray,
+    lower_bounds: List[Tuple[int, ...]],
+    upper_bounds: List[Tuple[int, ...]],
+    sampling_step: int = 1,
+    stop_fractions: Optional[Sequence[float]] = None
+) -> Tuple[np.ndarray, int]:
+    """
+    Counts sampled pixels of a 3/4-channel uint8 image per target box (see target_color_bounds).
+    A pixel is counted for the first target it matches only. With numba, all targets are tested in
+    one parallel pass over the sampled pixels (no strided copy); otherwise each target is one
+    cv2.inRange pass, with pixels already claimed by an earlier target masked out.
+
+    stop_fractions (one per target, 0..1) lets "any target" callers stop early: the per-target
+    inRange passes end as soon as a target's count reaches its fraction of the sampled pixels,
+    leaving the remaining counts at 0.
+
+    Returns:
+        (counts per target, number of sampled pixels)
+    """
+    if _NumbaAvailable and lower_bounds and (sampling_step > 1 or len(lower_bounds) > 2):
+        counts = _count_target_pixels_njit(image_np, np.array(lower_bounds, dtype=np.int16),
+                                           np.array(upper_bounds, dtype=np.int16), sampling_step)
+        return counts, ((image_np.shape[0] + sampling_step - 1) // sampling_step) * ((image_np.shape[1] + sampling_step - 1) // sampling_step)
+    sampled = image_np[::sampling_step, ::sampling_step] if sampling_step > 1 else image_np
+    alpha_lower, alpha_upper = ((0,), (255,)) if sampled.shape[2] == 4 else ((), ())
+    counts = np.zeros(len(lower_bounds), dtype=np.int64)
+    total_sampled = sampled.shape[0] * sampled.shape[1]
+    unclaimed: Optional[np.ndarray] = None
+    for i, (lower, upper) in enumerate(zip(lower_bounds, upper_bounds)):
+        in_box = cv2.inRange(sampled, lower + alpha_lower, upper + alpha_upper)
+        if unclaimed is not None: in_box = cv2.bitwise_and(in_box, unclaimed)
+        counts[i] = cv2.countNonZero(in_box)
+        if stop_fractions is not None and counts[i] >= stop_fractions[i] * total_sampled: break
+        if i < len(lower_bounds) - 1:
+            unclaimed = cv2.bitwise_not(in_box) if unclaimed is None else cv2.bitwise_xor(unclaimed, in_box)
+    return counts, total_sampled
+
 def analyze_region_colors(
     image_np_rgb: Optional[np.ndarray],
     target_colors_with_tolerance: List[Tuple[Tuple[int, int, int], int]],
@@ -43,35 +128,22 @@ def analyze_region_colors(
         logger.warning(f"analyze_region_colors: Invalid sampling_step {sampling_step}, using 1.")
         sampling_step = 1
 
-    color_pixel_counts: Dict[str, int] = {}
+    hex_keys: List[str] = []
     for target_rgb_tuple, _ in target_colors_with_tolerance:
         try:
-            hex_key = rgb_to_hex(target_rgb_tuple)
-            color_pixel_counts[hex_key] = 0
+            hex_keys.append(rgb_to_hex(target_rgb_tuple))
         except Exception as e_hex:
             logger.error(f"analyze_region_colors: Error converting target RGB {target_rgb_tuple} to HEX: {e_hex}")
-            color_pixel_counts[f"ERROR_RGB({target_rgb_tuple[0]},{target_rgb_tuple[1]},{target_rgb_tuple[2]})"] = 0
-
-
-    total_sampled_pixels = 0
-
-    for r_idx in range(0, height, sampling_step):
-        for c_idx in range(0, width, sampling_step):
-            total_sampled_pixels += 1
-            px_r, px_g, px_b = image_np_rgb[r_idx, c_idx]
-
-            for target_rgb_tuple, tolerance in target_colors_with_tolerance:
-                target_r, target_g, target_b = target_rgb_tuple
-                if (abs(px_r - target_r) <= tolerance and
-                    abs(px_g - target_g) <= tolerance and
-                    abs(px_b - target_b) <= tolerance):
-                    try:
-                        hex_key = rgb_to_hex(target_rgb_tuple)
-                        if hex_key in color_pixel_counts: 
-                           color_pixel_counts[hex_key] += 1
-                    except Exception:
-                        pass
-                    break 
+            hex_keys.append(f"ERROR_RGB({target_rgb_tuple[0]},{target_rgb_tuple[1]},{target_rgb_tuple[2]})")
+
+    lowers, uppers = target_color_bounds([rgb for rgb, _ in target_colors_with_tolerance],
+                                         [tol for _, tol in target_colors_with_tolerance])
+    image_u8 = image_np_rgb if image_np_rgb.dtype == np.uint8 else cv2.convertScaleAbs(image_np_rgb)
+    counts, total_sampled_pixels = count_target_color_pixels(image_u8, lowers, uppers, sampling_step)
+
+    color_pixel_counts: Dict[str, int] = dict.fromkeys(hex_keys, 0)
+    for hex_key, count in zip(hex_keys, counts.tolist()):
+        if not hex_key.startswith("ERROR_RGB"): color_pixel_counts[hex_key] += count
 
     if total_sampled_pixels == 0:
         logger.debug("analyze_region_colors: No pixels were sampled.")
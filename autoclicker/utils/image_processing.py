@@ -15,7 +15,17 @@ DEFAULT_BILATERAL_SIGMA = 75
 DEFAULT_CANNY_T1 = 50
 DEFAULT_CANNY_T2 = 150
 
-def preprocess_for_image_matching(image_np: np.ndarray | None, pp_params: dict) -> np.ndarray | None:
+# Every pp_params key preprocess_for_image_matching reads; anything else in a params dict does not affect its output.
+IMAGE_MATCHING_PARAM_KEYS = (
+    'grayscale', 'binarization', 'gaussian_blur', 'gaussian_blur_kernel', 'median_blur', 'median_blur_kernel',
+    'clahe', 'clahe_clip_limit', 'clahe_tile_grid_size', 'bilateral_filter', 'bilateral_d',
+    'bilateral_sigma_color', 'bilateral_sigma_space', 'canny_edges', 'canny_threshold1', 'canny_threshold2',
+)
+
+def _fits_gray_dst(gray_dst: np.ndarray | None, image_np: np.ndarray) -> bool:
+    return gray_dst is not None and gray_dst.shape == image_np.shape[:2] and gray_dst.dtype == np.uint8 and image_np.dtype == np.uint8
+
+def preprocess_for_image_matching(image_np: np.ndarray | None, pp_params: dict, gray_dst: np.ndarray | None = None) -> np.ndarray | None:
     """
     Apply a configurable preprocessing procedure suitable for image matching.
     (Template Matching, Feature Matching).
@@ -39,18 +49,25 @@ def preprocess_for_image_matching(image_np: np.ndarray | None, pp_params: dict)
         'canny_edges': bool (default: False)
         'canny_threshold1': float (e.g., 50)
         'canny_threshold2': float (e.g., 150)
+        gray_dst: Optional preallocated (H, W) uint8 buffer the grayscale conversion writes into; ignored
+        if its shape/dtype don't fit. The result may then alias it.
     Returns:
     Preprocessed image as a NumPy array, or original image if no
     processing applied or possible, or None if input is invalid.
+    The input is never modified (every step produces a new array), so callers
+    can pass views/ROIs directly without copying them first.
     
     """
     if image_np is None or not isinstance(image_np, np.ndarray) or image_np.size == 0:
-    logger.warning("preprocess_for_image_matching received an invalid input image.")
+        logger.warning("preprocess_for_image_matching received an invalid input image.")
         return None
 
     try:
-        processed = image_np.copy()
+        processed = image_np
         logger.debug(f"Image Matching Preprocessing Start. Input shape: {processed.shape}")
+        # Matching and ORB consume 8-bit data; converting up front keeps every filter below on the CV_8U path.
+        if processed.dtype != np.uint8:
+            processed = cv2.convertScaleAbs(processed)
 
         use_grayscale = pp_params.get('grayscale', True) 
         is_gray = False
@@ -58,7 +75,7 @@ def preprocess_for_image_matching(image_np: np.ndarray | None, pp_params: dict)
             if processed.ndim == 3:
                 try:
                     code = cv2.COLOR_BGRA2GRAY if processed.shape[2] == 4 else cv2.COLOR_BGR2GRAY
-                    processed = cv2.cvtColor(processed, code)
+                    processed = cv2.cvtColor(processed, code, dst=gray_dst) if _fits_gray_dst(gray_dst, processed) else cv2.cvtColor(processed, code)
                     is_gray = True
                     logger.debug("Applied Grayscale")
                 except cv2.error as e:
@@ -117,8 +134,8 @@ def preprocess_for_image_matching(image_np: np.ndarray | None, pp_params: dict)
                     logger.debug(f"Applied CLAHE (Clip: {clip}, Tile: {tile})")
                 else:
                     logger.warning(f"Invalid tile size CLAHE '{tile_str}', skip CLAHE.")
-            except cv2.error as e: logger.warning(f"CLAHE failed: {e}")
-            except Exception as e: logger.error(f"Unexpected error during CLAHE: {e}", exc_info=True)
+        except cv2.error as e: logger.warning(f"CLAHE failed: {e}")
+        except Exception as e: logger.error(f"Unexpected error during CLAHE: {e}", exc_info=True)
 
         use_canny = False 
         try:
@@ -145,7 +162,7 @@ def preprocess_for_image_matching(image_np: np.ndarray | None, pp_params: dict)
         logger.error(f"Unexpected error in preprocess_for_image_matching: {main_ex}", exc_info=True)
         return image_np 
 
-def preprocess_for_ocr(image_np: np.ndarray | None, pp_params: dict) -> np.ndarray | None:
+def preprocess_for_ocr(image_np: np.ndarray | None, pp_params: dict, gray_dst: np.ndarray | None = None) -> np.ndarray | None:
     """
     Apply a configurable preprocessing procedure optimized for OCR.
 
@@ -165,40 +182,29 @@ def preprocess_for_ocr(image_np: np.ndarray | None, pp_params: dict) -> np.ndarr
         'clahe_tile_grid_size': str (e.g., "8,8")
         'bilateral_filter': bool (default: False)
         # ... other bilateral parameters if used for OCR ...
+        gray_dst: Optional preallocated (H, W) uint8 buffer for the grayscale conversion, as in preprocess_for_image_matching.
     Returns:
         The image is pre-processed as a NumPy array, or the original image if no processing is applied or possible, or None if the input is invalid.
+        The input is never modified.
     """
     if image_np is None or not isinstance(image_np, np.ndarray) or image_np.size == 0:
         logger.warning("preprocess_for_ocr received an invalid input image.")
         return None
 
     try:
-        processed = image_np.copy()
+        # Every step below returns a new image, so the input (often a strided crop of a capture) is never
+        # written to and needs no defensive copy; the first OpenCV step produces a contiguous result.
+        processed = image_np
         logger.debug(f"OCR Preprocessing Start. Input shape: {processed.shape}")
 
-        try:
-            upscale_factor = pp_params.get('ocr_upscale_factor', 1.0)
-            try:
-                upscale_factor = float(upscale_factor)
-            except (ValueError, TypeError):
-                logger.warning(f"ocr_upscale_factor is invalid '{pp_params.get('ocr_upscale_factor')}', use 1.0.")
-                upscale_factor = 1.0
-
-            if upscale_factor > 1.0:
-                    new_width = int(processed.shape[1] * upscale_factor)
-                    new_height = int(processed.shape[0] * upscale_factor)
-                    processed = cv2.resize(processed, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-                    logger.debug(f"Applied Upscaling (Factor: {upscale_factor:.2f}), New shape: {processed.shape}")
-        except cv2.error as e: logger.warning(f"Upscaling failed: {e}")
-        except Exception as e: logger.error(f"Unexpected error during Upscaling: {e}", exc_info=True)
-
-        use_grayscale = pp_params.get('grayscale', True) 
+        # Grayscale first: OpenCV's SIMD cvtColor is cheap and the upscale below then resizes one channel instead of three.
+        use_grayscale = pp_params.get('grayscale', True)
         is_gray = False
         if use_grayscale or processed.ndim != 2:
             if processed.ndim == 3:
                 try:
                     code = cv2.COLOR_BGRA2GRAY if processed.shape[2] == 4 else cv2.COLOR_BGR2GRAY
-                    processed = cv2.cvtColor(processed, code)
+                    processed = cv2.cvtColor(processed, code, dst=gray_dst) if _fits_gray_dst(gray_dst, processed) else cv2.cvtColor(processed, code)
                     is_gray = True
                     logger.debug("Applied Grayscale for OCR")
                 except cv2.error as e:
@@ -213,6 +219,22 @@ def preprocess_for_ocr(image_np: np.ndarray | None, pp_params: dict) -> np.ndarr
              logger.warning("Image not Grayscale after conversion attempt, skipping subsequent OCR preprocessing steps.")
              return processed
 
+        try:
+            upscale_factor = pp_params.get('ocr_upscale_factor', 1.0)
+            try:
+                upscale_factor = float(upscale_factor)
+            except (ValueError, TypeError):
+                logger.warning(f"ocr_upscale_factor is invalid '{pp_params.get('ocr_upscale_factor')}', use 1.0.")
+                upscale_factor = 1.0
+
+            if upscale_factor > 1.0:
+                    new_width = int(processed.shape[1] * upscale_factor)
+                    new_height = int(processed.shape[0] * upscale_factor)
+                    processed = cv2.resize(processed, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+                    logger.debug(f"Applied Upscaling (Factor: {upscale_factor:.2f}), New shape: {processed.shape}")
+        except cv2.error as e: logger.warning(f"Upscaling failed: {e}")
+        except Exception as e: logger.error(f"Unexpected error during Upscaling: {e}", exc_info=True)
+
         try:
             if pp_params.get('gaussian_blur', False): 
                 kernel_str = pp_params.get('gaussian_blur_kernel', "3,3")
@@ -251,8 +273,8 @@ def preprocess_for_ocr(image_np: np.ndarray | None, pp_params: dict) -> np.ndarr
                     processed = clahe_obj.apply(processed)
                     logger.debug(f"Applied CLAHE (Clip: {clip}, Tile: {tile}) for OCR")
                 else: logger.warning(f"Invalid tile size '{tile_str}', skip CLAHE for OCR.")
-            except cv2.error as e: logger.warning(f"CLAHE for OCR failed: {e}")
-            except Exception as e: logger.error(f"Unexpected error during CLAHE OCR: {e}", exc_info=True)
+        except cv2.error as e: logger.warning(f"CLAHE for OCR failed: {e}")
+        except Exception as e: logger.error(f"Unexpected error during CLAHE OCR: {e}", exc_info=True)
 
         try:
             if pp_params.get('adaptive_threshold', True): 
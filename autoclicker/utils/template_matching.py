@@ -0,0 +1,458 @@
+# utils/template_matching.py
+import logging
+import threading
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NumbaAvailable = False
+try:
+    from numba import njit, prange
+    _NumbaAvailable = True
+except ImportError:
+    logger.debug("template_matching: numba not available, NCC normalization uses the NumPy path.")
+
+# OpenCV's T-API runs matchTemplate as an OpenCL kernel when given cv2.UMat inputs; below this search
+# area the host<->device copies cost more than the correlation itself.
+OPENCL_MIN_SEARCH_AREA = 512 * 512
+try:
+    _OpenCLAvailable = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+except (AttributeError, cv2.error):
+    _OpenCLAvailable = False
+if _OpenCLAvailable:
+    logger.debug("template_matching: OpenCL available, large spatial matches run through cv2.UMat.")
+
+# CUDA template matching needs an OpenCV build with the cudaimgproc module and an NVIDIA device;
+# like OpenCL it only pays off once the search is large enough to hide the upload.
+CUDA_MIN_SEARCH_AREA = 512 * 512
+try:
+    _CudaAvailable = cv2.cuda.getCudaEnabledDeviceCount() > 0 and hasattr(cv2.cuda, "createTemplateMatching")
+except (AttributeError, cv2.error):
+    _CudaAvailable = False
+if _CudaAvailable:
+    logger.debug("template_matching: CUDA device available, large searches can run on the GPU.")
+_cuda_local = threading.local()
+
+FFT_MIN_TEMPLATE_AREA = 18 * 18
+FFT_MIN_SEARCH_TO_TEMPLATE_RATIO = 50
+
+def should_use_fft(search_shape: tuple, template_shape: tuple) -> bool:
+    """
+    Heuristic for choosing frequency-domain matching: the template must be reasonably large and
+    the search area much larger than the template, otherwise spatial matching is cheaper.
+    Only single-channel images are supported by the FFT path.
+    """
+    if len(search_shape) != 2 or len(template_shape) != 2:
+        return False
+    tpl_area = template_shape[0] * template_shape[1]
+    search_area = search_shape[0] * search_shape[1]
+    return tpl_area >= FFT_MIN_TEMPLATE_AREA and search_area > FFT_MIN_SEARCH_TO_TEMPLATE_RATIO * tpl_area
+
+def _ncc_normalize_numpy(numerator: np.ndarray, sum_img: np.ndarray, sum_sq_img: np.ndarray,
+                         tpl_norm: float, h_tpl: int, w_tpl: int) -> np.ndarray:
+    res_h, res_w = numerator.shape
+    window_sum = sum_img[h_tpl:, w_tpl:] - sum_img[:res_h, w_tpl:] - sum_img[h_tpl:, :res_w] + sum_img[:res_h, :res_w]
+    window_sum_sq = sum_sq_img[h_tpl:, w_tpl:] - sum_sq_img[:res_h, w_tpl:] - sum_sq_img[h_tpl:, :res_w] + sum_sq_img[:res_h, :res_w]
+    window_var = np.maximum(window_sum_sq - window_sum * window_sum / (h_tpl * w_tpl), 0.0)
+    denominator = tpl_norm * np.sqrt(window_var)
+
+    result = np.zeros((res_h, res_w), dtype=np.float32)
+    np.divide(numerator, denominator, out=result, where=denominator > 1e-6, casting="unsafe")
+    return result
+
+if _NumbaAvailable:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _ncc_normalize_njit(numerator, sum_img, sum_sq_img, tpl_norm, h_tpl, w_tpl):
+        res_h, res_w = numerator.shape
+        inv_area = 1.0 / (h_tpl * w_tpl)
+        result = np.zeros((res_h, res_w), dtype=np.float32)
+        for y in prange(res_h):
+            for x in range(res_w):
+                s = sum_img[y + h_tpl, x + w_tpl] - sum_img[y, x + w_tpl] - sum_img[y + h_tpl, x] + sum_img[y, x]
+                sq = sum_sq_img[y + h_tpl, x + w_tpl] - sum_sq_img[y, x + w_tpl] - sum_sq_img[y + h_tpl, x] + sum_sq_img[y, x]
+                var = sq - s * s * inv_area
+                if var > 0.0:
+                    denominator = tpl_norm * np.sqrt(var)
+                    if denominator > 1e-6:
+                        result[y, x] = numerator[y, x] / denominator
+        return result
+
+def _ncc_normalize(numerator: np.ndarray, sum_img: np.ndarray, sum_sq_img: np.ndarray,
+                   tpl_norm: float, h_tpl: int, w_tpl: int) -> np.ndarray:
+    """Divides the raw correlation by tpl_norm * window std, using windowed sums from integral images."""
+    if _NumbaAvailable:
+        return _ncc_normalize_njit(np.ascontiguousarray(numerator), sum_img, sum_sq_img, tpl_norm, h_tpl, w_tpl)
+    return _ncc_normalize_numpy(numerator, sum_img, sum_sq_img, tpl_norm, h_tpl, w_tpl)
+
+def _window_sums(integral_img: np.ndarray, h_tpl: int, w_tpl: int) -> np.ndarray:
+    """Per-window sums for every template position, from an (H+1, W+1) integral image."""
+    res_h, res_w = integral_img.shape[0] - h_tpl, integral_img.shape[1] - w_tpl
+    return integral_img[h_tpl:, w_tpl:] - integral_img[:res_h, w_tpl:] - integral_img[h_tpl:, :res_w] + integral_img[:res_h, :res_w]
+
+def _fft_correlate(search_f: np.ndarray, kernel_f: np.ndarray) -> np.ndarray:
+    """Valid-mode cross-correlation of search_f with kernel_f via cv2.dft, shape (H-h+1, W-w+1)."""
+    h_s, w_s = search_f.shape
+    h_t, w_t = kernel_f.shape
+    dft_h = cv2.getOptimalDFTSize(h_s)
+    dft_w = cv2.getOptimalDFTSize(w_s)
+    search_padded = cv2.copyMakeBorder(search_f, 0, dft_h - h_s, 0, dft_w - w_s, cv2.BORDER_CONSTANT, value=0)
+    kernel_padded = cv2.copyMakeBorder(kernel_f, 0, dft_h - h_t, 0, dft_w - w_t, cv2.BORDER_CONSTANT, value=0)
+
+    search_spectrum = cv2.dft(search_padded, flags=cv2.DFT_COMPLEX_OUTPUT)
+    kernel_spectrum = cv2.dft(kernel_padded, flags=cv2.DFT_COMPLEX_OUTPUT)
+    corr_spectrum = cv2.mulSpectrums(search_spectrum, kernel_spectrum, 0, conjB=True)
+    return cv2.idft(corr_spectrum, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)[:h_s - h_t + 1, :w_s - w_t + 1]
+
+def template_fft_stats(template_np: np.ndarray, method: int) -> tuple:
+    """
+    The template-only part of match_template_fft, so callers that keep templates around can compute it once:
+    (correlation kernel as float32, norm term) - the zero-mean template and its L2 norm for
+    TM_CCOEFF_NORMED, the raw template and its sum of squares otherwise.
+    """
+    tpl_f = template_np.astype(np.float32)
+    if method == cv2.TM_CCOEFF_NORMED:
+        tpl_zero_mean = tpl_f - float(tpl_f.mean())
+        return tpl_zero_mean, float(np.sqrt(np.sum(tpl_zero_mean * tpl_zero_mean)))
+    return tpl_f, float(np.sum(tpl_f * tpl_f))
+
+def _integral2(search_f: np.ndarray, result_buffers: dict | None) -> tuple:
+    """cv2.integral2 in CV_64F, writing into buffers kept in result_buffers (keyed by search shape) when given."""
+    if result_buffers is None:
+        return cv2.integral2(search_f, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    key = ("integral2", search_f.shape[0], search_f.shape[1])
+    buffers = result_buffers.get(key)
+    if buffers is None:
+        if len(result_buffers) >= MAX_RESULT_BUFFERS:
+            result_buffers.clear()
+        integral_shape = (search_f.shape[0] + 1, search_f.shape[1] + 1)
+        buffers = (np.empty(integral_shape, dtype=np.float64), np.empty(integral_shape, dtype=np.float64))
+        result_buffers[key] = buffers
+    return cv2.integral2(search_f, sum=buffers[0], sqsum=buffers[1], sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+def match_template_fft(search_np: np.ndarray, template_np: np.ndarray, method: int = cv2.TM_CCOEFF_NORMED,
+                       template_stats: tuple | None = None, result_buffers: dict | None = None) -> np.ndarray:
+    """
+    Normalized template matching computed in the frequency domain.
+
+    The numerator is a cross-correlation done with cv2.dft + cv2.mulSpectrums(conjB=True): with the
+    zero-mean template for TM_CCOEFF_NORMED, with the raw template for TM_CCORR_NORMED and
+    TM_SQDIFF_NORMED. Per-window sums / sums of squares come from integral images, so each
+    window's normalization costs O(1); the CCOEFF normalization runs as a parallel numba kernel
+    when numba is installed.
+
+    Args:
+        search_np: Single-channel search image.
+        template_np: Single-channel template, not larger than search_np.
+        method: TM_CCOEFF_NORMED, TM_CCORR_NORMED or TM_SQDIFF_NORMED.
+        template_stats: template_fft_stats(template_np, method), if the caller has it cached.
+        result_buffers: Optional dict (see get_result_buffer) whose integral image buffers are reused.
+    Returns:
+        Result matrix of shape (H-h+1, W-w+1), float32, same semantics as cv2.matchTemplate.
+    """
+    search_f = search_np.astype(np.float32, copy=False)
+    kernel_f, tpl_norm_term = template_stats if template_stats is not None else template_fft_stats(template_np, method)
+    h_t, w_t = kernel_f.shape
+    sum_img, sum_sq_img = _integral2(search_f, result_buffers)
+
+    if method == cv2.TM_CCOEFF_NORMED:
+        return _ncc_normalize(_fft_correlate(search_f, kernel_f), sum_img, sum_sq_img, tpl_norm_term, h_t, w_t)
+
+    numerator = _fft_correlate(search_f, kernel_f)
+    tpl_sum_sq = tpl_norm_term
+    window_sum_sq = _window_sums(sum_sq_img, h_t, w_t)
+    denominator = np.sqrt(window_sum_sq * tpl_sum_sq)
+    if method == cv2.TM_SQDIFF_NORMED:
+        numerator = window_sum_sq - 2.0 * numerator + tpl_sum_sq
+        result = np.ones(numerator.shape, dtype=np.float32) # all-black window: treat as worst match
+    else:
+        result = np.zeros(numerator.shape, dtype=np.float32)
+    np.divide(numerator, denominator, out=result, where=denominator > 1e-6, casting="unsafe")
+    return result
+
+MAX_RESULT_BUFFERS = 16
+
+def get_result_buffer(result_buffers: dict, search_shape: tuple, template_shape: tuple) -> np.ndarray:
+    """
+    Returns a float32 buffer shaped like the matchTemplate result for these shapes, reusing the one
+    stored in result_buffers (keyed by (search_h, search_w, tpl_h, tpl_w)) when present.
+    The dict is cleared once it holds MAX_RESULT_BUFFERS entries, so varying ROIs can't grow it unbounded.
+    """
+    key = (search_shape[0], search_shape[1], template_shape[0], template_shape[1])
+    buffer = result_buffers.get(key)
+    if buffer is None:
+        if len(result_buffers) >= MAX_RESULT_BUFFERS:
+            result_buffers.clear()
+        buffer = np.empty((key[0] - key[2] + 1, key[1] - key[3] + 1), dtype=np.float32)
+        result_buffers[key] = buffer
+    return buffer
+
+def match_template(search_np: np.ndarray, template_np: np.ndarray, method: int, result_buffers: dict | None = None,
+                   template_stats: tuple | None = None) -> np.ndarray:
+    """
+    Runs a normalized matchTemplate method, picking the FFT path for large single-channel searches
+    and OpenCL (when present) for other large searches.
+    If result_buffers is given, the spatial path writes into a reused buffer from it (and the FFT path
+    reuses its integral images); the returned matrix is then only valid until the next call with the
+    same dict. template_stats is passed on to match_template_fft.
+    """
+    if method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED) and \
+       should_use_fft(search_np.shape, template_np.shape):
+        logger.debug(f"match_template: Using FFT path. Method: {method}, Search: {search_np.shape}, Tpl: {template_np.shape}")
+        return match_template_fft(search_np, template_np, method, template_stats, result_buffers)
+    global _OpenCLAvailable
+    if _OpenCLAvailable and search_np.shape[0] * search_np.shape[1] >= OPENCL_MIN_SEARCH_AREA:
+        try:
+            return cv2.matchTemplate(cv2.UMat(search_np), cv2.UMat(template_np), method).get()
+        except cv2.error as e_ocl:
+            logger.warning(f"match_template: OpenCL matchTemplate failed, using the CPU path from now on: {e_ocl}")
+            _OpenCLAvailable = False
+    if result_buffers is None:
+        return cv2.matchTemplate(search_np, template_np, method)
+    result = get_result_buffer(result_buffers, search_np.shape, template_np.shape)
+    return cv2.matchTemplate(search_np, template_np, method, result=result)
+
+def match_template_ccoeff_normed(search_np: np.ndarray, template_np: np.ndarray, result_buffers: dict | None = None,
+                                 template_stats: tuple | None = None) -> np.ndarray:
+    """TM_CCOEFF_NORMED through match_template (FFT for large single-channel searches)."""
+    return match_template(search_np, template_np, cv2.TM_CCOEFF_NORMED, result_buffers, template_stats)
+
+PYRAMID_MAX_LEVELS = 3
+PYRAMID_MIN_COARSE_TEMPLATE_SIDE = 8
+PYRAMID_COARSE_THRESHOLD_RELAX = 0.15
+PYRAMID_REFINE_MARGIN = 2
+
+def build_pyramid(image_np: np.ndarray, levels: int) -> list:
+    """Returns [level0, level1, ...] where each level is cv2.pyrDown of the previous one."""
+    pyramid = [image_np]
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+    return pyramid
+
+def pyramid_levels_for(search_shape: tuple, template_shape: tuple) -> int:
+    """
+    Number of pyrDown levels worth using for this search, or 0 if a pyramid search is not worth it
+    (template too small to survive downsampling, or search area not much larger than the template).
+    """
+    min_tpl_side = min(template_shape[0], template_shape[1])
+    levels = 0
+    while levels < PYRAMID_MAX_LEVELS and (min_tpl_side >> (levels + 1)) >= PYRAMID_MIN_COARSE_TEMPLATE_SIDE:
+        levels += 1
+    if levels == 0:
+        return 0
+    if search_shape[0] * search_shape[1] < 16 * template_shape[0] * template_shape[1]:
+        return 0
+    return levels
+
+def _best_match(result_np: np.ndarray, method: int) -> tuple:
+    """(score, loc) of the best entry of a matchTemplate result: the minimum for TM_SQDIFF_NORMED, else the maximum."""
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result_np)
+    return (min_val, min_loc) if method == cv2.TM_SQDIFF_NORMED else (max_val, max_loc)
+
+def best_score_if_match(result_np: np.ndarray, threshold: float, method: int) -> tuple:
+    """
+    (score, loc) like _best_match, but reduces only the extreme the method needs and locates it
+    only when it passes the threshold; a miss returns (score, None) after a single pass.
+    """
+    if method == cv2.TM_SQDIFF_NORMED:
+        score = float(result_np.min())
+        if not score <= 1.0 - threshold: return score, None
+        flat_idx = int(result_np.argmin())
+    else:
+        score = float(result_np.max())
+        if not score >= threshold: return score, None
+        flat_idx = int(result_np.argmax())
+    y, x = divmod(flat_idx, result_np.shape[1])
+    return score, (x, y)
+
+def find_best_match_pyramid(search_np: np.ndarray, template_pyramid: list, threshold: float,
+                            method: int = cv2.TM_CCOEFF_NORMED) -> tuple:
+    """
+    Coarse-to-fine template search.
+
+    Matches the coarsest template level against an equally downsampled search image with a relaxed
+    threshold, then refines the best hit level by level inside a small window around the upscaled
+    location. Only the final level-0 match runs at full resolution, and only on a tiny ROI.
+
+    Args:
+        search_np: Full-resolution search image.
+        template_pyramid: Output of build_pyramid() for the template.
+        threshold: Final acceptance threshold (used to reject early at the coarse level). For
+            TM_SQDIFF_NORMED a match is accepted when its score is <= 1 - threshold.
+        method: TM_CCOEFF_NORMED, TM_CCORR_NORMED or TM_SQDIFF_NORMED.
+    Returns:
+        (score, (x, y)) at level 0; score is the coarse one if the coarse level was rejected.
+    """
+    levels = len(template_pyramid) - 1
+    search_pyramid = build_pyramid(search_np, levels)
+    is_diff_method = method == cv2.TM_SQDIFF_NORMED
+
+    coarse_res = match_template(search_pyramid[levels], template_pyramid[levels], method)
+    score, (loc_x, loc_y) = _best_match(coarse_res, method)
+    if (is_diff_method and score > (1.0 - threshold) + PYRAMID_COARSE_THRESHOLD_RELAX) or \
+       (not is_diff_method and score < max(0.0, threshold - PYRAMID_COARSE_THRESHOLD_RELAX)):
+        return score, (loc_x << levels, loc_y << levels)
+
+    for level in range(levels - 1, -1, -1):
+        level_search = search_pyramid[level]
+        level_tpl = template_pyramid[level]
+        h_t, w_t = level_tpl.shape[:2]
+        max_x = level_search.shape[1] - w_t
+        max_y = level_search.shape[0] - h_t
+        radius = 2 + PYRAMID_REFINE_MARGIN
+        x0 = max(0, min(loc_x * 2 - radius, max_x)); x1 = max(0, min(loc_x * 2 + radius, max_x))
+        y0 = max(0, min(loc_y * 2 - radius, max_y)); y1 = max(0, min(loc_y * 2 + radius, max_y))
+        roi = level_search[y0:y1 + h_t, x0:x1 + w_t]
+        score, roi_loc = _best_match(cv2.matchTemplate(roi, level_tpl, method), method)
+        loc_x, loc_y = x0 + roi_loc[0], y0 + roi_loc[1]
+    return score, (loc_x, loc_y)
+
+def cuda_match_worthwhile(search_np: np.ndarray, template_np: np.ndarray) -> bool:
+    """True if find_best_match_cuda should be used: CUDA present, single-channel 8-bit/float32 input, large search."""
+    return _CudaAvailable and search_np.ndim == 2 and template_np.ndim == 2 and search_np.dtype == template_np.dtype and \
+        search_np.dtype in (np.uint8, np.float32) and search_np.shape[0] * search_np.shape[1] >= CUDA_MIN_SEARCH_AREA
+
+def upload_template_cuda(template_np: np.ndarray):
+    """Uploads a template to the GPU once, so callers caching templates can pass it to find_best_match_cuda."""
+    template_gpu = cv2.cuda_GpuMat()
+    template_gpu.upload(template_np)
+    return template_gpu
+
+def _get_thread_cuda_state() -> dict:
+    """Per-thread CUDA stream, search-image GpuMat and matchers (keyed by (depth, method))."""
+    state = getattr(_cuda_local, "state", None)
+    if state is None:
+        state = {"stream": cv2.cuda.Stream(), "search": cv2.cuda_GpuMat(), "result": cv2.cuda_GpuMat(), "matchers": {}}
+        _cuda_local.state = state
+    return state
+
+def find_best_match_cuda(search_np: np.ndarray, template_np: np.ndarray, method: int = cv2.TM_CCOEFF_NORMED,
+                         template_gpu=None) -> tuple:
+    """
+    (score, (x, y)) of the best match, computed with cv2.cuda template matching on this thread's stream.
+    Only the search image is uploaded per call (template_gpu from upload_template_cuda skips the template
+    upload) and the reduction runs on the device, so just the score and location come back.
+    On a CUDA error the GPU path is disabled for the process and the search is redone on the CPU.
+    """
+    global _CudaAvailable
+    try:
+        state = _get_thread_cuda_state()
+        depth = cv2.CV_8U if search_np.dtype == np.uint8 else cv2.CV_32F
+        matcher = state["matchers"].get((depth, method))
+        if matcher is None:
+            matcher = cv2.cuda.createTemplateMatching(depth, method)
+            state["matchers"][(depth, method)] = matcher
+        stream = state["stream"]
+        state["search"].upload(search_np, stream)
+        if template_gpu is None: template_gpu = upload_template_cuda(template_np)
+        state["result"] = matcher.match(state["search"], template_gpu, state["result"], stream)
+        stream.waitForCompletion()
+        min_val, max_val, min_loc, max_loc = cv2.cuda.minMaxLoc(state["result"])
+        return (min_val, min_loc) if method == cv2.TM_SQDIFF_NORMED else (max_val, max_loc)
+    except cv2.error as e_cuda:
+        logger.warning(f"find_best_match_cuda: CUDA matchTemplate failed, using the CPU path from now on: {e_cuda}")
+        _CudaAvailable = False
+        return _best_match(cv2.matchTemplate(search_np, template_np, method), method)
+
+TILE_MIN_SIDE = 256
+
+def tiled_search_worthwhile(search_shape: tuple, template_shape: tuple) -> bool:
+    """True if the search spans more than one tile and match_template would run it on the CPU spatial path anyway."""
+    side = max(TILE_MIN_SIDE, 2 * max(template_shape[0], template_shape[1]))
+    if search_shape[0] <= side and search_shape[1] <= side: return False
+    if _OpenCLAvailable and search_shape[0] * search_shape[1] >= OPENCL_MIN_SEARCH_AREA: return False
+    return not should_use_fft(search_shape, template_shape)
+
+def find_first_match_tiled(search_np: np.ndarray, template_np: np.ndarray, threshold: float,
+                           method: int = cv2.TM_CCOEFF_NORMED) -> tuple:
+    """
+    Matches tile by tile in raster order and stops at the first tile holding a score past the
+    threshold, so a hit near the top-left only pays for the tiles before it. Tiles overlap by
+    template size - 1, so every placement is scored exactly once.
+
+    Returns:
+        (score, (x, y)) of the first hit, or (best score seen, None) when there is none.
+    """
+    h_t, w_t = template_np.shape[:2]
+    h_s, w_s = search_np.shape[:2]
+    side = max(TILE_MIN_SIDE, 2 * max(h_t, w_t))
+    step_y = side - h_t + 1; step_x = side - w_t + 1
+    is_diff_method = method == cv2.TM_SQDIFF_NORMED
+    best_score = None
+    for y0 in range(0, h_s - h_t + 1, step_y):
+        for x0 in range(0, w_s - w_t + 1, step_x):
+            tile_result = cv2.matchTemplate(search_np[y0:y0 + side, x0:x0 + side], template_np, method)
+            score, loc = best_score_if_match(tile_result, threshold, method)
+            if loc is not None: return score, (x0 + loc[0], y0 + loc[1])
+            if best_score is None or (score < best_score if is_diff_method else score > best_score): best_score = score
+    return best_score, None
+
+FLAT_WINDOW_MIN_STD = 1.0
+
+def textured_window_bbox(search_np: np.ndarray, template_shape: tuple, min_std: float = FLAT_WINDOW_MIN_STD) -> tuple | None:
+    """
+    Bounding box (x1, y1, x2, y2), inclusive, in result-matrix coordinates of all windows whose
+    standard deviation is at least min_std, or None if every window is flat.
+
+    TM_CCOEFF_NORMED is invariant to brightness/contrast, so window means/stds cannot bound the
+    score in general; but a flat window has no correlation with any template (score 0), so flat
+    areas - common in UI screenshots - can be rejected from two integral images in O(W*H).
+    """
+    h_t, w_t = template_shape[:2]
+    res_h, res_w = search_np.shape[0] - h_t + 1, search_np.shape[1] - w_t + 1
+    sum_img, sum_sq_img = cv2.integral2(search_np, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    window_sum = sum_img[h_t:, w_t:] - sum_img[:res_h, w_t:] - sum_img[h_t:, :res_w] + sum_img[:res_h, :res_w]
+    window_sum_sq = sum_sq_img[h_t:, w_t:] - sum_sq_img[:res_h, w_t:] - sum_sq_img[h_t:, :res_w] + sum_sq_img[:res_h, :res_w]
+    area = float(h_t * w_t)
+    textured = (window_sum_sq - window_sum * window_sum / area) >= (min_std * min_std) * area
+    rows = np.flatnonzero(textured.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(textured.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1])
+
+def find_best_match_ccoeff_normed(search_np: np.ndarray, template_np: np.ndarray, threshold: float,
+                                  result_buffers: dict | None = None, template_stats: tuple | None = None) -> tuple:
+    """
+    TM_CCOEFF_NORMED best match with early rejection of flat areas (single-channel only).
+    Matching runs only over the bounding box of textured windows; if there are none the search
+    is rejected without calling matchTemplate at all. result_buffers and template_stats are passed
+    on to match_template_ccoeff_normed.
+
+    Returns:
+        (max_val, (x, y)) in search_np coordinates.
+    """
+    if threshold > 0.0 and search_np.ndim == 2:
+        bbox = textured_window_bbox(search_np, template_np.shape)
+        if bbox is None:
+            logger.debug("find_best_match_ccoeff_normed: Every window is flat, rejecting without matchTemplate.")
+            return 0.0, (0, 0)
+        x1, y1, x2, y2 = bbox
+        h_t, w_t = template_np.shape[:2]
+        roi = search_np[y1:y2 + h_t, x1:x2 + w_t]
+        _, max_val, _, max_loc = cv2.minMaxLoc(match_template_ccoeff_normed(roi, template_np, result_buffers, template_stats))
+        return max_val, (max_loc[0] + x1, max_loc[1] + y1)
+    _, max_val, _, max_loc = cv2.minMaxLoc(match_template_ccoeff_normed(search_np, template_np, result_buffers, template_stats))
+    return max_val, max_loc
+
+def to_matching_format(image_np: np.ndarray, keep_color: bool = False, dst: np.ndarray | None = None) -> np.ndarray:
+    """
+    Normalizes an image so matchTemplate/ORB hit OpenCV's fast CV_8U paths: converts to uint8 and,
+    unless keep_color is set, to a single channel. With keep_color, BGRA is still reduced to BGR
+    so templates and captures agree on channel count.
+
+    Args:
+        image_np: Preprocessed image (any dtype, 2D or 3/4-channel).
+        keep_color: True when the user explicitly disabled grayscale preprocessing.
+        dst: Optional preallocated (H, W) uint8 buffer for the grayscale conversion.
+    """
+    if image_np.dtype != np.uint8:
+        image_np = cv2.convertScaleAbs(image_np)
+    if image_np.ndim != 3 or image_np.shape[2] not in (3, 4):
+        return image_np
+    if keep_color:
+        return cv2.cvtColor(image_np, cv2.COLOR_BGRA2BGR) if image_np.shape[2] == 4 else image_np
+    code = cv2.COLOR_BGRA2GRAY if image_np.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    if dst is not None and dst.shape == image_np.shape[:2] and dst.dtype == np.uint8:
+        return cv2.cvtColor(image_np, code, dst=dst)
+    return cv2.cvtColor(image_np, code)
@@ -3,6 +3,7 @@ using System;
 using System.Drawing;
 using System.Drawing.Imaging;
 using System.IO;
+using System.IO.MemoryMappedFiles;
 using System.Runtime.InteropServices;
 using System.Threading;
 using InputSimulatorStandard;
@@ -111,6 +112,82 @@ namespace server
             }
         }
 
+        public static Size? CaptureRegionToSharedMemory(int x1, int y1, int x2, int y2, string shmName, int shmSize)
+        {
+            Console.WriteLine($"{_logPrefix}CaptureRegionToSharedMemory: Called with region ({x1},{y1})-({x2},{y2}), mapping '{shmName}' ({shmSize} bytes).");
+            Rectangle virtualScreenBounds = GetVirtualScreenBounds();
+            if (virtualScreenBounds.Width <= 0 || virtualScreenBounds.Height <= 0)
+            {
+                Console.WriteLine($"{_logPrefix}CaptureRegionToSharedMemory: Error - Invalid virtual screen bounds.");
+                return null;
+            }
+
+            // Clamp coordinates to virtual screen
+            int captureX1 = Math.Max(virtualScreenBounds.Left, Math.Min(virtualScreenBounds.Right, x1));
+            int captureY1 = Math.Max(virtualScreenBounds.Top, Math.Min(virtualScreenBounds.Bottom, y1));
+            int captureX2 = Math.Max(virtualScreenBounds.Left, Math.Min(virtualScreenBounds.Right, x2));
+            int captureY2 = Math.Max(virtualScreenBounds.Top, Math.Min(virtualScreenBounds.Bottom, y2));
+
+            int width = captureX2 - captureX1;
+            int height = captureY2 - captureY1;
+            if (width <= 0 || height <= 0)
+            {
+                Console.WriteLine($"{_logPrefix}CaptureRegionToSharedMemory: Error - Invalid capture dimensions after clamping. WxH: {width}x{height}.");
+                return null;
+            }
+
+            int rowBytes = width * 4;
+            long requiredBytes = (long)rowBytes * height;
+            if (requiredBytes > shmSize)
+            {
+                Console.WriteLine($"{_logPrefix}CaptureRegionToSharedMemory: Error - Mapping too small ({shmSize} bytes) for {width}x{height} BGRA ({requiredBytes} bytes).");
+                return null;
+            }
+            try
+            {
+                using Bitmap bitmap = new Bitmap(width, height, PixelFormat.Format32bppArgb);
+                using (Graphics g = Graphics.FromImage(bitmap))
+                {
+                    g.CopyFromScreen(captureX1, captureY1, 0, 0, new Size(width, height), CopyPixelOperation.SourceCopy);
+                }
+                BitmapData bits = bitmap.LockBits(new Rectangle(0, 0, width, height), ImageLockMode.ReadOnly, PixelFormat.Format32bppArgb);
+                try
+                {
+                    using MemoryMappedFile mmf = MemoryMappedFile.OpenExisting(shmName, MemoryMappedFileRights.ReadWrite);
+                    using MemoryMappedViewAccessor view = mmf.CreateViewAccessor(0, requiredBytes, MemoryMappedFileAccess.ReadWrite);
+                    unsafe
+                    {
+                        byte* dst = null;
+                        view.SafeMemoryMappedViewHandle.AcquirePointer(ref dst);
+                        try
+                        {
+                            dst += view.PointerOffset;
+                            byte* src = (byte*)bits.Scan0;
+                            // Tightly packed rows (stride == width * 4) so the client can wrap the block as an HxWx4 array.
+                            for (int row = 0; row < height; row++)
+                            {
+                                Buffer.MemoryCopy(src + (long)row * bits.Stride, dst + (long)row * rowBytes, rowBytes, rowBytes);
+                            }
+                        }
+                        finally
+                        {
+                            view.SafeMemoryMappedViewHandle.ReleasePointer();
+                        }
+                    }
+                }
+                finally
+                {
+                    bitmap.UnlockBits(bits);
+                }
+                Console.WriteLine($"{_logPrefix}CaptureRegionToSharedMemory: Wrote {width}x{height} BGRA pixels to '{shmName}'.");
+                return new Size(width, height);
+            }
+            catch (Exception ex)
+            {
+                Console.WriteLine($"{_logPrefix}CaptureRegionToSharedMemory: Exception during capture or copy: {ex.Message}\n{ex.StackTrace}");
+                return null;
+            }
+        }
 
         public static byte[]? CaptureRegionAndPreprocess(int x1, int y1, int x2, int y2, bool useGrayscale, bool useBinarization)
         {
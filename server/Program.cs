@@ -268,6 +268,35 @@ namespace server
                         int y2 = GetIntParam(p, "y2", currentScreenSize.Height);
                         bool useGray = GetBooleanParam(p, "useGrayscale");
                         bool useBin = GetBooleanParam(p, "useBinarization");
+                        string shmName = GetStringParam(p, "shm_name");
+
+                        // Shared memory only carries unprocessed BGRA; preprocessed captures keep using the PNG path.
+                        if (!string.IsNullOrEmpty(shmName) && !useGray && !useBin)
+                        {
+                            // Raw BGRA pixels go straight into the client's shared memory block; only metadata crosses the pipe.
+                            int shmSize = GetIntParam(p, "shm_size");
+                            Size? capturedSize = OSInteractions.CaptureRegionToSharedMemory(x1, y1, x2, y2, shmName, shmSize);
+                            if (capturedSize != null)
+                            {
+                                Rectangle virtualScreen = OSInteractions.GetVirtualScreenBounds();
+                                int actualX1 = Math.Max(virtualScreen.Left, Math.Min(virtualScreen.Right, x1));
+                                int actualY1 = Math.Max(virtualScreen.Top, Math.Min(virtualScreen.Bottom, y1));
+                                resultNode = new JsonObject
+                                {
+                                    ["shm_width"] = capturedSize.Value.Width,
+                                    ["shm_height"] = capturedSize.Value.Height,
+                                    ["actual_x1"] = actualX1,
+                                    ["actual_y1"] = actualY1,
+                                    ["actual_x2"] = actualX1 + capturedSize.Value.Width,
+                                    ["actual_y2"] = actualY1 + capturedSize.Value.Height
+                                };
+                            }
+                            else
+                            {
+                                status = "Error"; message = "Screen capture to shared memory failed.";
+                            }
+                            break;
+                        }
 
                         byte[]? imgBytes = OSInteractions.CaptureRegionAndPreprocess(x1, y1, x2, y2, useGray, useBin);
 
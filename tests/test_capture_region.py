@@ -0,0 +1,70 @@
+import sys
+import os
+import base64
+import unittest
+# Add project root to sys.path to import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import numpy as np
+    import cv2
+    from autoclicker import python_csharp_bridge
+    from autoclicker.python_csharp_bridge import OSInteractionClient
+    _DepsAvailable = python_csharp_bridge._CV2Available and python_csharp_bridge._SharedMemoryAvailable
+except ImportError:
+    _DepsAvailable = False
+
+
+class FakeCaptureService:
+    """Answers CaptureRegion like the C# service: raw BGRA into shared memory, otherwise a (preprocessed) PNG."""
+    def __init__(self, client):
+        self.client = client
+        self.shm_requests = 0
+
+    def __call__(self, command, params=None, **kwargs):
+        assert command == "CaptureRegion"
+        w, h = params["x2"] - params["x1"], params["y2"] - params["y1"]
+        bgra = np.full((h, w, 4), 200, dtype=np.uint8)
+        if params.get("shm_name"):
+            self.shm_requests += 1
+            np.ndarray((h, w, 4), dtype=np.uint8, buffer=self.client._capture_shm.buf)[:] = bgra
+            return {"shm_width": w, "shm_height": h, "actual_x1": params["x1"], "actual_y1": params["y1"]}
+        img = bgra
+        if params["useGrayscale"] or params["useBinarization"]:
+            img = cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+        ok, png = cv2.imencode(".png", img)
+        assert ok
+        return {"captured_image_bytes": base64.b64encode(png.tobytes()).decode("ascii"),
+                "actual_x1": params["x1"], "actual_y1": params["y1"], "actual_x2": params["x2"], "actual_y2": params["y2"]}
+
+
+@unittest.skipUnless(_DepsAvailable, "numpy, OpenCV and multiprocessing.shared_memory are required")
+class CaptureRegionPathTests(unittest.TestCase):
+    def capture(self, use_shm, use_gray, use_bin):
+        client = OSInteractionClient()
+        self.addCleanup(client._release_capture_shm)
+        client._capture_shm_enabled = use_shm
+        service = FakeCaptureService(client)
+        client._send_request = service
+        result = client.capture_region(10, 20, 42, 36, useGrayscale=use_gray, useBinarization=use_bin)
+        return result, service
+
+    def test_preprocessing_flags_give_same_shape_on_both_paths(self):
+        for use_gray in (False, True):
+            for use_bin in (False, True):
+                with self.subTest(useGrayscale=use_gray, useBinarization=use_bin):
+                    shm_result, _ = self.capture(True, use_gray, use_bin)
+                    png_result, _ = self.capture(False, use_gray, use_bin)
+                    self.assertEqual(shm_result["image_np"].shape, png_result["image_np"].shape)
+                    self.assertEqual((shm_result["x1"], shm_result["y1"]), (png_result["x1"], png_result["y1"]))
+
+    def test_shared_memory_used_only_without_preprocessing(self):
+        _, service = self.capture(True, False, False)
+        self.assertEqual(service.shm_requests, 1)
+        for use_gray, use_bin in ((True, False), (False, True), (True, True)):
+            _, service = self.capture(True, use_gray, use_bin)
+            self.assertEqual(service.shm_requests, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()